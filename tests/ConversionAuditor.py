@@ -1,15 +1,21 @@
 import datetime
+import hashlib
+import io
 import logging
 import re
 from configparser import ConfigParser
 from pathlib import Path
-from typing import Sequence
+from typing import NamedTuple, Optional, Sequence
 
-from openpyxl import load_workbook
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
 from openpyxl.cell import Cell, ReadOnlyCell
 from openpyxl.cell.read_only import EmptyCell
 
 from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.data_formats import (data_format_of, data_output_pattern, open_text_file, read_data_file,
+                                      write_data_file)
 from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
 
 TrialSiteMetadata = dict[str, str]
@@ -17,6 +23,17 @@ TrialSiteHeader = list[tuple[int, str]]
 TrialSiteData = list[list[str]]
 TrialSiteContent = tuple[TrialSiteMetadata, TrialSiteHeader, TrialSiteData]
 
+
+class DataDigest(NamedTuple):
+    row_count: int
+    # one digest per column
+    columns: list[str]
+
+
+# Reference data is retained either completely or only as digest, depending on the verification mode
+TrialSiteReference = tuple[TrialSiteMetadata, TrialSiteHeader, TrialSiteData | DataDigest]
+VERIFICATION_MODES = ('cells', 'digest')
+
 ExcelCell = Cell | ReadOnlyCell | EmptyCell
 
 
@@ -24,35 +41,186 @@ class VerificationException(Exception):
     pass
 
 
+def _to_cell_array(rows: TrialSiteData, width: int) -> np.ndarray:
+    """
+    Create a two-dimensional object array of the cells, padding short rows with `None` and truncating long rows.
+    """
+    cells = np.full((len(rows), width), None, dtype=object)
+    for row_index, row in enumerate(rows):
+        row = row[:width]
+        cells[row_index, :len(row)] = row
+    return cells
+
+
+def find_mismatching_cells(data: TrialSiteData, original_data: TrialSiteData, limit: int) -> list[tuple[int, int]]:
+    """
+    Compare converted cells to the original cells and return the coordinates of mismatching cells.
+    Converted decimal numbers are compared numerically to the original value with decimal commas, converted `NA`
+    values match original blank (`' '`) cells. All other cells must be equal.
+    Cells are compared with array operations, only cells that aren't equal as strings are examined further.
+
+    @param data: Converted data rows
+    @param original_data: Original data rows with the same count of rows
+    @param limit: Maximal count of mismatching cells to return
+    @return: Coordinates (row index, column index) of the first mismatching cells in row-major order
+    """
+    width = max((len(row) for row in data), default=0)
+    converted = _to_cell_array(data, width).ravel()
+    original = _to_cell_array(original_data, width).ravel()
+    # cells missing in the converted data are not compared
+    candidates = np.flatnonzero((converted != original) & (converted != None))  # noqa: E711
+    if len(candidates) == 0:
+        return []
+    # Measurement values repeat a lot, so string operations are applied to the unique values only
+    converted_codes, converted_values = pd.factorize(converted[candidates])
+    original_codes, original_values = pd.factorize(original[candidates])
+    converted_values = pd.Series(converted_values, dtype=object).astype(str)
+    # missing original cells become 'None', which never matches
+    original_values = pd.Series(original_values, dtype=object).astype(str)
+
+    numeric = converted_values.str.fullmatch(r'\d+[.,]\d+').to_numpy(dtype=bool)[converted_codes]
+    # comparison of floating point numbers
+    converted_numbers = pd.to_numeric(converted_values.str.replace(',', '.', regex=False), errors='coerce')
+    original_numbers = pd.to_numeric(original_values.str.replace(',', '.', regex=False), errors='coerce')
+    matching_numbers = converted_numbers.to_numpy()[converted_codes] == original_numbers.to_numpy()[original_codes]
+    # values with a single space are converted into NA
+    matching_blanks = ((converted_values == 'NA').to_numpy()[converted_codes]
+                       & (original_values == ' ').to_numpy()[original_codes])
+    matching = np.where(numeric, matching_numbers, matching_blanks)
+
+    mismatches = candidates[~matching][:limit]
+    return [(int(index) // width, int(index) % width) for index in mismatches]
+
+
+# converted cells in this format are compared numerically, see `find_mismatching_cells`
+DECIMAL_NUMBER = re.compile(r'\d+[.,]\d+')
+NUMBER = re.compile(r'[+-]?(\d+([.,]\d*)?|[.,]\d+)([eE][+-]?\d+)?')
+
+
+def _canonical_cell(value: Optional[str], converted: bool, float_column: bool) -> str:
+    """
+    Return the canonical representation of a cell. The canonical representations of a converted cell and its original
+    cell are equal if the cells match according to the rules of `find_mismatching_cells`: converted decimal numbers
+    match original values of equal numeric value, converted `NA` values match original blank (`' '`) cells and all
+    other cells must be equal. Converted cells of float columns are decimal numbers, so original numbers in any
+    notation are canonicalized numerically in float columns only.
+
+    @param value: Cell value, None for a missing cell
+    @param converted: Whether the cell is a converted cell or an original cell
+    @param float_column: Whether the cell belongs to a column that is converted into a float column
+    """
+    if value is None:
+        # missing cell
+        return '\0'
+    if DECIMAL_NUMBER.fullmatch(value) or (float_column and not converted and NUMBER.fullmatch(value)):
+        return '\x01' + repr(float(value.replace(',', '.')))
+    if value == ' ' and not converted:
+        # values with a single space are converted into NA
+        return 'NA'
+    return value
+
+
+def digest_columns(data: TrialSiteData, float_columns: Sequence[bool], converted: bool) -> DataDigest:
+    """
+    Create an order-stable digest of every column from its canonical cell values, see `_canonical_cell`.
+    The digests of original and converted data are equal if their cells match according to the rules of
+    `find_mismatching_cells`, provided that the converted cells are formatted according to the type of their column.
+    Cells missing in the converted data are the only exception: they mismatch, while `find_mismatching_cells` skips
+    them.
+
+    @param data: Data rows
+    @param float_columns: Whether each column is converted into a float column, longer rows are truncated
+    @param converted: Whether the data is converted data or original data
+    @return: Row count and column digests
+    """
+    width = len(float_columns)
+    cells = _to_cell_array(data, width)
+    codes, values = pd.factorize(cells.ravel())
+    codes = codes.reshape(cells.shape)
+    # the code of missing cells is -1, which refers to the last canonical value
+    values = list(values) + [None]
+    canonical = {
+        float_column: np.array([_canonical_cell(value, converted, float_column) for value in values], dtype=object)
+        for float_column in set(float_columns)
+    }
+    return DataDigest(
+        row_count=len(data),
+        columns=[hashlib.sha256('\x1f'.join(canonical[float_column][codes[:, column]]).encode('utf-8')).hexdigest()
+                 for column, float_column in enumerate(float_columns)])
+
+
 class ConversionAuditor:
     logger = logging.getLogger(__name__)
+    # maximal count of mismatching cells reported per trial site
+    max_reported_mismatches = 10
 
     def __init__(self, vfl2csv_config: ConfigParser, column_scheme: ColumnScheme):
         self.config = vfl2csv_config
         self.column_scheme = column_scheme
-        self.reference: list[TrialSiteContent] = []
+        self.verification = vfl2csv_config['Output'].get('verification', 'cells')
+        if self.verification not in VERIFICATION_MODES:
+            raise IllegalConfigError(f'`verification` must be one of {", ".join(VERIFICATION_MODES)}')
+        self.reference: list[TrialSiteReference] = []
+        # most recently opened reference workbook, reused while auditing the sheets of the same workbook
+        self._workbook: Optional[tuple[Path, Workbook]] = None
 
     def set_reference_files(self, paths: list[Path]) -> None:
         self.reference = []
         file_type = self.config['Input']['input_format']
         if file_type.lower() == 'excel':
             for path in paths:
-                self.reference.extend(self._parse_excel_file(path))
+                self.reference.extend(self._condense(content) for content in self._parse_excel_file(path))
         elif file_type.lower() == 'tsv':
             for path in paths:
-                self.reference.append(self._parse_tsv_file(path))
+                self.reference.append(self._condense(self._parse_tsv_file(path)))
         else:
             raise IllegalConfigError('`file_type` must be either "Excel" or "TSV"!')
 
+    def _condense(self, content: TrialSiteContent) -> TrialSiteReference:
+        """
+        Replace the data of parsed reference content with its digest if the digest verification mode is used.
+        """
+        if self.verification == 'digest':
+            metadata, header, data = content
+            return metadata, header, digest_columns(data, self._float_columns(len(header)), converted=False)
+        return content
+
+    def _float_columns(self, width: int) -> list[bool]:
+        """
+        Determine which of the columns of a trial site are converted into float columns according to the column scheme.
+        """
+        types = [column['type'] for column in self.column_scheme.head]
+        measurement_types = [column['type'] for column in self.column_scheme.measurements]
+        types.extend(measurement_types[index % len(measurement_types)] for index in range(width - len(types)))
+        return [column_type.startswith('float') for column_type in types[:width]]
+
     def _parse_excel_file(self, file: Path) -> list[TrialSiteContent]:
         wb = load_workbook(file, read_only=True)
         results: list[TrialSiteContent] = []
-        for sheet in wb.sheetnames:
-            lines: list[list[str]] = list(wb[sheet].rows)
+        try:
+            for sheet in wb.sheetnames:
+                lines: list[list[str]] = list(wb[sheet].rows)
 
-            results.append(self._parse_input(lines))
+                results.append(self._parse_input(lines))
+        finally:
+            # read-only workbooks keep their file open until they are closed
+            wb.close()
         return results
 
+    def _parse_excel_sheet(self, file: Path, sheet: str) -> TrialSiteContent:
+        if self._workbook is None or self._workbook[0] != file:
+            self.close()
+            self._workbook = (file, load_workbook(file, read_only=True))
+        return self._parse_input(list(self._workbook[1][sheet].rows))
+
+    def close(self) -> None:
+        """
+        Close the reference workbook kept open for auditing further sheets of the same workbook.
+        """
+        if self._workbook is not None:
+            workbook, self._workbook = self._workbook[1], None
+            workbook.close()
+
     def _parse_tsv_file(self, file: Path) -> TrialSiteContent:
         with open(file, 'r', encoding=self.config['Input']['tsv_encoding']) as file:
             raw_lines = file.readlines()
@@ -95,7 +263,10 @@ class ConversionAuditor:
         if (len(years) - len(self.column_scheme.head)) % len(self.column_scheme.measurements) != 0:
             raise ValueError('Invalid column count')
         measurement_count = (len(years) - len(self.column_scheme.head)) // len(self.column_scheme.measurements)
-        labels.extend(measurement_count * [column.get('override_name', column['name']) for column in self.column_scheme.measurements])
+        labels.extend(
+            measurement_count
+            * [column.get('override_name', column['name']) for column in self.column_scheme.measurements]
+        )
         header.extend(list(zip(years, labels)))
         for line in lines[17:]:
             line_tokens = []
@@ -130,6 +301,49 @@ class ConversionAuditor:
             raise VerificationException('Count of remaining reference sites is greater than zero, remaining sites: ' +
                                         ', '.join(remaining_trial_site_names))
 
+    def _parse_reference(self, reference_path: Path, sheet_name: Optional[str]) -> TrialSiteContent:
+        file_type = self.config['Input']['input_format']
+        if file_type.lower() == 'excel':
+            return self._parse_excel_sheet(reference_path, sheet_name)
+        elif file_type.lower() == 'tsv':
+            return self._parse_tsv_file(reference_path)
+        raise IllegalConfigError('`file_type` must be either "Excel" or "TSV"!')
+
+    def audit_converted_trial_site(self, reference_path: Path, sheet_name: Optional[str], metadata_path: Path) -> None:
+        """
+        Verify the correctness of a single converted trial site right after its conversion, without holding the
+        reference data of other trial sites in memory.
+
+        @param reference_path: Path of the input file the trial site was converted from
+        @param sheet_name: Name of the sheet containing the trial site if the input file is an Excel file
+        @param metadata_path: Path of the converted metadata file
+        @return: None
+        """
+        reference = self._condense(self._parse_reference(reference_path, sheet_name))
+        self._verify_converted_trial_site(
+            metadata_path, {(reference[0]['Versuch'], reference[0]['Parzelle']): reference}
+        )
+
+    def audit_converted_data(self, reference_path: Path, sheet_name: Optional[str], metadata: TrialSiteMetadata,
+                             data: pd.DataFrame) -> None:
+        """
+        Verify the correctness of a converted trial site that is not written to a data and a metadata file, but
+        appended to a dataset. The converted data is compared as it would be written to a CSV file.
+
+        @param reference_path: Path of the input file the trial site was converted from
+        @param sheet_name: Name of the sheet containing the trial site if the input file is an Excel file
+        @param metadata: Metadata of the converted trial site
+        @param data: Data of the converted trial site
+        @return: None
+        """
+        reference = self._condense(self._parse_reference(reference_path, sheet_name))
+        buffer = io.StringIO()
+        write_data_file(data, buffer, 'csv')
+        self._verify_trial_site_content(
+            {key: value for key, value in metadata.items() if key != 'DataFrame'},
+            buffer.getvalue().splitlines(keepends=True),
+            {(reference[0]['Versuch'], reference[0]['Parzelle']): reference})
+
     @staticmethod
     def _verify_metadata_embedded_path(pattern: str, metadata: dict[str, str], actual_path: Path) -> None:
         for key, value in metadata.items():
@@ -143,8 +357,22 @@ class ConversionAuditor:
                              f'Expected path: {"/".join(pattern_tokens)}')
         return
 
-    def _verify_converted_trial_site(self, path: Path, original_trial_sites: dict[tuple[str, str], TrialSiteContent]) \
-            -> None:
+    @staticmethod
+    def _read_data_lines(path: Path) -> list[str]:
+        """
+        Read the lines of a converted data file. Data files in columnar formats are rendered as CSV exactly like the
+        converter writes CSV files, so that their cells are compared by the same rules. Compressed CSV files are
+        decompressed while they are read.
+        """
+        if data_format_of(path) == 'csv':
+            with open_text_file(path) as file:
+                return file.readlines()
+        buffer = io.StringIO()
+        write_data_file(read_data_file(path), buffer, 'csv')
+        return buffer.getvalue().splitlines(keepends=True)
+
+    def _verify_converted_trial_site(self, path: Path,
+                                     original_trial_sites: dict[tuple[str, str], TrialSiteReference]) -> None:
         """
         Compare the equality of metadata and data
 
@@ -153,8 +381,6 @@ class ConversionAuditor:
         @return:
         """
         metadata: TrialSiteMetadata = {}
-        header: TrialSiteHeader = []
-        data: TrialSiteData
         # read metadata
         # this implementation is copy-pasted from TrialSite.from_metadata_file
         with open(path, 'r', encoding='utf-8') as file:
@@ -169,20 +395,37 @@ class ConversionAuditor:
         del metadata['DataFrame']
         # check the file path
         self._verify_metadata_embedded_path(self.config['Output']['metadata_output_pattern'], metadata, path)
-        self._verify_metadata_embedded_path(self.config['Output']['csv_output_pattern'], metadata, dataframe_path)
+        data_format = self.config['Output'].get('data_format', 'csv')
+        self._verify_metadata_embedded_path(
+            data_output_pattern(self.config['Output']['csv_output_pattern'], data_format,
+                                self.config['Output'].get('compression', 'none')),
+            metadata, dataframe_path)
 
+        self._verify_trial_site_content(metadata, self._read_data_lines(dataframe_path), original_trial_sites)
+
+    def _verify_trial_site_content(self, metadata: TrialSiteMetadata, raw_lines: list[str],
+                                   original_trial_sites: dict[tuple[str, str], TrialSiteReference]) -> None:
+        """
+        Compare the equality of metadata and data of a converted trial site with its original trial site
+
+        @param metadata: Metadata of the converted trial site, without the `DataFrame` entry
+        @param raw_lines: Lines of the converted data formatted as CSV
+        @param original_trial_sites: Data of the original trial site
+        @return:
+        """
+        header: TrialSiteHeader = []
+        data: TrialSiteData
         # read header & content
-        with open(dataframe_path) as file:
-            lines = [line.replace('\n', '').split(',') for line in file.readlines()]
-            for cell in lines[0]:
-                if re.fullmatch(r'\D+_\d{4}', cell):
-                    # Fix in case there are multiple underscores in one column name
-                    label, year = cell.rsplit('_', maxsplit=1)
-                    header.append((int(year), label))
-                else:
-                    # tree metadata column
-                    header.append((-1, cell))
-            data = lines[1:]
+        lines = [line.replace('\n', '').split(',') for line in raw_lines]
+        for cell in lines[0]:
+            if re.fullmatch(r'\D+_\d{4}', cell):
+                # Fix in case there are multiple underscores in one column name
+                label, year = cell.rsplit('_', maxsplit=1)
+                header.append((int(year), label))
+            else:
+                # tree metadata column
+                header.append((-1, cell))
+        data = lines[1:]
 
         trial_site_key = (metadata['Versuch'], metadata['Parzelle'])
         trialsite_key_str = '-'.join(trial_site_key)
@@ -202,30 +445,32 @@ class ConversionAuditor:
                                          f'Converted: {header}\n'
                                          f'Original: {original_header}')
 
-        if len(original_data) != len(data):
-            raise VerificationException(f'Number of data rows of converted trial site {trialsite_key_str} does not match data '
-                                        f'of original trial site')
-
-        for row_index in range(len(data)):
-            for col_index in range(len(data[row_index])):
-                error_flag = False
-                cell_value = data[row_index][col_index]
-                original_cell_value = original_data[row_index][col_index]
-                if re.fullmatch(r'\d+[.,]\d+', cell_value):
-                    # comparison of floating point numbers
-                    data_value = cell_value.replace(',', '.')
-                    original_data_value = original_cell_value.replace(',', '.')
-                    if float(data_value) != float(original_data_value):
-                        error_flag = True
-                else:
-                    # Comparison of values that are not floating point numbers
-                    if cell_value != original_cell_value:
-                        # Values with a single space are converted into NA
-                        if not (cell_value == 'NA' and original_cell_value == ' '):
-                            error_flag = True
-                if error_flag:
-                    raise VerificationException(f'Data of converted trial site {trialsite_key_str} does not match data of '
-                                                f'original trial site in line {row_index + 1}, column {col_index + 1}.\n'
-                                                f'Converted: {cell_value}\n'
-                                                f'Original: {original_cell_value}')
+        original_row_count = original_data.row_count if isinstance(original_data, DataDigest) else len(original_data)
+        if original_row_count != len(data):
+            raise VerificationException(f'Number of data rows of converted trial site {trialsite_key_str} does not '
+                                        f'match data of original trial site')
+
+        if isinstance(original_data, DataDigest):
+            digest = digest_columns(data, self._float_columns(len(header)), converted=True)
+            mismatching_columns = []
+            for column, (year, label) in enumerate(header):
+                if digest.columns[column] != original_data.columns[column]:
+                    mismatching_columns.append(f'{column + 1} ({label if year == -1 else f"{label}_{year}"})')
+            if len(mismatching_columns) != 0:
+                raise VerificationException(f'Data of converted trial site {trialsite_key_str} does not match data of '
+                                            f'original trial site in columns ' + ', '.join(mismatching_columns))
+            del original_trial_sites[trial_site_key]
+            return
+
+        mismatches = find_mismatching_cells(data, original_data, self.max_reported_mismatches)
+        if len(mismatches) != 0:
+            count = f'{"at least " if len(mismatches) == self.max_reported_mismatches else ""}{len(mismatches)}'
+            details = []
+            for row_index, col_index in mismatches:
+                original_row = original_data[row_index]
+                original_cell_value = original_row[col_index] if col_index < len(original_row) else None
+                details.append(f'Line {row_index + 1}, column {col_index + 1}: '
+                               f'Converted: {data[row_index][col_index]}, Original: {original_cell_value}')
+            raise VerificationException(f'Data of converted trial site {trialsite_key_str} does not match data of '
+                                        f'original trial site in {count} cells:\n' + '\n'.join(details))
         del original_trial_sites[trial_site_key]
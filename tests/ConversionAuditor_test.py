@@ -0,0 +1,106 @@
+import unittest
+from configparser import ConfigParser
+from unittest import mock
+
+from openpyxl import load_workbook
+
+from tests.ConversionAuditor import ConversionAuditor, digest_columns, find_mismatching_cells
+from vfl2csv_base import test_config
+from vfl2csv_base.ColumnScheme import ColumnScheme
+
+
+class ConversionAuditorTest(unittest.TestCase):
+    def test_matching_cells(self):
+        original = [['1', 'Fi', '11,0', ' ', '3,50'], ['2', 'Bu', '9,5', '0,1', 'NA']]
+        converted = [['1', 'Fi', '11.0', 'NA', '3.5'], ['2', 'Bu', '9.5', '0.1', 'NA']]
+        self.assertListEqual(find_mismatching_cells(converted, original, 10), [])
+
+    def test_mismatching_cells(self):
+        original = [['1', 'Fi', '11,0', ' '], ['2', 'Bu', '9,5', 'x'], ['3', 'Ei']]
+        converted = [['1', 'Ki', '11.1', 'NA'], ['2', 'Bu', '9.5', 'NA'], ['3', 'Ei', '1.0']]
+        self.assertListEqual(find_mismatching_cells(converted, original, 10), [(0, 1), (0, 2), (1, 3), (2, 2)])
+        # only the first mismatches are reported
+        self.assertListEqual(find_mismatching_cells(converted, original, 2), [(0, 1), (0, 2)])
+
+    def test_decimal_notation(self):
+        # only converted decimal numbers are compared numerically
+        self.assertListEqual(find_mismatching_cells([['1.0', '1']], [['1,00', '1,0']], 10), [(0, 1)])
+
+    def test_digest_columns(self):
+        float_columns = [False, False, True, True, True]
+        original = [['1', 'Fi', '11,0', ' ', '3,50'], ['2', 'Bu', '9', '0,1', 'NA', 'ignored']]
+        converted = [['1', 'Fi', '11.0', 'NA', '3.5'], ['2', 'Bu', '9.0', '0.1', 'NA']]
+        self.assertEqual(digest_columns(converted, float_columns, converted=True),
+                         digest_columns(original, float_columns, converted=False))
+
+        converted[1][2] = '9.6'
+        converted_digest = digest_columns(converted, float_columns, converted=True)
+        original_digest = digest_columns(original, float_columns, converted=False)
+        self.assertEqual(converted_digest.row_count, 2)
+        self.assertListEqual([converted_digest.columns[column] == original_digest.columns[column]
+                              for column in range(5)], [True, True, False, True, True])
+
+    def test_digest_order(self):
+        # digests depend on the order of the rows
+        self.assertNotEqual(digest_columns([['1'], ['2']], [False], converted=False),
+                            digest_columns([['2'], ['1']], [False], converted=False))
+
+    def test_verification_modes_agree(self):
+        # Bst.-E., Art, Baum, D, Aus, H
+        float_columns = [False, False, False, True, False, True]
+        original = [['1', 'Fi', '12', '11,0', ' ', '23'], ['1', '1,0', '13', '9,5', '3', 'NA']]
+        converted = [['1', 'Fi', '12', '11.0', 'NA', '23.0'], ['1', '1,0', '13', '9.5', '3', 'NA']]
+        alterations = [
+            # a decimal number converted into an integer
+            (0, 3, '11'),
+            (0, 3, '11.1'),
+            (0, 4, '0'),
+            (1, 1, '1'),
+            (1, 2, '14'),
+            (1, 5, '0.0'),
+        ]
+        for row, column, value in [(0, 0, '1')] + alterations:
+            altered = [list(line) for line in converted]
+            altered[row][column] = value
+            mismatching_cells = find_mismatching_cells(altered, original, 10)
+            converted_digest = digest_columns(altered, float_columns, converted=True)
+            original_digest = digest_columns(original, float_columns, converted=False)
+            mismatching_columns = [index for index in range(len(float_columns))
+                                   if converted_digest.columns[index] != original_digest.columns[index]]
+            with self.subTest(value=value, column=column):
+                self.assertListEqual([index for _, index in mismatching_cells], mismatching_columns)
+                self.assertEqual(len(mismatching_columns), 0 if (row, column, value) not in alterations else 1)
+
+    def test_reference_workbook_reuse(self):
+        config = ConfigParser()
+        config.read_dict({'Input': {'input_format': 'Excel'}, 'Output': {}})
+        column_scheme = ColumnScheme.from_file(test_config['Input'].getpath('vfl2csv_test_columns_config'))
+        auditor = ConversionAuditor(config, column_scheme)
+        excel_files = sorted(test_config['Input'].getpath('excel_sample_input_dir').glob('*.xlsx'))
+        opened = []
+
+        def load(*args, **kwargs):
+            workbook = load_workbook(*args, **kwargs)
+            workbook.close = mock.Mock(wraps=workbook.close)
+            opened.append(workbook)
+            return workbook
+
+        with mock.patch('tests.ConversionAuditor.load_workbook', side_effect=load):
+            sheet_names = load_workbook(excel_files[0], read_only=True).sheetnames
+            for sheet_name in sheet_names[:2]:
+                auditor._parse_reference(excel_files[0], sheet_name)
+            # sheets of the same workbook are read from the workbook opened for the first sheet
+            self.assertEqual(len(opened), 1)
+            auditor._parse_reference(excel_files[1], load_workbook(excel_files[1], read_only=True).sheetnames[0])
+            self.assertEqual(len(opened), 2)
+            opened[0].close.assert_called_once()
+            opened[1].close.assert_not_called()
+            auditor.close()
+            opened[1].close.assert_called_once()
+            # the complete reference files are closed after reading them
+            auditor.set_reference_files(excel_files[:1])
+            opened[2].close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import argparse
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from tests.parser_benchmark import ENCODING, scale_export
+from vfl2csv import setup
+from vfl2csv.input.tsv_parser import parse_tsv_file
+from vfl2csv.output.TrialSiteConverter import TrialSiteConverter
+from vfl2csv_base import test_config
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.data_formats import CSV_WRITERS, write_data_file
+
+parser = argparse.ArgumentParser(
+    prog="csv_writer_benchmark",
+    description="Compare the CSV writers on wide trial sites generated from the sample corpus",
+)
+parser.add_argument(
+    "--years",
+    type=int,
+    default=60,
+    help="count of measurement years of every generated trial site",
+)
+parser.add_argument(
+    "--row-factor",
+    type=int,
+    default=10,
+    help="repeat the tree rows of every sample file this many times",
+)
+parser.add_argument(
+    "--repeat",
+    type=int,
+    default=3,
+    help="count of times every trial site is written by every writer",
+)
+
+
+def benchmark(trial_sites: list, csv_writer: str, repeat: int) -> tuple[float, list[str]]:
+    """
+    Write every trial site `repeat` times into memory using the given writer.
+    :return: Total time and the written content of every trial site
+    """
+    elapsed = 0.0
+    contents = []
+    for df in trial_sites:
+        for _ in range(repeat):
+            buffer = io.StringIO()
+            start = time.perf_counter()
+            write_data_file(df, buffer, "csv", csv_writer=csv_writer)
+            elapsed += time.perf_counter() - start
+        contents.append(buffer.getvalue())
+    return elapsed, contents
+
+
+if __name__ == "__main__":
+    arguments = parser.parse_args()
+    setup.column_scheme = ColumnScheme.from_file(
+        test_config["Input"].getpath("vfl2csv_test_columns_config")
+    )
+    trial_sites = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for source in sorted(test_config["Input"].getpath("tsv_sample_input_dir").glob("*.txt")):
+            target = Path(tmp_dir) / source.name
+            scale_export(source, target, arguments.years, arguments.row_factor)
+            converter = TrialSiteConverter(parse_tsv_file(target, ENCODING, "c", setup.column_scheme), target)
+            converter.refactor_dataframe()
+            trial_sites.append(converter.trial_site.df)
+    cell_count = sum(df.size for df in trial_sites)
+    print(f"Trial sites: {len(trial_sites)}, {cell_count / 1e6:.2f} million cells, {arguments.years} measurement years")
+    print(f'{"writer":<10}{"write [s]":>12}{"cells/s":>14}{"speedup":>10}')
+    reference_time, reference_contents = None, None
+    for csv_writer in CSV_WRITERS:
+        elapsed, contents = benchmark(trial_sites, csv_writer, arguments.repeat)
+        if reference_time is None:
+            reference_time, reference_contents = elapsed, contents
+        elif contents != reference_contents:
+            raise AssertionError(f"The {csv_writer} writer does not write the same content as the pandas writer")
+        print(
+            f"{csv_writer:<10}{elapsed:>12.3f}{cell_count * arguments.repeat / elapsed:>14.0f}"
+            f"{reference_time / elapsed:>10.2f}"
+        )
@@ -0,0 +1,164 @@
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from vfl2csv import setup
+from vfl2csv.input.tsv_parser import PARSE_ENGINES, parse_tsv_file
+from vfl2csv.output.TrialSiteConverter import TrialSiteConverter
+from vfl2csv_base import test_config
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.TrialSite import TrialSite
+
+ENCODING = "iso8859_15"
+
+parser = argparse.ArgumentParser(
+    prog="parser_benchmark",
+    description="Compare the TSV parse engines on a scaled-up copy of the sample corpus",
+)
+parser.add_argument(
+    "--years",
+    type=int,
+    default=60,
+    help="count of measurement years of every generated export",
+)
+parser.add_argument(
+    "--row-factor",
+    type=int,
+    default=10,
+    help="repeat the tree rows of every sample file this many times",
+)
+parser.add_argument(
+    "--copies",
+    type=int,
+    default=10,
+    help="count of generated exports per sample file",
+)
+parser.add_argument(
+    "--engines",
+    nargs="+",
+    default=["legacy", *PARSE_ENGINES],
+    help="engines to benchmark; `legacy` reads the file with a four-level pandas header and infers datatypes",
+)
+
+
+def scale_export(source: Path, target: Path, years: int, row_factor: int) -> None:
+    """
+    Write a copy of the given export with `years` measurements and `row_factor` times as many tree rows.
+    Measurement blocks of the source are repeated to fill up all years.
+    """
+    head_count = len(setup.column_scheme.head)
+    fields_count = len(setup.column_scheme.measurements)
+    with open(source, "r", encoding=ENCODING) as file:
+        lines = file.read().split("\n")
+    preamble, header, data = lines[:14], lines[14:18], [line for line in lines[18:] if line]
+
+    def widen(cells: list[str], dates: bool = False) -> list[str]:
+        blocks = [
+            cells[index: index + fields_count]
+            for index in range(head_count, len(cells) - 1, fields_count)
+        ]
+        widened = list(cells[:head_count])
+        for year in range(years):
+            block = blocks[year % len(blocks)]
+            widened.extend([f"01.10.{1900 + year}"] * fields_count if dates else block)
+        widened.append("")
+        return widened
+
+    output = list(preamble)
+    output.append("\t".join(widen(header[0].split("\t"), dates=True)))
+    output.extend("\t".join(widen(line.split("\t"))) for line in header[1:])
+    output.extend(row_factor * ["\t".join(widen(line.split("\t"))) for line in data])
+    with open(target, "w", encoding=ENCODING) as file:
+        file.write("\n".join(output) + "\n")
+
+
+def parse_legacy(path: Path) -> TrialSite:
+    with open(path, "r", encoding=ENCODING) as file_stream:
+        metadata = dict()
+        for _ in range(4):
+            file_stream.readline()
+        for _ in range(7):
+            key, value = file_stream.readline().split(":")
+            metadata[key.strip()] = value.strip()
+        file_stream.seek(0)
+        df = pd.read_csv(
+            file_stream,
+            sep="\t",
+            skiprows=14,
+            header=list(range(0, 4)),
+            decimal=",",
+            na_values=[" "],
+        )
+    return TrialSite(df.drop(columns=df.columns[-1]), metadata)
+
+
+def benchmark(files: list[Path], engine: str) -> tuple[float, float]:
+    parse_time = 0.0
+    refactor_time = 0.0
+    for path in files:
+        start = time.perf_counter()
+        if engine == "legacy":
+            trial_site = parse_legacy(path)
+        else:
+            trial_site = parse_tsv_file(path, ENCODING, engine, setup.column_scheme)
+        parsed = time.perf_counter()
+        TrialSiteConverter(trial_site, path).refactor_dataframe()
+        parse_time += parsed - start
+        refactor_time += time.perf_counter() - parsed
+    return parse_time, refactor_time
+
+
+def peak_memory(files: list[Path], engine: str) -> tuple[int, int]:
+    """
+    Measure the largest peak of memory allocated while refactoring a trial site and while verifying the column
+    integrity of the refactored trial site, in bytes. Memory is traced in a separate pass to not distort the timings.
+    """
+    refactor_peak = 0
+    verify_peak = 0
+    for path in files:
+        if engine == "legacy":
+            trial_site = parse_legacy(path)
+        else:
+            trial_site = parse_tsv_file(path, ENCODING, engine, setup.column_scheme)
+        tracemalloc.start()
+        TrialSiteConverter(trial_site, path).refactor_dataframe()
+        refactor_peak = max(refactor_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        trial_site.verify_column_integrity(setup.column_scheme)
+        verify_peak = max(verify_peak, tracemalloc.get_traced_memory()[1] - baseline)
+        tracemalloc.stop()
+    return refactor_peak, verify_peak
+
+
+if __name__ == "__main__":
+    arguments = parser.parse_args()
+    setup.column_scheme = ColumnScheme.from_file(
+        test_config["Input"].getpath("vfl2csv_test_columns_config")
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = []
+        for source in sorted(test_config["Input"].getpath("tsv_sample_input_dir").glob("*.txt")):
+            for copy in range(arguments.copies):
+                target = Path(tmp_dir) / f"{source.stem}-{copy}.txt"
+                scale_export(source, target, arguments.years, arguments.row_factor)
+                files.append(target)
+        corpus_size = sum(path.stat().st_size for path in files)
+        print(
+            f"Corpus: {len(files)} files, {corpus_size / 2 ** 20:.1f} MiB, {arguments.years} measurement years"
+        )
+        print(
+            f'{"engine":<10}{"parse [s]":>12}{"refactor [s]":>14}{"total [s]":>12}'
+            f'{"refactor peak [MiB]":>21}{"verify peak [MiB]":>19}'
+        )
+        for engine in arguments.engines:
+            parse_time, refactor_time = benchmark(files, engine)
+            refactor_peak, verify_peak = peak_memory(files, engine)
+            print(
+                f"{engine:<10}{parse_time:>12.3f}{refactor_time:>14.3f}{parse_time + refactor_time:>12.3f}"
+                f"{refactor_peak / 2 ** 20:>21.2f}{verify_peak / 2 ** 20:>19.2f}"
+            )
@@ -1,4 +1,4 @@
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 from pathlib import Path
 
 parser = ArgumentParser(
@@ -19,6 +19,26 @@ parser.add_argument(
     type=Path,
     help="Path to the column scheme configuration",
 )
+parser.add_argument(
+    "--incremental",
+    "-i",
+    action="store_true",
+    default=None,
+    help="Only convert input data that is new or changed since the last conversion into the output directory",
+)
+parser.add_argument(
+    "--defer-audit",
+    "-D",
+    action="store_true",
+    default=None,
+    help="Skip the verification of converted files, which can be done separately using `vfl2csv audit` later",
+)
+parser.add_argument(
+    "--resume",
+    "-r",
+    action="store_true",
+    help="Resume an interrupted conversion into the output directory, skipping trial sites it converted already",
+)
 parser.add_argument("output", action="store", type=Path, help="The output directory")
 parser.add_argument(
     "input",
@@ -27,3 +47,60 @@ parser.add_argument(
     type=Path,
     help="One or multiple input files or directories",
 )
+
+
+def sample_fraction(value: str) -> float:
+    fraction = float(value)
+    if not 0 < fraction <= 1:
+        raise ArgumentTypeError(f"{value} is not in the interval (0, 1]")
+    return fraction
+
+
+# invoked as `vfl2csv audit ...`
+audit_parser = ArgumentParser(
+    prog="vfl2csv audit",
+    description="Verify previously converted files against the input files they were converted from.",
+)
+audit_parser.add_argument(
+    "--config",
+    "-c",
+    action="store",
+    type=Path,
+    help="Path to the configuration file",
+)
+audit_parser.add_argument(
+    "--column-scheme",
+    "-C",
+    action="store",
+    type=Path,
+    help="Path to the column scheme configuration",
+)
+audit_parser.add_argument(
+    "--sample",
+    "-s",
+    action="store",
+    type=sample_fraction,
+    default=1.0,
+    help="Fraction of randomly chosen trial sites to verify, e.g. 0.1 for a spot check of 10 percent",
+)
+audit_parser.add_argument(
+    "--seed",
+    action="store",
+    type=int,
+    help="Seed for choosing the sample",
+)
+audit_parser.add_argument(
+    "--result",
+    "-r",
+    action="store",
+    type=Path,
+    help="Path of a JSON file the results are written to, by default only failed trial sites are logged",
+)
+audit_parser.add_argument("output", action="store", type=Path, help="The output directory to verify")
+audit_parser.add_argument(
+    "input",
+    action="store",
+    nargs="+",
+    type=Path,
+    help="One or multiple input files or directories the output was converted from",
+)
@@ -3,7 +3,7 @@ from io import StringIO
 from pathlib import Path
 from unittest.mock import patch
 
-from vfl2csv.ArgumentParser import parser
+from vfl2csv.ArgumentParser import audit_parser, parser
 
 
 class ArgumentParserTest(unittest.TestCase):
@@ -37,6 +37,26 @@ class ArgumentParserTest(unittest.TestCase):
         self.assertEqual(str(result["input"][0]), "second-arg")
         self.assertEqual(str(result["input"][1]), "third-arg")
 
+    def test_parseargs_defer_audit(self):
+        self.assertIsNone(vars(parser.parse_args(["out", "in"]))["defer_audit"])
+        self.assertTrue(vars(parser.parse_args(["--defer-audit", "out", "in"]))["defer_audit"])
+
+    def test_parseargs_resume(self):
+        self.assertFalse(vars(parser.parse_args(["out", "in"]))["resume"])
+        self.assertTrue(vars(parser.parse_args(["--resume", "out", "in"]))["resume"])
+
+    def test_parseargs_audit(self):
+        result = vars(audit_parser.parse_args(["--sample", "0.25", "out", "in"]))
+        self.assertEqual(result["sample"], 0.25)
+        self.assertEqual(str(result["output"]), "out")
+        self.assertEqual(vars(audit_parser.parse_args(["out", "in"]))["sample"], 1.0)
+
+    @patch("sys.stderr", new_callable=StringIO)
+    def test_parseargs_audit_illegal_sample(self, mock_stderr: StringIO):
+        with self.assertRaises(SystemExit):
+            audit_parser.parse_args(["--sample", "1.5", "out", "in"])
+        self.assertRegex(mock_stderr.getvalue(), r"not in the interval")
+
 
 if __name__ == "__main__":
     unittest.main()
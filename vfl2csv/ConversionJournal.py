@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import IO, Iterable, Optional, TypedDict
+
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+JOURNAL_DIRECTORY_NAME = "vfl2csv_journal"
+FINGERPRINT_FILE_NAME = "fingerprint"
+# count of buffered entries that triggers writing them before the end of the conversion
+JOURNAL_FLUSH_COUNT = 32
+
+logger = logging.getLogger(__name__)
+
+
+class JournalEntry(TypedDict):
+    key: str
+    # committed once the output files are moved into place, followed by converted, verification_failed or failed
+    status: str
+    # output files relative to the output directory
+    output_files: list[str]
+
+
+def journal_entry(key: str, output_files: Iterable[Path], status: str, output_dir: Path) -> JournalEntry:
+    """
+    Create the journal entry of a finished trial site.
+    :param key: Input data key, see `InputData.key`
+    :param output_files: Paths of all files created from the input data
+    :param status: committed, converted, verification_failed or failed
+    :param output_dir: Output directory the journal belongs to
+    """
+    return {
+        "key": key,
+        "status": status,
+        "output_files": [
+            Path(os.path.relpath(path.absolute(), output_dir.absolute())).as_posix() for path in output_files
+        ],
+    }
+
+
+class ConversionJournal:
+    def __init__(self, output_dir: Path, entries: Optional[dict[str, JournalEntry]] = None):
+        """
+        Record of the trial sites finished by previous attempts of a conversion into an output directory, used to resume
+        an interrupted conversion. Every worker process appends the entries of its trial sites to its own file in the
+        journal directory, see `JournalWriter`.
+        :param output_dir: Output directory the journal belongs to
+        :param entries: Entries of converted trial sites by input data key
+        """
+        self.output_dir = output_dir
+        self.entries: dict[str, JournalEntry] = entries if entries is not None else {}
+        # output files moved into place by previous attempts, by input data key
+        self.committed_files: dict[str, set[str]] = {}
+        # True if the journal of previous attempts was read to resume the conversion
+        self.resumed = False
+
+    @property
+    def directory(self) -> Path:
+        return self.output_dir / JOURNAL_DIRECTORY_NAME
+
+    @staticmethod
+    def start(output_dir: Path, fingerprint: str, resume: bool) -> ConversionJournal:
+        """
+        Prepare the journal of a conversion. A new conversion replaces the journal of previous conversions, a resumed
+        conversion reads it.
+        :param output_dir: Output directory
+        :param fingerprint: Fingerprint of the current settings, see `fingerprint.conversion_fingerprint`
+        :param resume: Resume the conversion recorded in the journal
+        :return: ConversionJournal instance, without entries unless a journal was found to resume the conversion
+        :raises IllegalConfigError: if the settings changed since the conversion to resume
+        """
+        journal = ConversionJournal(output_dir)
+        fingerprint_file = journal.directory / FINGERPRINT_FILE_NAME
+        if resume and fingerprint_file.is_file():
+            if fingerprint_file.read_text(encoding="utf-8") != fingerprint:
+                raise IllegalConfigError(
+                    "Configuration or column scheme changed since the interrupted conversion, it can't be resumed"
+                )
+            journal.read_entries()
+            journal.resumed = True
+            return journal
+        if resume:
+            logger.info(f"No journal found in {output_dir}, converting all input data")
+        shutil.rmtree(journal.directory, ignore_errors=True)
+        journal.directory.mkdir(parents=True)
+        fingerprint_file.write_text(fingerprint, encoding="utf-8")
+        return journal
+
+    def remove(self) -> None:
+        """
+        Remove the journal after the conversion completed, as there is nothing left to resume.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def read_entries(self) -> None:
+        """
+        Read the entries of all converted trial sites and all committed output files from the files of all processes.
+        A line truncated by an interrupted process is ignored.
+        """
+        self.entries = {}
+        self.committed_files = {}
+        for path in sorted(self.directory.glob("*.jsonl")):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry: JournalEntry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.committed_files.setdefault(entry["key"], set()).update(entry["output_files"])
+                    if entry["status"] == "converted":
+                        self.entries[entry["key"]] = entry
+
+    def is_completed(self, key: str) -> bool:
+        """
+        Check whether the input data with the given key was converted and all of its output files still exist.
+        :param key: Input data key, see `InputData.key`
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        return all((self.output_dir / output_file).is_file() for output_file in entry["output_files"])
+
+    def is_committed(self, key: str, path: Path) -> bool:
+        """
+        Check whether the given output file of the input data with the given key was moved into place by a previous
+        attempt of the conversion, as opposed to a file created by someone else.
+        :param key: Input data key, see `InputData.key`
+        :param path: Output file
+        """
+        relative_path = Path(os.path.relpath(path.absolute(), self.output_dir.absolute())).as_posix()
+        return relative_path in self.committed_files.get(key, ())
+
+
+class JournalWriter:
+    def __init__(self, output_dir: Path, fsync: bool):
+        """
+        Create a writer appending journal entries to the file of the current process. The file is kept open until the
+        writer is closed. Entries of finished trial sites are buffered and appended by `flush`, only the committed
+        output files are recorded right away, see `record_committed`.
+        :param output_dir: Output directory the journal belongs to
+        :param fsync: Sync the journal file after every flush
+        """
+        self.output_dir = output_dir
+        self.fsync = fsync
+        self.path = output_dir / JOURNAL_DIRECTORY_NAME / f"{os.getpid()}.jsonl"
+        self._entries: list[JournalEntry] = []
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    def _write(self, entries: list[JournalEntry]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+        self._file.flush()
+
+    def record_committed(self, key: str, output_files: Iterable[Path]) -> None:
+        """
+        Record output files right after they were moved into place, so that a resumed conversion knows which existing
+        files it may replace. The entry is handed to the operating system immediately, which survives a killed process,
+        but it is synced with the next flush only.
+        :param key: Input data key, see `InputData.key`
+        :param output_files: Output files moved into place
+        """
+        with self._lock:
+            self._write([journal_entry(key, output_files, "committed", self.output_dir)])
+
+    def append(self, entry: JournalEntry) -> bool:
+        """
+        Add an entry, which is written with the next flush.
+        :return: True if enough entries are buffered to flush them
+        """
+        with self._lock:
+            self._entries.append(entry)
+            return len(self._entries) >= JOURNAL_FLUSH_COUNT
+
+    def flush(self) -> None:
+        """
+        Append all buffered entries to the journal file at once and sync the file if requested.
+        """
+        with self._lock:
+            entries, self._entries = self._entries, []
+            if len(entries) != 0:
+                self._write(entries)
+            if self.fsync and self._file is not None:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """
+        Flush the buffered entries and close the journal file, which is opened again by the next entry.
+        """
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                file, self._file = self._file, None
+                file.close()
+
+
+_writers: dict[Path, JournalWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_journal_writer(output_dir: Path, fsync: bool) -> JournalWriter:
+    """
+    Return the journal writer of this process for the given output directory.
+    """
+    with _writers_lock:
+        writer = _writers.get(output_dir)
+        if writer is None or writer.fsync != fsync:
+            if writer is not None:
+                writer.close()
+            writer = JournalWriter(output_dir, fsync)
+            _writers[output_dir] = writer
+        return writer
+
+
+def close_journal_writers() -> None:
+    """
+    Append the buffered entries of all journal writers of this process and close their files at the end of a
+    conversion.
+    """
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
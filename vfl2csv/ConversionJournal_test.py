@@ -0,0 +1,81 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from vfl2csv.ConversionJournal import (
+    JOURNAL_DIRECTORY_NAME,
+    JOURNAL_FLUSH_COUNT,
+    ConversionJournal,
+    JournalWriter,
+    journal_entry,
+)
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+
+class ConversionJournalTest(unittest.TestCase):
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = Path(tmp)
+            journal = ConversionJournal.start(output_dir, "fingerprint", resume=False)
+            self.assertFalse(journal.resumed)
+            output_files = [output_dir / "a.csv", output_dir / "a_metadata.txt"]
+            for output_file in output_files:
+                output_file.touch()
+            writer = JournalWriter(output_dir, fsync=True)
+            writer.append(journal_entry("a", output_files, "converted", output_dir))
+            writer.append(journal_entry("b", [], "failed", output_dir))
+            writer.append(journal_entry("c", [output_dir / "c.csv"], "converted", output_dir))
+            writer.flush()
+            # an entry truncated by a killed process
+            with open(writer.path, "a", encoding="utf-8") as file:
+                file.write('{"key": "d", "sta')
+
+            journal = ConversionJournal.start(output_dir, "fingerprint", resume=True)
+            self.assertTrue(journal.resumed)
+            self.assertListEqual(journal.entries["a"]["output_files"], ["a.csv", "a_metadata.txt"])
+            self.assertTrue(journal.is_completed("a"))
+            self.assertFalse(journal.is_completed("b"))
+            # the output file of c was removed in the meantime
+            self.assertFalse(journal.is_completed("c"))
+            self.assertFalse(journal.is_completed("d"))
+
+            self.assertRaises(IllegalConfigError, ConversionJournal.start, output_dir, "other", resume=True)
+            # a new conversion replaces the journal
+            journal = ConversionJournal.start(output_dir, "other", resume=False)
+            self.assertListEqual(list((output_dir / JOURNAL_DIRECTORY_NAME).glob("*.jsonl")), [])
+
+    def test_committed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = Path(tmp)
+            ConversionJournal.start(output_dir, "fingerprint", resume=False)
+            writer = JournalWriter(output_dir, fsync=False)
+            writer.record_committed("a", [output_dir / "a.csv"])
+            # committed files are recorded without waiting for the next flush
+            self.assertEqual(len(writer.path.read_text(encoding="utf-8").splitlines()), 1)
+            writer.close()
+
+            journal = ConversionJournal.start(output_dir, "fingerprint", resume=True)
+            self.assertFalse(journal.is_completed("a"))
+            self.assertTrue(journal.is_committed("a", output_dir / "a.csv"))
+            self.assertFalse(journal.is_committed("a", output_dir / "a_metadata.txt"))
+            self.assertFalse(journal.is_committed("b", output_dir / "a.csv"))
+
+    def test_resume_without_journal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = ConversionJournal.start(Path(tmp), "fingerprint", resume=True)
+            self.assertFalse(journal.resumed)
+            self.assertTrue(journal.directory.is_dir())
+
+    def test_flush_in_batches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = JournalWriter(Path(tmp), fsync=False)
+            for index in range(JOURNAL_FLUSH_COUNT - 1):
+                self.assertFalse(writer.append(journal_entry(str(index), [], "converted", Path(tmp))))
+            self.assertTrue(writer.append(journal_entry("last", [], "converted", Path(tmp))))
+            self.assertFalse(writer.path.exists())
+            writer.flush()
+            self.assertEqual(len(writer.path.read_text(encoding="utf-8").splitlines()), JOURNAL_FLUSH_COUNT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Optional, TypedDict
+
+from vfl2csv.fingerprint import file_digest
+from vfl2csv.input.InputData import InputData
+
+MANIFEST_FILE_NAME = "vfl2csv_manifest.json"
+MANIFEST_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestEntry(TypedDict):
+    input_path: str
+    sheet_name: Optional[str]
+    size: int
+    mtime_ns: int
+    content_hash: str
+    # output files relative to the output directory
+    output_files: list[str]
+    # False if the verification of the output files failed or was deferred to a separate audit. Unverified entries
+    # are not converted again as long as their input and output files are unchanged, an audit updates the flag.
+    verified: bool
+
+
+class ConversionManifest:
+    def __init__(
+            self,
+            output_dir: Path,
+            fingerprint: str,
+            entries: Optional[dict[str, ManifestEntry]] = None,
+    ):
+        """
+        Record of converted input data in an output directory, used for incremental conversions.
+        Every entry stores the state of an input file at the time of its conversion as well as the output files created
+        from it.
+        :param output_dir: Output directory the manifest belongs to
+        :param fingerprint: Fingerprint of all settings influencing converted files, see
+        `fingerprint.conversion_fingerprint`
+        :param entries: Manifest entries by input data key
+        """
+        self.output_dir = output_dir
+        self.fingerprint = fingerprint
+        self.entries: dict[str, ManifestEntry] = entries if entries is not None else {}
+        # entries of the previous conversion, even if it was created with different settings
+        self.previous_entries: dict[str, ManifestEntry] = dict(self.entries)
+        # file digests computed during this conversion, by file path
+        self._digests: dict[Path, str] = {}
+
+    @property
+    def path(self) -> Path:
+        return self.output_dir / MANIFEST_FILE_NAME
+
+    @staticmethod
+    def load(output_dir: Path, fingerprint: str) -> ConversionManifest:
+        """
+        Load the manifest of the output directory.
+        If there is no manifest yet or the manifest was created with different settings, an empty manifest is returned
+        and all input data is considered to be changed.
+        :param output_dir: Output directory
+        :param fingerprint: Fingerprint of the current settings
+        :return: ConversionManifest instance
+        """
+        manifest = ConversionManifest(output_dir, fingerprint)
+        if not manifest.path.is_file():
+            logger.info(f"No manifest found in {output_dir}, converting all input data")
+            return manifest
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            logger.warning(f"Failed to read manifest {manifest.path}, converting all input data")
+            return manifest
+        if content.get("version") != MANIFEST_VERSION or content.get("fingerprint") != fingerprint:
+            logger.info(
+                "Configuration or column scheme changed since the last conversion, converting all input data"
+            )
+        else:
+            manifest.entries = content["entries"]
+        # Outputs of the previous conversion are known regardless of the settings, so they can still be replaced
+        manifest.previous_entries = content.get("entries", {})
+        return manifest
+
+    def _digest(self, path: Path) -> str:
+        if path not in self._digests:
+            self._digests[path] = file_digest(path)
+        return self._digests[path]
+
+    def is_unchanged(self, input_data: InputData) -> bool:
+        """
+        Check whether the input data was converted before and neither its input file nor its output files changed
+        since then. The content hash is only computed if size or modification time of the input file differ.
+        The verification state of the entry is not taken into account, converting unchanged input data again would
+        create the same output files.
+        :param input_data: InputData object
+        :return: True if the input data does not need to be converted again
+        """
+        entry = self.entries.get(input_data.key())
+        if entry is None:
+            return False
+        if not all((self.output_dir / output_file).is_file() for output_file in entry["output_files"]):
+            return False
+        stat = input_data.file_path.stat()
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if self._digest(input_data.file_path) == entry["content_hash"]:
+            # the file was touched without changing its content
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return True
+        return False
+
+    def select_changed(self, input_data: Iterable[InputData]) -> list[InputData]:
+        """
+        Filter input data which is new or changed since the last conversion.
+        :param input_data: All input data
+        :return: Input data that needs to be converted
+        """
+        return [data for data in input_data if not self.is_unchanged(data)]
+
+    def discard(self, key: str) -> None:
+        """
+        Remove the output files of the input data with the given key as well as its manifest entry.
+        :param key: Input data key, see `InputData.key`
+        """
+        entry = self.entries.pop(key, None) or self.previous_entries.get(key)
+        if entry is None:
+            return
+        for output_file in entry["output_files"]:
+            path = self.output_dir / output_file
+            if path.is_file():
+                logger.info(f"Removing outdated output file {path}")
+                path.unlink()
+
+    def discard_orphans(self, input_data: Iterable[InputData]) -> list[str]:
+        """
+        Remove output files and entries of input data that no longer exists.
+        :param input_data: All current input data
+        :return: Keys of the removed entries
+        """
+        current_keys = {data.key() for data in input_data}
+        orphans = [
+            key
+            for key in set(self.entries) | set(self.previous_entries)
+            if key not in current_keys
+        ]
+        for key in orphans:
+            logger.info(f"Input {key} disappeared, removing its converted files")
+            self.discard(key)
+            self.previous_entries.pop(key, None)
+        return orphans
+
+    def record(
+            self, input_data: InputData, output_files: Iterable[Path], verified: bool = True
+    ) -> None:
+        """
+        Record the conversion of input data.
+        :param input_data: Converted InputData object
+        :param output_files: Paths of all files created from the input data
+        :param verified: Whether the verification of the output files succeeded
+        """
+        stat = input_data.file_path.stat()
+        self.entries[input_data.key()] = {
+            "input_path": str(input_data.file_path.absolute()),
+            "sheet_name": input_data.sheet_name,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "content_hash": self._digest(input_data.file_path),
+            "output_files": [
+                Path(os.path.relpath(path.absolute(), self.output_dir.absolute())).as_posix()
+                for path in output_files
+            ],
+            "verified": verified,
+        }
+
+    def set_verified(self, key: str, verified: bool) -> None:
+        """
+        Update the verification state of the entry with the given key after a separate audit, if there is such an entry.
+        :param key: Input data key, see `InputData.key`
+        :param verified: Whether the verification of the output files succeeded
+        """
+        if key in self.entries:
+            self.entries[key]["verified"] = verified
+
+    def save(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # write into a temporary file first to never leave a truncated manifest behind
+        temporary_path = self.path.with_suffix(".tmp")
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "fingerprint": self.fingerprint,
+                    "entries": self.entries,
+                },
+                file,
+                ensure_ascii=False,
+                indent=1,
+            )
+        os.replace(temporary_path, self.path)
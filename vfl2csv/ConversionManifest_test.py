@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from vfl2csv.ConversionManifest import ConversionManifest
+from vfl2csv.input.TsvInputFile import TsvInputFile
+from vfl2csv_base import test_config
+
+
+class ConversionManifestTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = Path(self.tmp_dir.name) / "input"
+        self.output_dir = Path(self.tmp_dir.name) / "output"
+        shutil.copytree(test_config["Input"].getpath("tsv_sample_input_dir"), self.input_dir)
+        self.output_dir.mkdir()
+        self.input_data = TsvInputFile.iterate_files(sorted(self.input_dir.glob("*.txt")))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def create_manifest(self, fingerprint: str = "fingerprint") -> ConversionManifest:
+        manifest = ConversionManifest.load(self.output_dir, fingerprint)
+        for index, input_data in enumerate(self.input_data):
+            output_file = self.output_dir / f"{index}.csv"
+            output_file.touch()
+            manifest.record(input_data, [output_file])
+        manifest.save()
+        return ConversionManifest.load(self.output_dir, fingerprint)
+
+    def test_unchanged(self):
+        manifest = self.create_manifest()
+        self.assertListEqual(manifest.select_changed(self.input_data), [])
+
+    def test_touched_without_changes(self):
+        manifest = self.create_manifest()
+        os.utime(self.input_data[0].file_path, ns=(0, 0))
+        self.assertListEqual(manifest.select_changed(self.input_data), [])
+
+    def test_changed_content(self):
+        manifest = self.create_manifest()
+        with open(self.input_data[0].file_path, "a") as file:
+            file.write("\n")
+        self.assertListEqual(manifest.select_changed(self.input_data), self.input_data[:1])
+
+    def test_missing_output(self):
+        manifest = self.create_manifest()
+        (self.output_dir / "1.csv").unlink()
+        self.assertListEqual(manifest.select_changed(self.input_data), self.input_data[1:2])
+
+    def test_unverified(self):
+        manifest = self.create_manifest()
+        manifest.record(self.input_data[2], [self.output_dir / "2.csv"], verified=False)
+        manifest.save()
+        manifest = ConversionManifest.load(self.output_dir, "fingerprint")
+        # unverified entries are not converted again, but stay unverified until they are audited
+        self.assertListEqual(manifest.select_changed(self.input_data), [])
+        self.assertFalse(manifest.entries[self.input_data[2].key()]["verified"])
+
+    def test_changed_fingerprint(self):
+        self.create_manifest()
+        manifest = ConversionManifest.load(self.output_dir, "other fingerprint")
+        self.assertListEqual(manifest.select_changed(self.input_data), self.input_data)
+        # outputs of the previous conversion can still be removed
+        manifest.discard(self.input_data[0].key())
+        self.assertFalse((self.output_dir / "0.csv").exists())
+
+    def test_discard_orphans(self):
+        manifest = self.create_manifest()
+        orphans = manifest.discard_orphans(self.input_data[1:])
+        self.assertListEqual(orphans, [self.input_data[0].key()])
+        self.assertFalse((self.output_dir / "0.csv").exists())
+        self.assertTrue((self.output_dir / "1.csv").exists())
+        self.assertNotIn(self.input_data[0].key(), manifest.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from configparser import ConfigParser
+from multiprocessing.pool import Pool
+from multiprocessing.synchronize import Barrier
+from typing import Any, Callable, Optional
+
+import vfl2csv
+from vfl2csv.fingerprint import configuration_fingerprint
+from vfl2csv_base.ColumnScheme import ColumnScheme
+
+logger = logging.getLogger(__name__)
+# barrier of all processes of the pool the current worker process belongs to
+_worker_barrier: Optional[Barrier] = None
+
+
+def initialize_worker(config: ConfigParser, column_scheme: ColumnScheme, barrier: Optional[Barrier] = None) -> None:
+    """
+    Install configuration and column scheme once per worker process.
+    """
+    global _worker_barrier
+    vfl2csv.setup.config = config
+    vfl2csv.setup.column_scheme = column_scheme
+    _worker_barrier = barrier
+
+
+def run_and_wait(function: Callable[[], Any]) -> Any:
+    """
+    Run a function in a worker process and wait until every worker of the pool ran it. A worker blocked at the barrier
+    can't pick up another task, so every worker runs exactly one of the tasks submitted by `run_in_every_worker`.
+    """
+    try:
+        return function()
+    finally:
+        _worker_barrier.wait()
+
+
+class WorkerPool:
+    def __init__(
+            self, process_count: int, config: ConfigParser, column_scheme: ColumnScheme
+    ):
+        """
+        Create a process pool whose workers are initialized with the given configuration and column scheme.
+        :param process_count: Count of worker processes
+        :param config: Configuration installed in every worker
+        :param column_scheme: Column scheme installed in every worker
+        """
+        self.process_count = process_count
+        self.fingerprint = configuration_fingerprint(config, column_scheme)
+        self.pool = Pool(
+            process_count,
+            initializer=initialize_worker,
+            initargs=(config, column_scheme, multiprocessing.Barrier(process_count)),
+        )
+
+    def run_in_every_worker(self, function: Callable[[], Any]) -> list[Any]:
+        """
+        Run a function exactly once in every worker process, e.g. to write output buffered by the workers.
+        :param function: Function without arguments, which must be picklable
+        :return: Results of all workers
+        """
+        return self.pool.map(run_and_wait, [function] * self.process_count, chunksize=1)
+
+    def is_compatible(
+            self, process_count: int, config: ConfigParser, column_scheme: ColumnScheme
+    ) -> bool:
+        """
+        Check whether this pool can be reused for a conversion with the given parameters.
+        """
+        return (
+                self.process_count >= process_count
+                and self.fingerprint == configuration_fingerprint(config, column_scheme)
+        )
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+
+
+_shared_pool: Optional[WorkerPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def configured_worker_count() -> int:
+    """
+    Return the maximal count of worker processes according to the configuration.
+    A value of 0 or a missing value in the configuration means one process per CPU thread.
+    """
+    workers = vfl2csv.setup.config["Multiprocessing"].getint("workers", 0)
+    return workers if workers > 0 else multiprocessing.cpu_count()
+
+
+def get_worker_pool(process_count: int) -> WorkerPool:
+    """
+    Return the shared worker pool, which is reused across conversions.
+    A new pool is only created if there is none yet, if the existing pool has fewer processes than required or if the
+    configuration or column scheme changed since the pool was created.
+    :param process_count: Count of processes required, capped by the configured count of workers
+    :return: WorkerPool instance
+    """
+    global _shared_pool
+    process_count = max(min(process_count, configured_worker_count()), 1)
+    with _shared_pool_lock:
+        if _shared_pool is not None and _shared_pool.is_compatible(
+                process_count, vfl2csv.setup.config, vfl2csv.setup.column_scheme
+        ):
+            return _shared_pool
+        if _shared_pool is not None:
+            _shared_pool.close()
+        logger.info(f"Starting {process_count} worker processes")
+        _shared_pool = WorkerPool(
+            process_count, vfl2csv.setup.config, vfl2csv.setup.column_scheme
+        )
+        return _shared_pool
+
+
+@atexit.register
+def shutdown_worker_pool() -> None:
+    """
+    Stop the worker processes of the shared pool, if any.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
@@ -0,0 +1,51 @@
+import os
+import unittest
+
+from vfl2csv import setup
+from vfl2csv.WorkerPool import (
+    configured_worker_count,
+    get_worker_pool,
+    shutdown_worker_pool,
+)
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.workers = setup.config["Multiprocessing"].get("workers", "0")
+        setup.config.set("Multiprocessing", "workers", "2")
+
+    def tearDown(self) -> None:
+        shutdown_worker_pool()
+        setup.config.set("Multiprocessing", "workers", self.workers)
+
+    def test_process_count_capped(self):
+        self.assertEqual(get_worker_pool(8).process_count, 2)
+        shutdown_worker_pool()
+        self.assertEqual(get_worker_pool(1).process_count, 1)
+
+    def test_reuse(self):
+        worker_pool = get_worker_pool(2)
+        self.assertIs(get_worker_pool(2), worker_pool)
+        # smaller pools are reused as well
+        self.assertIs(get_worker_pool(1), worker_pool)
+
+    def test_recreate_on_config_change(self):
+        worker_pool = get_worker_pool(1)
+        self.assertIsNot(get_worker_pool(2), worker_pool)
+        worker_pool = get_worker_pool(2)
+        setup.config.set("Multiprocessing", "workers", "3")
+        self.assertIsNot(get_worker_pool(2), worker_pool)
+
+    def test_initializer(self):
+        worker_pool = get_worker_pool(2)
+        # the configuration is installed in the workers by the pool initializer
+        self.assertEqual(worker_pool.pool.apply(configured_worker_count), 2)
+
+    def test_run_in_every_worker(self):
+        worker_pool = get_worker_pool(2)
+        for _ in range(2):
+            self.assertEqual(len(set(worker_pool.run_in_every_worker(os.getpid))), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,16 +16,61 @@ input_format = TSV
 input_file_extension = txt
 # expect python codec name (https://docs.python.org/3/library/codecs.html#standard-encodings)
 tsv_encoding = iso8859_15
+# parser for TSV files: c for the pandas C engine or pyarrow for the multithreaded pyarrow CSV reader
+parse_engine = c
 directory_search_recursively = true
 
 [Output]
 metadata_output_pattern = {revier}/{versuch}/{versuch}-{parzelle}_metadata.txt
 # csv output pattern directory must be same or sub directory of metadata path
 csv_output_pattern = {revier}/{versuch}/{versuch}-{parzelle}.csv
+# format of data files: csv, parquet or feather (parquet and feather require pyarrow)
+# for parquet and feather, the suffix of csv_output_pattern is replaced with .parquet or .feather
+data_format = csv
+# compression of CSV files: none, gzip, bz2, xz or zstd (requires zstandard), files are compressed while they are
+# written and the suffix of the compression (.gz, .bz2, .xz, .zst) is appended to csv_output_pattern
+compression = none
+# compression level, the default level of the compression if empty (gzip and bz2: 1-9, xz: 0-9, zstd: 1-22)
+compression_level =
+# writer of CSV files: pandas or fast to format whole columns at once, both write identical files
+csv_writer = pandas
+# destination of converted trial sites: files for a data and a metadata file per trial site according to the
+# output patterns, dataset to append all trial sites to one Parquet dataset partitioned by Revier and Versuch in
+# the long format with one metadata table, written in batches per worker process (requires pyarrow),
+# sqlite to insert all trial sites into the database vfl2csv.sqlite with a sites and a long format measurements
+# table, written in batches into one database per worker process, which are merged after the conversion
+sink = files
+# output files are written into a staging directory and moved into place once complete; sync them to disk:
+# file before moving every file into place, batch every 32 trial sites per process and at the end of the
+# conversion, none to leave it to the system
+fsync = none
+# only convert input data that is new or changed since the last conversion into the output directory
+incremental = false
+# verification of converted files: cells to compare every cell, digest to compare column digests only;
+# with the dataset and sqlite sinks, the converted data is verified before it is written
+verification = cells
+# skip the verification during the conversion, converted files can be verified later using `vfl2csv audit`
+defer_audit = false
 
 [Multiprocessing]
 enabled = true
+# maximal count of worker processes, 0 for one process per CPU thread
+workers = 0
 sheets_per_core = 32
+# overlap reading, converting and writing of consecutive trial sites within each process using threads
+pipeline = false
+# maximal count of trial sites waiting to be converted or written per process
+pipeline_queue_size = 2
+# count of trial sites handed to a worker process at once if the pipeline is enabled
+pipeline_batch_size = 8
+
+[Cache]
+# keep parsed input data on disk to skip parsing unchanged input files in subsequent runs (requires pyarrow)
+enabled = false
+# cache directory, defaults to ~/.cache/vfl2csv if empty
+directory =
+# least recently used entries are removed if the cache exceeds this size
+max_size_mb = 1024
 """
 
 
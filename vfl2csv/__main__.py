@@ -3,7 +3,8 @@ import sys
 import traceback
 
 import vfl2csv
-from vfl2csv.ArgumentParser import parser
+from vfl2csv.ArgumentParser import audit_parser, parser
+from vfl2csv.audit import run_audit
 from vfl2csv.batch_converter import run
 from vfl2csv.exceptions import VerificationException, ConversionException
 
@@ -11,6 +12,8 @@ logger = logging.getLogger(__name__)
 
 
 def start(args):
+    if len(args) > 0 and args[0] == "audit":
+        return start_audit(args[1:])
     arguments = vars(parser.parse_args(args))
     if "config" in arguments or "column_scheme" in arguments:
         vfl2csv.set_custom_configs(
@@ -18,7 +21,14 @@ def start(args):
             column_scheme_path=arguments["column_scheme"],
         )
     try:
-        run(arguments["output"], arguments["input"], on_progress=None)
+        run(
+            arguments["output"],
+            arguments["input"],
+            on_progress=None,
+            incremental=arguments["incremental"],
+            defer_audit=arguments["defer_audit"],
+            resume=arguments["resume"],
+        )
     except (ConversionException, VerificationException) as _:
         logger.warning("Failed to convert files")
         logger.warning(traceback.format_exc())
@@ -28,5 +38,25 @@ def start(args):
     return 0
 
 
+def start_audit(args):
+    arguments = vars(audit_parser.parse_args(args))
+    vfl2csv.set_custom_configs(
+        config_path=arguments["config"],
+        column_scheme_path=arguments["column_scheme"],
+    )
+    summary = run_audit(
+        arguments["output"],
+        arguments["input"],
+        sample=arguments["sample"],
+        seed=arguments["seed"],
+        result_file=arguments["result"],
+    )
+    if summary["failed_count"] != 0:
+        logger.warning(f'Verification of {summary["failed_count"]} trial sites failed')
+        return 1
+    logger.info("Done")
+    return 0
+
+
 if __name__ == "__main__":
     sys.exit(start(sys.argv[1:]))
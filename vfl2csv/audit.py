@@ -0,0 +1,206 @@
+import json
+import logging
+import math
+import random
+from pathlib import Path
+from typing import Callable, Optional, TypedDict
+
+from tests.ConversionAuditor import VerificationException
+from vfl2csv import setup
+from vfl2csv.ConversionManifest import ConversionManifest, MANIFEST_FILE_NAME
+from vfl2csv.WorkerPool import get_worker_pool
+from vfl2csv.batch_converter import (
+    OutputPlan,
+    data_output_file_pattern,
+    find_input_data,
+    get_auditor,
+    plan_output_files,
+    release_auditor,
+    required_process_count,
+    schedule_batches,
+)
+from vfl2csv.fingerprint import conversion_fingerprint
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+logger = logging.getLogger(__name__)
+
+
+class AuditResult(TypedDict):
+    input: str
+    key: str
+    metadata_file: Optional[str]
+    passed: bool
+    # summary of the failed verification
+    message: Optional[str]
+
+
+class AuditSummary(TypedDict):
+    output_dir: str
+    sample: float
+    seed: Optional[int]
+    total_count: int
+    # count of trial sites whose converted files were verified, excluding trial sites that are not sampled or whose
+    # converted files can't be determined
+    audited_count: int
+    # count of trial sites whose converted files can't be determined, which fail without being verified
+    rejected_count: int
+    failed_count: int
+    results: list[AuditResult]
+
+
+# noinspection PyBroadException
+def audit_trial_site(plan: OutputPlan) -> AuditResult:
+    """
+    Verify the converted files of a single trial site against its input.
+    In worker processes, configuration and column scheme are installed by the pool initializer.
+    @param plan: Output plan of the trial site, determining the location of its converted files
+    @return: Result of the verification
+    """
+    result: AuditResult = {
+        "input": str(plan.input_data),
+        "key": plan.input_data.key(),
+        "metadata_file": str(plan.metadata_output_file),
+        "passed": True,
+        "message": None,
+    }
+    try:
+        if not plan.metadata_output_file.is_file():
+            raise VerificationException(f"Converted file {plan.metadata_output_file} does not exist")
+        get_auditor().audit_converted_trial_site(
+            plan.input_data.file_path,
+            plan.input_data.sheet_name,
+            plan.metadata_output_file,
+        )
+    except Exception as exc:
+        result["passed"] = False
+        result["message"] = f"{type(exc).__name__}: {exc}"
+    return result
+
+
+def audit_batch(plans: list[OutputPlan]) -> list[AuditResult]:
+    """
+    Verify a batch of trial sites in a worker process of the shared `WorkerPool`.
+    @param plans: Output plans of the trial sites, see `batch_converter.schedule_batches`
+    @return: Results of the verifications
+    """
+    results = [audit_trial_site(plan) for plan in plans]
+    # the batch contains all sampled sheets of its workbooks that were assigned to this process
+    release_auditor()
+    return results
+
+
+def run_audit(
+        output_dir: Path,
+        input_path: str | Path | list[str | Path],
+        sample: float = 1.0,
+        seed: Optional[int] = None,
+        result_file: Optional[Path] = None,
+        on_progress: Optional[Callable[[Optional[str]], None]] = None,
+) -> AuditSummary:
+    """
+    Verify an existing output directory against the input data it was converted from, independently of the
+    conversion. Trial sites are verified in parallel using the shared worker pool.
+    If the output directory contains a manifest of an incremental conversion, the verification state of all audited
+    trial sites is updated.
+    :param output_dir: Output directory of a previous conversion
+    :param input_path: List of file or directories to search for input files. See batch_converter.find_input_data()
+    :param sample: Fraction of randomly chosen trial sites to verify, 1 to verify all trial sites
+    :param seed: Seed for choosing the sample
+    :param result_file: Optional path of a JSON file the summary is written to. Without a result file, only failed
+    trial sites and the summary are logged, the output directory is never written to except for its manifest.
+    :param on_progress: Optional callback that is invoked after every verified trial site
+    :return: Summary of the audit
+    """
+    if not 0 < sample <= 1:
+        raise ValueError(f"Sample fraction must be in the interval (0, 1], got {sample}")
+    if setup.config["Output"].get("sink", "files") != "files":
+        raise IllegalConfigError(
+            "Audits require the `files` output sink, other sinks are verified during the conversion"
+        )
+    input_files, input_trial_sites = find_input_data(input_path)
+    logger.info(
+        f"Found {len(input_trial_sites)} trial sites in {len(input_files)} "
+        f'{setup.config["Input"]["input_format"]} files'
+    )
+    plans, rejected = plan_output_files(
+        input_trial_sites,
+        output_dir / data_output_file_pattern(),
+        output_dir / setup.config["Output"].getpath("metadata_output_pattern"),
+    )
+    planned_trial_sites = {id(plan.input_data) for plan in plans}
+    # trial sites whose output files can't be determined fail immediately
+    results: list[AuditResult] = [
+        {
+            "input": str(input_data),
+            "key": input_data.key(),
+            "metadata_file": None,
+            "passed": False,
+            "message": f"{type(exception).__name__}: {exception}",
+        }
+        for input_data, exception in zip(
+            [data for data in input_trial_sites if id(data) not in planned_trial_sites],
+            rejected["exceptions"],
+        )
+    ]
+
+    if sample < 1:
+        sampled = set(random.Random(seed).sample(range(len(plans)), k=math.ceil(len(plans) * sample)))
+        # keep the input order, so that the sheets of a workbook are audited one after another
+        plans = [plan for index, plan in enumerate(plans) if index in sampled]
+    logger.info(f"Auditing {len(plans)} trial sites in {output_dir}")
+
+    process_count = required_process_count(len(plans))
+    if process_count > 1:
+        worker_pool = get_worker_pool(process_count)
+        logger.info(f"{worker_pool.process_count} processes are going to be used")
+        # trial sites of the same input file are handed out together, so that a workbook is opened only once
+        audited = (
+            result
+            for results in worker_pool.pool.imap_unordered(
+                audit_batch, schedule_batches(plans, worker_pool.process_count, 1)
+            )
+            for result in results
+        )
+    else:
+        audited = map(audit_trial_site, plans)
+    rejected_count = len(results)
+    for result in audited:
+        if not result["passed"]:
+            logger.warning(f'Verification of trial site `{result["input"]}` failed: {result["message"]}')
+        results.append(result)
+        if on_progress is not None:
+            on_progress(result["input"])
+    if process_count <= 1:
+        release_auditor()
+
+    summary: AuditSummary = {
+        "output_dir": str(output_dir),
+        "sample": sample,
+        "seed": seed,
+        "total_count": len(input_trial_sites),
+        "audited_count": len(results) - rejected_count,
+        "rejected_count": rejected_count,
+        "failed_count": sum(1 for result in results if not result["passed"]),
+        "results": results,
+    }
+    if result_file is not None:
+        with open(result_file, "w", encoding="utf-8") as file:
+            json.dump(summary, file, ensure_ascii=False, indent=1)
+
+    if (output_dir / MANIFEST_FILE_NAME).is_file():
+        manifest = ConversionManifest.load(
+            output_dir, conversion_fingerprint(setup.config, setup.column_scheme)
+        )
+        # a manifest created with different settings does not describe the audited files
+        if len(manifest.entries) != 0:
+            for result in results:
+                manifest.set_verified(result["key"], result["passed"])
+            manifest.save()
+
+    logger.info(
+        f'Audited {summary["audited_count"]} of {summary["total_count"]} trial sites, '
+        f'{summary["failed_count"] - rejected_count} failed'
+        + (f', {rejected_count} could not be audited' if rejected_count != 0 else "")
+        + (f". Results are written to {result_file}" if result_file is not None else "")
+    )
+    return summary
@@ -0,0 +1,100 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from vfl2csv import setup
+from vfl2csv.ConversionManifest import ConversionManifest
+from vfl2csv.audit import run_audit
+from vfl2csv.batch_converter import run
+from vfl2csv.fingerprint import conversion_fingerprint
+from vfl2csv_base import test_config
+from vfl2csv_base.ColumnScheme import ColumnScheme
+
+
+class AuditTest(unittest.TestCase):
+    def setUp(self) -> None:
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        setup.config.set("Multiprocessing", "enabled", "false")
+        self.column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = Path(self.tmp_dir.name) / "input"
+        self.output_dir = Path(self.tmp_dir.name) / "output"
+        shutil.copytree(test_config["Input"].getpath("tsv_sample_input_dir"), self.input_dir)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+        setup.column_scheme = self.column_scheme
+        setup.config.set("Multiprocessing", "enabled", "true")
+
+    def test_audit(self):
+        report = run(self.output_dir, self.input_dir, None, defer_audit=True)
+        output_files = set(self.output_dir.rglob("*"))
+        summary = run_audit(self.output_dir, self.input_dir)
+        self.assertEqual(summary["total_count"], 6)
+        self.assertEqual(summary["audited_count"], 6)
+        self.assertEqual(summary["failed_count"], 0)
+        # the audited output directory is left untouched
+        self.assertSetEqual(set(self.output_dir.rglob("*")), output_files)
+
+        # tamper with the converted data of one trial site
+        data_file = next(iter(report["output_files"].values()))[0]
+        data_file.write_text(data_file.read_text(encoding="utf-8").replace("NA", "0", 1), encoding="utf-8")
+        summary = run_audit(self.output_dir, self.input_dir)
+        self.assertEqual(summary["failed_count"], 1)
+
+        # missing converted files are reported as well
+        data_file.unlink()
+        summary = run_audit(self.output_dir, [self.input_dir])
+        self.assertEqual(summary["failed_count"], 1)
+
+    def test_audit_multiprocessing(self):
+        run(self.output_dir, self.input_dir, None, defer_audit=True)
+        setup.config.set("Multiprocessing", "enabled", "true")
+        setup.config.set("Multiprocessing", "sheets_per_core", "1")
+        try:
+            summary = run_audit(self.output_dir, self.input_dir)
+        finally:
+            setup.config.set("Multiprocessing", "sheets_per_core", "32")
+        self.assertEqual(summary["audited_count"], 6)
+        self.assertEqual(summary["failed_count"], 0)
+
+    def test_audit_rejected_input(self):
+        run(self.output_dir, self.input_dir, None, defer_audit=True)
+        # input data whose converted files can't be determined fails without being audited
+        (self.input_dir / "broken.txt").write_text("no trial site", encoding="utf-8")
+        summary = run_audit(self.output_dir, self.input_dir)
+        self.assertEqual(summary["total_count"], 7)
+        self.assertEqual(summary["audited_count"], 6)
+        self.assertEqual(summary["rejected_count"], 1)
+        self.assertEqual(summary["failed_count"], 1)
+
+    def test_audit_sample(self):
+        run(self.output_dir, self.input_dir, None, defer_audit=True)
+        result_file = Path(self.tmp_dir.name) / "result.json"
+        summary = run_audit(self.output_dir, self.input_dir, sample=0.5, seed=1, result_file=result_file)
+        self.assertEqual(summary["audited_count"], 3)
+        with open(result_file, "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["audited_count"], 3)
+        self.assertRaises(ValueError, run_audit, self.output_dir, self.input_dir, sample=0)
+
+    def test_audit_updates_manifest(self):
+        run(self.output_dir, self.input_dir, None, incremental=True, defer_audit=True)
+        fingerprint = conversion_fingerprint(setup.config, setup.column_scheme)
+        manifest = ConversionManifest.load(self.output_dir, fingerprint)
+        self.assertFalse(any(entry["verified"] for entry in manifest.entries.values()))
+
+        run_audit(self.output_dir, self.input_dir)
+        manifest = ConversionManifest.load(self.output_dir, fingerprint)
+        self.assertTrue(all(entry["verified"] for entry in manifest.entries.values()))
+        # verified trial sites are not converted again
+        self.assertEqual(run(self.output_dir, self.input_dir, None, incremental=True)["total_count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,24 +1,63 @@
 import logging
 import multiprocessing
-from collections import Counter
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from configparser import ConfigParser
-from multiprocessing import RLock, Pool
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TypedDict, Optional, Callable
-
-import numpy as np
+from typing import TypedDict, Optional, Callable, Iterator
 
 import vfl2csv
 from tests.ConversionAuditor import ConversionAuditor, VerificationException
 from vfl2csv import setup
+from vfl2csv.ConversionJournal import (
+    ConversionJournal,
+    JournalWriter,
+    close_journal_writers,
+    get_journal_writer,
+    journal_entry,
+)
+from vfl2csv.ConversionManifest import ConversionManifest
+from vfl2csv.WorkerPool import get_worker_pool
+from vfl2csv.exceptions import OutputCollisionError, OutputExistsError
+from vfl2csv.fingerprint import conversion_fingerprint
 from vfl2csv.input.ExcelInputSheet import ExcelInputSheet
+from vfl2csv.input.ExcelWorkbook import release_workbooks
 from vfl2csv.input.InputData import InputData
 from vfl2csv.input.TsvInputFile import TsvInputFile
+from vfl2csv.output.DatasetWriter import (
+    MEASUREMENTS_DIRECTORY,
+    SITES_DIRECTORY,
+    check_dataset_support,
+    flush_dataset_writers,
+    get_dataset_writer,
+)
+from vfl2csv.output.OutputCommitter import (
+    flush_output_committers,
+    get_output_committer,
+    remove_staging_directory,
+    validate_fsync_policy,
+)
+from vfl2csv.output.SqliteWriter import (
+    DATABASE_FILE_NAME,
+    PART_FILE_PATTERN,
+    flush_sqlite_writers,
+    get_sqlite_writer,
+    merge_databases,
+)
 from vfl2csv.output.TrialSiteConverter import TrialSiteConverter
 from vfl2csv_base.ColumnScheme import ColumnScheme
-from vfl2csv_base.exceptions.IOErrors import FileSavingError
+from vfl2csv_base.TrialSite import TrialSite
+from vfl2csv_base.data_formats import (
+    data_output_pattern,
+    validate_compression,
+    validate_csv_writer,
+    validate_data_format,
+)
+from vfl2csv_base.exceptions.IOErrors import FileSavingError, IllegalConfigError
 
 CONFIG_ALLOWED_INPUT_FORMATS = ("TSV", "Excel")
+CONFIG_ALLOWED_OUTPUT_SINKS = ("files", "dataset", "sqlite")
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +65,10 @@ class Report(TypedDict):
     total_count: int
     exceptions: list[Exception]
     metadata_output_files: list[Path]
+    # all files created from an input, by input data key
+    output_files: dict[str, list[Path]]
+    # summaries of failed verifications of converted trial sites, by input data key
+    verification_failures: dict[str, str]
 
 
 def find_input_data(
@@ -72,30 +115,443 @@ def find_input_data(
     return input_files, input_data
 
 
+def empty_report() -> Report:
+    return {
+        "total_count": 0,
+        "exceptions": [],
+        "metadata_output_files": [],
+        "output_files": {},
+        "verification_failures": {},
+    }
+
+
+def merge_reports(target: Report, report: Report) -> None:
+    """
+    Add the results of `report` to `target`.
+    @param target: Report to update
+    @param report: Report to merge into `target`
+    """
+    target["total_count"] += report["total_count"]
+    target["exceptions"].extend(report["exceptions"])
+    target["metadata_output_files"].extend(report["metadata_output_files"])
+    target["output_files"].update(report["output_files"])
+    target["verification_failures"].update(report["verification_failures"])
+
+
+def data_output_file_pattern() -> Path:
+    """
+    Return the configured output pattern of data files with the suffix of the configured data format and, for
+    compressed data files, the suffix of the configured compression.
+    @return: Output pattern of data files, relative to the output directory
+    """
+    data_format = setup.config["Output"].get("data_format", "csv")
+    validate_data_format(data_format)
+    compression = setup.config["Output"].get("compression", "none")
+    validate_compression(compression, data_format)
+    validate_csv_writer(setup.config["Output"].get("csv_writer", "pandas"))
+    if setup.config["Output"].get("sink", "files") != "files":
+        # compression only applies to data files
+        compression = "none"
+    return Path(data_output_pattern(setup.config["Output"]["csv_output_pattern"], data_format, compression))
+
+
+def check_output_sink(output_dir: Path) -> str:
+    """
+    Determine the destination of converted trial sites according to the `sink` option and verify that it can be
+    written to the output directory.
+    @param output_dir: Output directory
+    @return: Name of the sink
+    @raise IllegalConfigError: if the sink is unknown or not supported
+    @raise OutputExistsError: if the output directory already contains a dataset or database
+    """
+    sink = setup.config["Output"].get("sink", "files")
+    if sink not in CONFIG_ALLOWED_OUTPUT_SINKS:
+        raise IllegalConfigError(f'`sink` must be one of {", ".join(CONFIG_ALLOWED_OUTPUT_SINKS)}')
+    validate_fsync_policy(setup.config["Output"].get("fsync", "none"))
+    # like output files, an existing dataset or database is never appended to or overwritten
+    if sink == "dataset":
+        check_dataset_support()
+        for directory in (output_dir / MEASUREMENTS_DIRECTORY, output_dir / SITES_DIRECTORY):
+            if directory.exists():
+                raise OutputExistsError(directory)
+    elif sink == "sqlite":
+        if (output_dir / DATABASE_FILE_NAME).exists():
+            raise OutputExistsError(output_dir / DATABASE_FILE_NAME)
+        # databases of the processes of an interrupted conversion would be merged into the new database otherwise
+        for part in output_dir.glob(PART_FILE_PATTERN):
+            part.unlink()
+    else:
+        # output files of trial sites whose conversion was interrupted before they were moved into place
+        remove_staging_directory(output_dir)
+    return sink
+
+
+def input_size(input_data: InputData) -> int:
+    """
+    Estimate the conversion cost of input data by the size of its input file.
+    @param input_data: InputData object
+    @return: File size in bytes, or 0 if the file can't be accessed
+    """
+    try:
+        return input_data.file_path.stat().st_size
+    except OSError:
+        return 0
+
+
+@dataclass
+class OutputPlan:
+    """
+    Input data together with the paths of its output files, determined before the conversion.
+    """
+    input_data: InputData
+    data_output_file: Path
+    metadata_output_file: Path
+    # verify the output files right after writing them, unless the audit is deferred
+    verify: bool = True
+    # destination of the trial site, see `check_output_sink`
+    sink: str = "files"
+    # output directory of sinks collecting all trial sites in a single dataset or database
+    output_directory: Optional[Path] = None
+
+
+@dataclass
+class PreparedOutput:
+    """
+    Converted trial site ready to be written.
+    """
+    plan: OutputPlan
+    converter: TrialSiteConverter
+
+
+def plan_output_files(
+        input_trial_sites: list[InputData],
+        output_data_pattern: Path,
+        output_metadata_pattern: Path,
+        verify: bool = True,
+        sink: str = "files",
+        output_directory: Optional[Path] = None,
+) -> tuple[list[OutputPlan], Report]:
+    """
+    Determine the output files of all input data from their metadata and reject input data whose output files collide
+    with the output files of previous input data, before any trial site is converted.
+    Only the metadata of the input data is read, see `InputData.read_metadata`.
+    @param input_trial_sites: List of `InputData` objects
+    @param output_data_pattern: Pattern for storing data files
+    @param output_metadata_pattern: Pattern for storing metadata files
+    @param verify: Verify the output files right after the conversion of each trial site
+    @param sink: Destination of the trial sites. If it is not `files`, the trial sites are collected in the output
+    directory instead of writing the output files. The output files are determined anyway to detect trial sites with
+    the same metadata.
+    @param output_directory: Output directory, required unless the sink is `files`
+    @return: Output plans of all accepted input data, report of the rejected input data
+    """
+    plans = []
+    rejected = empty_report()
+    # input data by output file
+    claimed_files: dict[Path, InputData] = {}
+    try:
+        for input_data in input_trial_sites:
+            try:
+                trial_site = TrialSite(
+                    None, TrialSiteConverter.trimmed_metadata(input_data.read_metadata())
+                )
+                plan = OutputPlan(
+                    input_data,
+                    trial_site.replace_metadata_keys(output_data_pattern),
+                    trial_site.replace_metadata_keys(output_metadata_pattern),
+                    verify,
+                    sink,
+                    output_directory,
+                )
+                output_files = (plan.data_output_file.absolute(), plan.metadata_output_file.absolute())
+                for output_file in output_files:
+                    if output_file in claimed_files:
+                        raise OutputCollisionError(output_file, claimed_files[output_file], input_data)
+                if output_files[0] == output_files[1]:
+                    raise OutputCollisionError(output_files[0], input_data, input_data)
+            except Exception as exc:
+                merge_reports(rejected, failed_report(input_data, exc, logger))
+                continue
+            claimed_files.update(dict.fromkeys(output_files, input_data))
+            plans.append(plan)
+    finally:
+        # workbooks loaded to read metadata are not kept in this process, nor inherited by forked worker processes
+        release_workbooks()
+    return plans, rejected
+
+
+def parse_input_data(input_data: InputData, process_logger: logging.Logger) -> TrialSite:
+    """
+    Read and parse a single trial site.
+    @param input_data: `InputData` object to parse
+    @param process_logger: Logger of the current process
+    @return: Parsed trial site
+    """
+    process_logger.info(f"Converting input {str(input_data)}")
+    return input_data.parse()
+
+
+def prepare_output(plan: OutputPlan, trial_site: TrialSite) -> PreparedOutput:
+    """
+    Convert a parsed trial site.
+    @param plan: Output plan of the input data the trial site was parsed from
+    @param trial_site: Parsed trial site
+    @return: Converted trial site ready to be written
+    """
+    converter = TrialSiteConverter(trial_site, plan.input_data.file_path)
+    converter.refactor_dataframe()
+    converter.trim_metadata()
+    converter.trial_site.metadata["DataFrame"] = str(
+        plan.data_output_file.absolute().relative_to(
+            plan.metadata_output_file.parent.absolute()
+        )
+    )
+    return PreparedOutput(plan, converter)
+
+
+def write_output(prepared: PreparedOutput) -> Report:
+    """
+    Write the output files of a converted trial site.
+    @param prepared: Converted trial site
+    @return: report of the conversion containing the output files
+    """
+    plan = prepared.plan
+    if plan.sink != "files":
+        # the trial site is written with the next flush of the writer of this process
+        if plan.sink == "dataset":
+            get_dataset_writer(plan.output_directory, setup.column_scheme).append(prepared.converter.trial_site)
+        else:
+            get_sqlite_writer(plan.output_directory, setup.column_scheme).append(
+                prepared.converter.trial_site,
+                plan.data_output_file.relative_to(plan.output_directory).with_suffix("").as_posix(),
+                plan.input_data.key(),
+            )
+        report = empty_report()
+        report["total_count"] = 1
+        report["output_files"][plan.input_data.key()] = []
+        return report
+
+    # Both files are written into the staging directory and moved into place once both are complete, so that an
+    # interrupted conversion leaves no partial output files behind. Existing files are never overwritten.
+    targets = [plan.data_output_file, plan.metadata_output_file]
+    committer = get_output_committer(
+        plan.output_directory if plan.output_directory is not None else plan.metadata_output_file.parent,
+        setup.config["Output"].get("fsync", "none"),
+    )
+    staged = committer.stage(targets)
+    try:
+        try:
+            prepared.converter.write_data(staged[0])
+        except OSError as error:
+            raise FileSavingError(plan.data_output_file) from error
+        try:
+            prepared.converter.write_metadata(staged[1])
+        except OSError as error:
+            raise FileSavingError(plan.metadata_output_file) from error
+        committer.commit(staged, targets)
+    finally:
+        committer.discard(staged)
+    journal = plan_journal(plan)
+    if journal is not None:
+        # recorded right away, so that a resumed conversion can tell these files from files created by someone else
+        journal.record_committed(plan.input_data.key(), targets)
+
+    report = empty_report()
+    report["total_count"] = 1
+    report["metadata_output_files"].append(plan.metadata_output_file)
+    report["output_files"][plan.input_data.key()] = [
+        plan.data_output_file,
+        plan.metadata_output_file,
+    ]
+    return report
+
+
+_auditor: Optional[ConversionAuditor] = None
+
+
+def get_auditor() -> ConversionAuditor:
+    """
+    Return the auditor of this process for the current configuration and column scheme. The auditor keeps the
+    reference workbook of the last verified trial site open for the next sheets of the same workbook until it is
+    released, see `release_auditor`.
+    """
+    global _auditor
+    if _auditor is None or _auditor.config is not setup.config or _auditor.column_scheme is not setup.column_scheme:
+        release_auditor()
+        _auditor = ConversionAuditor(vfl2csv_config=setup.config, column_scheme=setup.column_scheme)
+    return _auditor
+
+
+def release_auditor() -> None:
+    """
+    Close the reference workbook kept open by the auditor of this process.
+    """
+    if _auditor is not None:
+        _auditor.close()
+
+
+def verify_output(
+        report: Report,
+        plan: OutputPlan,
+        process_logger: logging.Logger,
+        trial_site: Optional[TrialSite] = None,
+) -> Report:
+    """
+    Verify the converted files of a trial site against its input right after they were written.
+    Only a summary of a failed verification is added to the report, the reference data is discarded immediately.
+    @param report: Report of the written trial site
+    @param plan: Output plan of the trial site
+    @param process_logger: Logger of the current process
+    @param trial_site: Converted trial site, which is verified instead of the output files if it was not written to
+    output files. The data is verified as it is handed to the dataset or database writer, the written rows are not
+    read back.
+    @return: The updated report
+    """
+    auditor = get_auditor()
+    try:
+        if trial_site is not None:
+            auditor.audit_converted_data(
+                plan.input_data.file_path,
+                plan.input_data.sheet_name,
+                trial_site.metadata,
+                trial_site.df,
+            )
+        else:
+            auditor.audit_converted_trial_site(
+                plan.input_data.file_path,
+                plan.input_data.sheet_name,
+                plan.metadata_output_file,
+            )
+    except VerificationException as exception:
+        process_logger.warning(
+            f"Verification of trial site `{plan.input_data.string_representation()}` failed: {exception}"
+        )
+        report["verification_failures"][plan.input_data.key()] = str(exception)
+    return report
+
+
+def write_and_verify_output(prepared: PreparedOutput, process_logger: logging.Logger) -> Report:
+    """
+    Write the output files of a converted trial site and verify them, see `write_output` and `verify_output`.
+    """
+    report = write_output(prepared)
+    if not prepared.plan.verify:
+        return report
+    if prepared.plan.sink != "files":
+        return verify_output(report, prepared.plan, process_logger, prepared.converter.trial_site)
+    return verify_output(report, prepared.plan, process_logger)
+
+
+def failed_report(
+        input_data: InputData, exception: Exception, process_logger: logging.Logger
+) -> Report:
+    """
+    Create the report of a failed trial site conversion and log the exception.
+    """
+    report = empty_report()
+    report["total_count"] = 1
+    report["exceptions"].append(exception)
+    process_logger.error(
+        f"Failed conversion for trial site `{input_data.string_representation()}`",
+        exc_info=exception,
+    )
+    return report
+
+
 # noinspection PyBroadException
+def convert_input_data(plan: OutputPlan, process_logger: logging.Logger) -> Report:
+    """
+    Convert and verify a single trial site.
+    @param plan: Output plan of the input data to convert
+    @param process_logger: Logger of the current process
+    @return: report of the conversion containing metadata and exceptions.
+    """
+    try:
+        trial_site = parse_input_data(plan.input_data, process_logger)
+        return write_and_verify_output(prepare_output(plan, trial_site), process_logger)
+    except Exception as exc:
+        return failed_report(plan.input_data, exc, process_logger)
+
+
+# noinspection PyBroadException
+def convert_input_data_overlapped(
+        plans: list[OutputPlan],
+        process_logger: logging.Logger,
+        queue_size: int,
+) -> Iterator[tuple[InputData, Report]]:
+    """
+    Convert trial sites in a pipeline of three stages: a reader thread parses upcoming trial sites and a writer thread
+    writes and verifies finished trial sites while the current thread converts. Parsing and writing mostly wait for
+    I/O, which releases the GIL, so disk and network latency is hidden behind the conversion of other trial sites.
+    Every stage keeps at most `queue_size` trial sites in flight to bound the memory usage.
+    @param plans: Output plans of the input data to convert
+    @param process_logger: Logger of the current process
+    @param queue_size: Maximal count of trial sites waiting between two stages
+    @return: Iterator of input data and its report in the order of `plans`
+    """
+    queue_size = max(queue_size, 1)
+    pending_plans = iter(plans)
+    with (
+        ThreadPoolExecutor(1, thread_name_prefix="reader") as reader,
+        ThreadPoolExecutor(1, thread_name_prefix="writer") as writer,
+    ):
+        parsing: deque[tuple[OutputPlan, Future]] = deque()
+        writing: deque[tuple[OutputPlan, Future]] = deque()
+
+        def read_ahead():
+            while len(parsing) < queue_size:
+                next_plan = next(pending_plans, None)
+                if next_plan is None:
+                    return
+                parsing.append(
+                    (
+                        next_plan,
+                        reader.submit(parse_input_data, next_plan.input_data, process_logger),
+                    )
+                )
+
+        def finish_write() -> tuple[InputData, Report]:
+            written_plan, write_future = writing.popleft()
+            try:
+                return written_plan.input_data, write_future.result()
+            except Exception as write_exc:
+                return written_plan.input_data, failed_report(
+                    written_plan.input_data, write_exc, process_logger
+                )
+
+        read_ahead()
+        while len(parsing) > 0:
+            plan, future = parsing.popleft()
+            read_ahead()
+            try:
+                prepared = prepare_output(plan, future.result())
+            except Exception as exc:
+                # keep reports in input order
+                while len(writing) > 0:
+                    yield finish_write()
+                yield plan.input_data, failed_report(plan.input_data, exc, process_logger)
+                continue
+            writing.append((plan, writer.submit(write_and_verify_output, prepared, process_logger)))
+            while len(writing) > queue_size:
+                yield finish_write()
+        while len(writing) > 0:
+            yield finish_write()
+
+
 def trial_site_pipeline(
         config: ConfigParser,
         column_scheme: ColumnScheme,
-        input_batch: list[InputData],
-        output_data_pattern: Path,
-        output_metadata_pattern: Path,
-        lock: RLock,
+        plans: list[OutputPlan],
         on_progress: Optional[Callable[[str | None], None]],
-        on_progress_queue: Optional[multiprocessing.Queue],
         process_index: Optional[int],
 ) -> Report:
     """
-    Convert a batch of input data.
+    Convert a batch of input data in the current process.
     @param column_scheme: Column scheme to work with
     @param config: Configuration to work with
-    @param input_batch: List of `InputData` objects
-    @param output_data_pattern: Pattern for storing data files
-    @param output_metadata_pattern: Pattern for storing metadata files
-    @param lock: Lock for synchronization
+    @param plans: Output plans of the input data to convert, see `plan_output_files`
     @param on_progress: Callable to execute after finishing a trial site conversion.
     Consumes a string summarizing the input file.
-    @param on_progress_queue: Similar to `on_progress`, a string representation of a trial site is put into the
-    multiprocessing queue after finishing its conversion.
     @param process_index: Index of the current process for logging. If multiprocessing is not used, the parameter can be
     omitted.
     @return: report of all conversions containing metadata and exceptions.
@@ -105,66 +561,225 @@ def trial_site_pipeline(
     process_logger = logging.getLogger(
         f"process {process_index}" if process_index is not None else __name__
     )
-    # store all metadata output files to check for exceptions later
-    metadata_output_files = []
-    errors = []
-    for input_data in input_batch:
-        try:
-            process_logger.info(f"Converting input {str(input_data)}")
-            trial_site = input_data.parse()
-            converter = TrialSiteConverter(trial_site, input_data.file_path)
-            converter.refactor_dataframe()
-            converter.trim_metadata()
-
-            data_output_file = trial_site.replace_metadata_keys(output_data_pattern)
-            metadata_output_file = trial_site.replace_metadata_keys(
-                output_metadata_pattern
-            )
-            converter.trial_site.metadata["DataFrame"] = str(
-                data_output_file.absolute().relative_to(
-                    metadata_output_file.parent.absolute()
-                )
-            )
+    report = empty_report()
+    journal = batch_journal(plans)
+    for input_data, site_report in convert_batch(plans, process_logger):
+        merge_reports(report, site_report)
+        if journal is not None:
+            record_in_journal(journal, input_data, site_report)
+        if on_progress is not None:
+            on_progress(str(input_data))
+    release_workbooks()
+    release_auditor()
+    flush_buffered_output(report, process_logger)
+    return report
 
-            data_output_file.parent.mkdir(parents=True, exist_ok=True)
-            metadata_output_file.parent.mkdir(parents=True, exist_ok=True)
 
-            # lock this segment to prevent race conditions during multiprocessing.
-            with lock:
-                data_output_file.touch(exist_ok=False)
-                metadata_output_file.touch(exist_ok=False)
+def convert_batch(
+        plans: list[OutputPlan], process_logger: logging.Logger
+) -> Iterator[tuple[InputData, Report]]:
+    """
+    Convert a batch of input data, either strictly sequentially or overlapped if the `pipeline` option is enabled.
+    @return: Iterator of input data and its report in the order of `plans`
+    """
+    if setup.config["Multiprocessing"].getboolean("pipeline", False):
+        return convert_input_data_overlapped(
+            plans,
+            process_logger,
+            setup.config["Multiprocessing"].getint("pipeline_queue_size", 2),
+        )
+    return ((plan.input_data, convert_input_data(plan, process_logger)) for plan in plans)
 
-            try:
-                converter.write_data(data_output_file)
-            except OSError as error:
-                raise FileSavingError(data_output_file) from error
-            try:
-                converter.write_metadata(metadata_output_file)
-            except OSError as error:
-                raise FileSavingError(metadata_output_file) from error
-
-            metadata_output_files.append(metadata_output_file)
-        except Exception as exc:
-            errors.append(exc)
-            process_logger.exception(
-                f"Failed conversion for trial site `{input_data.string_representation()}`"
-            )
-        finally:
+
+def plan_journal(plan: OutputPlan) -> Optional[JournalWriter]:
+    """
+    Return the journal writer of the current process for the output directory of a trial site, if the trial site is
+    written to output files.
+    """
+    if plan.sink != "files" or plan.output_directory is None:
+        return None
+    return get_journal_writer(plan.output_directory, setup.config["Output"].get("fsync", "none") != "none")
+
+
+def batch_journal(plans: list[OutputPlan]) -> Optional[JournalWriter]:
+    """
+    Return the journal writer of the current process for the output directory of a batch, see `plan_journal`.
+    """
+    return plan_journal(plans[0]) if len(plans) != 0 else None
+
+
+def record_in_journal(journal: JournalWriter, input_data: InputData, report: Report) -> None:
+    """
+    Record a finished trial site in the journal. The journal is written in batches of `JOURNAL_FLUSH_COUNT` entries
+    and at the end of the conversion, together with syncing the committed output files, see `JournalWriter`.
+    @param journal: Journal writer of the current process
+    @param input_data: Finished input data
+    @param report: Report of the conversion of the input data
+    """
+    key = input_data.key()
+    if len(report["exceptions"]) != 0:
+        status = "failed"
+    elif key in report["verification_failures"]:
+        status = "verification_failed"
+    else:
+        status = "converted"
+    if journal.append(journal_entry(key, report["output_files"].get(key, []), status, journal.output_dir)):
+        # output files are synced before they are recorded as converted
+        flush_output_committers()
+        journal.flush()
+
+
+# noinspection PyBroadException
+def flush_buffered_output(report: Report, process_logger: logging.Logger) -> None:
+    """
+    Write the output buffered by the current process at the end of the conversion. Trial sites appended to datasets and
+    databases, syncs of committed output files and journal entries are collected across batches, unless they reach
+    their thresholds before. A failure is added to the report.
+    @param report: Report of the conversion in the current process
+    @param process_logger: Logger of the current process
+    """
+    try:
+        flush_dataset_writers()
+        flush_sqlite_writers()
+    except Exception as exc:
+        report["exceptions"].append(exc)
+        process_logger.error("Failed to write the buffered output", exc_info=exc)
+    try:
+        # output files are synced before they are recorded as converted
+        flush_output_committers()
+        close_journal_writers()
+    except Exception as exc:
+        report["exceptions"].append(exc)
+        process_logger.error("Failed to write the buffered output", exc_info=exc)
+
+
+def flush_worker_output() -> Report:
+    """
+    Write the output buffered by a worker process of the shared `WorkerPool` at the end of a conversion, see
+    `WorkerPool.run_in_every_worker`.
+    @return: report containing a failure of the flush
+    """
+    report = empty_report()
+    flush_buffered_output(report, logging.getLogger(multiprocessing.current_process().name))
+    return report
+
+
+def trial_site_task(plans: list[OutputPlan]) -> tuple[list[str], Report]:
+    """
+    Convert a small batch of trial sites in a worker process of the shared `WorkerPool`.
+    Configuration and column scheme are installed by the pool initializer.
+    @return: string representations of the input data and the report of their conversion
+    """
+    process_logger = logging.getLogger(multiprocessing.current_process().name)
+    report = empty_report()
+    input_strings = []
+    journal = batch_journal(plans)
+    for input_data, site_report in convert_batch(plans, process_logger):
+        merge_reports(report, site_report)
+        if journal is not None:
+            record_in_journal(journal, input_data, site_report)
+        input_strings.append(str(input_data))
+    # output stays buffered until the end of the conversion, see `run`
+    # the batch contains all sheets of its workbooks that were assigned to this process
+    release_workbooks()
+    release_auditor()
+    return input_strings, report
+
+
+def required_process_count(trial_site_count: int) -> int:
+    """
+    Determine the count of worker processes for processing trial sites according to the configuration.
+    @param trial_site_count: Count of trial sites to process
+    @return: Count of processes, 1 if multiprocessing is disabled or not worthwhile
+    """
+    if not setup.config["Multiprocessing"].getboolean("enabled", False):
+        return 1
+    return max(
+        round(
+            trial_site_count
+            / setup.config["Multiprocessing"].getint("sheets_per_core", 32)
+        ),
+        1,
+    )
+
+
+def schedule_batches(plans: list[OutputPlan], process_count: int, batch_size: int) -> list[list[OutputPlan]]:
+    """
+    Group planned trial sites into batches for the worker processes, largest first.
+    Trial sites of the same input file are kept in one batch, so that a workbook is opened only once. Files are split
+    across several batches only when there are fewer files than processes. Batches of trial sites from small files
+    are filled up to the batch size.
+    @param plans: Planned trial sites
+    @param process_count: Count of worker processes
+    @param batch_size: Minimum count of trial sites in a batch, if there are enough
+    @return: Batches ordered by decreasing estimated conversion cost
+    """
+    files: dict[Path, list[OutputPlan]] = {}
+    for plan in plans:
+        files.setdefault(plan.input_data.file_path, []).append(plan)
+    if len(files) == 0:
+        return []
+    parts_per_file = max(-(-process_count // len(files)), 1) if len(files) < process_count else 1
+
+    # split files into parts of similar size, each part is estimated to cost an equal share of the file
+    parts: list[tuple[float, list[OutputPlan]]] = []
+    for file_plans in files.values():
+        part_count = min(parts_per_file, len(file_plans))
+        part_length = -(-len(file_plans) // part_count)
+        size = input_size(file_plans[0].input_data)
+        for i in range(0, len(file_plans), part_length):
+            part = file_plans[i:i + part_length]
+            parts.append((size * len(part) / len(file_plans), part))
+    parts.sort(key=lambda part: part[0], reverse=True)
+
+    batches: list[list[OutputPlan]] = []
+    batch: list[OutputPlan] = []
+    for _, part in parts:
+        batch.extend(part)
+        if len(batch) >= batch_size:
+            batches.append(batch)
+            batch = []
+    if len(batch) != 0:
+        batches.append(batch)
+    return batches
+
+
+def resume_plans(
+        journal: ConversionJournal,
+        plans: list[OutputPlan],
+        on_progress: Optional[Callable[[Optional[str]], None]],
+) -> list[OutputPlan]:
+    """
+    Skip the trial sites converted by previous attempts of the conversion according to the journal. Output files of
+    the remaining trial sites that were moved into place by an unfinished attempt are removed, so that they can be
+    written again. Other existing output files are never removed, they collide like in any other conversion.
+    @param journal: Journal of the previous attempts
+    @param plans: Output plans of all trial sites
+    @param on_progress: Optional callback that is invoked for every skipped trial site
+    @return: Output plans of the trial sites that still need to be converted
+    """
+    remaining = []
+    for plan in plans:
+        if journal.is_completed(plan.input_data.key()):
             if on_progress is not None:
-                on_progress(str(input_data))
-            if on_progress_queue is not None:
-                on_progress_queue.put(str(input_data))
-    return {
-        "total_count": len(input_batch),
-        "exceptions": errors,
-        "metadata_output_files": metadata_output_files,
-    }
+                on_progress(str(plan.input_data))
+            continue
+        for output_file in (plan.data_output_file, plan.metadata_output_file):
+            if output_file.is_file() and journal.is_committed(plan.input_data.key(), output_file):
+                logger.info(f"Removing output file {output_file} of an unfinished conversion")
+                output_file.unlink()
+        remaining.append(plan)
+    logger.info(f"{len(plans) - len(remaining)} trial sites were converted before, resuming the conversion")
+    return remaining
 
 
 def run(
         output_dir: Path,
         input_path: str | Path | list[str | Path],
         on_progress: Optional[Callable[[Optional[str]], None]],
+        incremental: Optional[bool] = None,
+        defer_audit: Optional[bool] = None,
+        resume: bool = False,
 ) -> Report:
     """
     Convert vfl files to CSV and metadata files.
@@ -173,6 +788,12 @@ def run(
     :param output_dir: Output directory
     :param input_path: List of file or directories to search for input files. See batch_converter.find_input_data()
     :param on_progress: Optional callback that is invoked after every converted trial site
+    :param incremental: Only convert input data that is new or changed since the last conversion into the output
+    directory. If None, the `incremental` option of the configuration is used.
+    :param defer_audit: Skip the verification of converted files, which can be done separately with `audit.run_audit`
+    later. If None, the `defer_audit` option of the configuration is used.
+    :param resume: Resume an interrupted conversion into the output directory: trial sites recorded as converted in its
+    journal are skipped if their output files still exist
     :return: Report of the conversion process
     """
     input_files, input_trial_sites = find_input_data(input_path)
@@ -181,89 +802,121 @@ def run(
         f'{setup.config["Input"]["input_format"]} files'
     )
 
-    output_data_file = output_dir / setup.config["Output"].getpath("csv_output_pattern")
+    if incremental is None:
+        incremental = setup.config["Output"].getboolean("incremental", False)
+    if defer_audit is None:
+        defer_audit = setup.config["Output"].getboolean("defer_audit", False)
+    sink = check_output_sink(output_dir)
+    if sink != "files" and incremental:
+        raise IllegalConfigError("Incremental conversions require the `files` output sink")
+    if sink != "files" and resume:
+        raise IllegalConfigError("Resuming a conversion requires the `files` output sink")
+    if incremental and resume:
+        raise IllegalConfigError("Incremental conversions can't be resumed, they skip unchanged input data anyway")
+    manifest: Optional[ConversionManifest] = None
+    if incremental:
+        manifest = ConversionManifest.load(
+            output_dir, conversion_fingerprint(setup.config, setup.column_scheme)
+        )
+        manifest.discard_orphans(input_trial_sites)
+        changed_trial_sites = manifest.select_changed(input_trial_sites)
+        logger.info(
+            f"{len(input_trial_sites) - len(changed_trial_sites)} trial sites are unchanged since the last conversion"
+        )
+        if on_progress is not None:
+            changed_keys = {input_data.key() for input_data in changed_trial_sites}
+            for input_data in input_trial_sites:
+                if input_data.key() not in changed_keys:
+                    on_progress(str(input_data))
+        for input_data in changed_trial_sites:
+            manifest.discard(input_data.key())
+        input_trial_sites = changed_trial_sites
+
+    output_data_file = output_dir / data_output_file_pattern()
     output_metadata_file = output_dir / setup.config["Output"].getpath(
         "metadata_output_pattern"
     )
     logger.info(f"Writing output to {output_dir}")
-
-    process_count = max(
-        round(
-            len(input_trial_sites)
-            / setup.config["Multiprocessing"].getint("sheets_per_core", 32)
-        ),
-        1,
+    # Output files are determined up front, so that colliding output files are detected before any conversion and
+    # workers don't need to coordinate
+    plans, summarised_result = plan_output_files(
+        input_trial_sites,
+        output_data_file,
+        output_metadata_file,
+        verify=not defer_audit,
+        sink=sink,
+        output_directory=output_dir,
     )
-    if (
-            setup.config["Multiprocessing"].getboolean("enabled", False)
-            and process_count > 1
-    ):
+    if on_progress is not None:
+        planned_trial_sites = {id(plan.input_data) for plan in plans}
+        for input_data in input_trial_sites:
+            if id(input_data) not in planned_trial_sites:
+                on_progress(str(input_data))
+    journal: Optional[ConversionJournal] = None
+    if sink == "files":
+        # finished trial sites are recorded by the worker processes, so that an interrupted conversion can be resumed
+        journal = ConversionJournal.start(
+            output_dir, conversion_fingerprint(setup.config, setup.column_scheme), resume
+        )
+        if journal.resumed:
+            plans = resume_plans(journal, plans, on_progress)
+
+    # only the trial sites left to convert after resuming are distributed across processes
+    process_count = required_process_count(len(plans))
+    if process_count > 1:
         # use multiprocessing for improved performance with larger inputs
+        worker_pool = get_worker_pool(process_count)
         logger.info(
-            f"Found {multiprocessing.cpu_count()} CPU threads, {process_count} processes are going to be used"
+            f"Found {multiprocessing.cpu_count()} CPU threads, {worker_pool.process_count} processes are going to be "
+            f"used"
         )
 
-        with multiprocessing.Manager() as manager:
-            lock = manager.RLock()
-            queue = manager.Queue()
-            with Pool() as pool:
-                # Passing on_progress callbacks to different processes may cause issues depending on the callback.
-                # Therefore, we invoke the callbacks in the main process while communicating with the other processes
-                # using a queue
-                process_args = zip(
-                    process_count * [vfl2csv.setup.config],
-                    process_count * [vfl2csv.setup.column_scheme],
-                    np.array_split(input_trial_sites, process_count),
-                    process_count * [output_data_file],
-                    process_count * [output_metadata_file],
-                    process_count * [lock],
-                    process_count * [None],
-                    process_count * [queue],
-                    range(process_count),
-                )
-                result = pool.starmap_async(trial_site_pipeline, process_args)
-
-                if on_progress is not None:
-                    # Run `on_progress` for every expected value of the queue after finishing all batches
-                    expected_queue_values = len(input_trial_sites)
-                    # count of values received from the queue
-                    received_queue_values = 0
-
-                    # Run until either all processes are finished or the count of received queue values matches the
-                    # count of input trial sites
-                    while (
-                            not result.ready()
-                            and received_queue_values < expected_queue_values
-                    ):
-                        value = queue.get()
-                        if value is None:
-                            break
-                        on_progress(value)
-                        received_queue_values += 1
-                else:
-                    # If there is no on_progress callback, simply wait for the processes to finish
-                    result.wait()
-                summarised_result: Report = Counter()
-                for r in result.get():
-                    # noinspection PyTypeChecker
-                    summarised_result.update(r)
+        # Input files are handed out to the processes one at a time, largest first. Idle processes keep picking up the
+        # next file, so a few large inputs can't stall a process while the other processes are idle.
+        # With the pipeline enabled, small files are batched, so that every process can overlap reading, converting
+        # and writing of the trial sites in a batch.
+        batch_size = (
+            max(setup.config["Multiprocessing"].getint("pipeline_batch_size", 8), 1)
+            if setup.config["Multiprocessing"].getboolean("pipeline", False)
+            else 1
+        )
+        batches = schedule_batches(plans, worker_pool.process_count, batch_size)
+        # Results are merged as soon as they arrive. Passing on_progress callbacks to different processes may cause
+        # issues depending on the callback, so the callbacks are invoked in the main process.
+        for input_strings, report in worker_pool.pool.imap_unordered(
+                trial_site_task, batches
+        ):
+            merge_reports(summarised_result, report)
+            if on_progress is not None:
+                for input_string in input_strings:
+                    on_progress(input_string)
+        # every worker writes the output it collected across its batches at once
+        for report in worker_pool.run_in_every_worker(flush_worker_output):
+            merge_reports(summarised_result, report)
     else:
         # allow disabling multiprocessing for easier debugging and optimized performance when working with little data
         logger.info("Multiprocessing is disabled")
-        summarised_result: Report = trial_site_pipeline(
-            vfl2csv.setup.config,
-            vfl2csv.setup.column_scheme,
-            input_trial_sites,
-            output_data_file,
-            output_metadata_file,
-            RLock(),
-            on_progress=on_progress,
-            on_progress_queue=None,
-            process_index=0,
+        merge_reports(
+            summarised_result,
+            trial_site_pipeline(
+                vfl2csv.setup.config,
+                vfl2csv.setup.column_scheme,
+                plans,
+                on_progress=on_progress,
+                process_index=0,
+            ),
         )
-    summarised_result: Report = dict(summarised_result)
+
+    if sink == "sqlite":
+        # the databases of all processes are merged even if some trial sites failed
+        merge_databases(output_dir, setup.column_scheme)
+    elif sink == "files":
+        remove_staging_directory(output_dir)
 
     if len(summarised_result["exceptions"]) != 0:
+        if manifest is not None:
+            # keep track of the created files, which are replaced during the next conversion
+            _record_manifest(manifest, input_trial_sites, summarised_result, defer_audit)
         message = (
             f'{len(summarised_result["exceptions"])} exceptions occurred during converting '
             f'{summarised_result["total_count"]} trial sites'
@@ -271,22 +924,52 @@ def run(
         logger.warning(message)
         raise ExceptionGroup(message, summarised_result["exceptions"])
 
-    logger.info(
-        f'Converted {summarised_result["total_count"]} trial sites successfully, proceed with verification of '
-        f"converted trial sites."
-    )
-
-    try:
-        auditor = ConversionAuditor(
-            vfl2csv_config=setup.config, column_scheme=setup.column_scheme
+    failures = summarised_result["verification_failures"]
+    if manifest is not None:
+        _record_manifest(manifest, input_trial_sites, summarised_result, defer_audit)
+    if len(failures) != 0:
+        message = (
+            f"Integrity verification of converted data failed for {len(failures)} of "
+            f'{summarised_result["total_count"]} trial sites: Converted files may be uncorrect'
         )
-        auditor.set_reference_files(input_files)
-        auditor.audit_converted_metadata_files(
-            summarised_result["metadata_output_files"]
+        logger.error(message + "\n" + "\n".join(failures.values()))
+        raise VerificationException(message)
+    if journal is not None:
+        # the journal is kept after failures only, to convert the failed trial sites again with `resume`
+        journal.remove()
+    if defer_audit:
+        logger.info(
+            f'Converted {summarised_result["total_count"]} trial sites successfully, the verification is deferred'
         )
-        logger.info("Verification succeeded")
-        return summarised_result
-    except VerificationException as exception:
-        message = f"Integrity verification of converted data failed: Converted files may be uncorrect"
-        logger.exception(message)
-        raise VerificationException(message) from exception
+    elif sink != "files":
+        # datasets and databases are written in batches, so the data is verified before it is written
+        logger.info(
+            f'Converted {summarised_result["total_count"]} trial sites successfully and verified their data before '
+            f"writing it, the written {sink} is not verified"
+        )
+    else:
+        logger.info(
+            f'Converted and verified {summarised_result["total_count"]} trial sites successfully'
+        )
+    return summarised_result
+
+
+def _record_manifest(
+        manifest: ConversionManifest,
+        input_trial_sites: list[InputData],
+        report: Report,
+        defer_audit: bool,
+) -> None:
+    """
+    Record all converted trial sites in the manifest and save it.
+    Trial sites whose verification failed or was deferred are recorded as unverified until an audit verifies them.
+    """
+    for input_data in input_trial_sites:
+        output_files = report["output_files"].get(input_data.key())
+        if output_files is not None:
+            manifest.record(
+                input_data,
+                output_files,
+                verified=not defer_audit and input_data.key() not in report["verification_failures"],
+            )
+    manifest.save()
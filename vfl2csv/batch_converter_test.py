@@ -1,12 +1,47 @@
+import json
+import logging
 import shutil
+import sqlite3
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
+
+import pandas as pd
 
 from vfl2csv import setup
-from vfl2csv.batch_converter import find_input_data
+from vfl2csv.ConversionJournal import JOURNAL_DIRECTORY_NAME, JournalWriter
+from vfl2csv.batch_converter import (
+    convert_input_data,
+    convert_input_data_overlapped,
+    empty_report,
+    find_input_data,
+    flush_worker_output,
+    merge_reports,
+    OutputPlan,
+    plan_output_files,
+    run,
+    schedule_batches,
+    trial_site_task,
+    verify_output,
+)
+from vfl2csv.exceptions import OutputCollisionError, OutputExistsError
+from vfl2csv.input import ExcelWorkbook
 from vfl2csv.input.ExcelInputSheet import ExcelInputSheet
+from vfl2csv.input.TsvInputFile import TsvInputFile
+from vfl2csv.output.OutputCommitter import STAGING_DIRECTORY_NAME
+from vfl2csv.output.TrialSiteConverter import TrialSiteConverter
 from vfl2csv_base import test_config
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.TrialSite import TrialSite
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+try:
+    import pyarrow  # noqa: F401
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 
 class BatchConverterTest(unittest.TestCase):
@@ -35,6 +70,27 @@ class BatchConverterTest(unittest.TestCase):
             ],
         )
 
+    def test_run_releases_workbooks(self):
+        setup.config.set("Input", "input_format", "Excel")
+        setup.config.set("Input", "input_file_extension", "xlsx")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        try:
+            # worker processes convert the trial sites, or this process converts them
+            setup.config.set("Multiprocessing", "sheets_per_core", "1")
+            for multiprocessing_enabled in ("true", "false"):
+                setup.config.set("Multiprocessing", "enabled", multiprocessing_enabled)
+                with tempfile.TemporaryDirectory() as tmp:
+                    run(Path(tmp), test_config["Input"].getpath("excel_sample_input_file"), None)
+                # neither planning nor converting keeps workbooks open in this process
+                self.assertEqual(len(ExcelWorkbook._open_workbooks), 0)
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Multiprocessing", "enabled", "true")
+            setup.config.set("Multiprocessing", "sheets_per_core", "32")
+
     def test_find_input_sheets_excel_dir(self):
         setup.config.set("Input", "input_format", "Excel")
         setup.config.set("Input", "input_file_extension", "xlsx")
@@ -112,6 +168,498 @@ class BatchConverterTest(unittest.TestCase):
             self.assertEqual(len(input_files), 0)
             self.assertEqual(len(input_trial_sheets), 0)
 
+    def test_merge_reports(self):
+        report = empty_report()
+        exception = ValueError()
+        merge_reports(
+            report,
+            {
+                "total_count": 2,
+                "exceptions": [exception],
+                "metadata_output_files": [Path("a")],
+                "output_files": {"a": [Path("a")]},
+                "verification_failures": {"a": "failure"},
+            },
+        )
+        merge_reports(
+            report,
+            {
+                "total_count": 1,
+                "exceptions": [],
+                "metadata_output_files": [Path("b")],
+                "output_files": {"b": [Path("b")]},
+                "verification_failures": {},
+            },
+        )
+        self.assertEqual(report["total_count"], 3)
+        self.assertListEqual(report["exceptions"], [exception])
+        self.assertListEqual(report["metadata_output_files"], [Path("a"), Path("b")])
+        self.assertDictEqual(report["output_files"], {"a": [Path("a")], "b": [Path("b")]})
+        self.assertDictEqual(report["verification_failures"], {"a": "failure"})
+
+    def test_run_incremental(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        setup.config.set("Multiprocessing", "enabled", "false")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                input_dir = Path(tmp) / "input"
+                output_dir = Path(tmp) / "output"
+                shutil.copytree(
+                    test_config["Input"].getpath("tsv_sample_input_dir"), input_dir
+                )
+                report = run(output_dir, input_dir, None, incremental=True, defer_audit=True)
+                self.assertEqual(report["total_count"], 6)
+                removed_file = input_dir / "1460702.txt"
+                removed_outputs = report["output_files"][str(removed_file.absolute())]
+                # trial sites awaiting their audit and changed parse engines don't cause new conversions
+                setup.config.set("Input", "parse_engine", "pyarrow")
+                self.assertEqual(run(output_dir, input_dir, None, incremental=True)["total_count"], 0)
+                setup.config.set("Input", "parse_engine", "c")
+
+                changed_file = input_dir / "1460701.txt"
+                content = changed_file.read_bytes()
+                changed_file.write_bytes(content.replace(b"11,0", b"11,1", 1))
+                self.assertEqual(run(output_dir, input_dir, None, incremental=True)["total_count"], 1)
+
+                removed_file.unlink()
+                self.assertEqual(run(output_dir, input_dir, None, incremental=True)["total_count"], 0)
+                self.assertEqual(len(removed_outputs), 2)
+                for output_file in removed_outputs:
+                    self.assertFalse(output_file.exists())
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Input", "parse_engine", "c")
+            setup.config.set("Multiprocessing", "enabled", "true")
+
+    def test_run_interrupted(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        setup.config.set("Multiprocessing", "enabled", "false")
+        setup.config.set("Output", "fsync", "batch")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                # writing fails after the data files were written
+                with mock.patch.object(TrialSiteConverter, "write_metadata", side_effect=OSError("disk full")):
+                    self.assertRaises(
+                        ExceptionGroup, run, Path(tmp), test_config["Input"].getpath("tsv_sample_input_dir"), None
+                    )
+                # no partial output is left behind, so the conversion can simply be repeated
+                self.assertListEqual(list(Path(tmp).rglob("*.csv")), [])
+                self.assertListEqual(list(Path(tmp).rglob("*.txt")), [])
+                report = run(Path(tmp), test_config["Input"].getpath("tsv_sample_input_dir"), None)
+                self.assertEqual(report["total_count"], 6)
+                self.assertEqual(len(list(Path(tmp).rglob("*.csv"))), 6)
+                self.assertFalse((Path(tmp) / STAGING_DIRECTORY_NAME).exists())
+                self.assertFalse((Path(tmp) / JOURNAL_DIRECTORY_NAME).exists())
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Multiprocessing", "enabled", "true")
+            setup.config.set("Output", "fsync", "none")
+
+    def test_run_resume(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        setup.config.set("Multiprocessing", "enabled", "false")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        write_metadata = TrialSiteConverter.write_metadata
+        calls = []
+
+        def fail_third_trial_site(converter, filepath):
+            calls.append(filepath)
+            if len(calls) == 3:
+                raise OSError("disk full")
+            write_metadata(converter, filepath)
+
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                input_dir = test_config["Input"].getpath("tsv_sample_input_dir")
+                with mock.patch.object(TrialSiteConverter, "write_metadata", fail_third_trial_site):
+                    self.assertRaises(ExceptionGroup, run, Path(tmp), input_dir, None)
+                self.assertEqual(len(list(Path(tmp).rglob("*_metadata.txt"))), 5)
+                # a process moved the data file of the unfinished trial site into place and was killed afterwards
+                unfinished = next(
+                    plan for plan in plan_output_files(
+                        find_input_data(input_dir)[1],
+                        Path(tmp) / setup.config["Output"]["csv_output_pattern"],
+                        Path(tmp) / setup.config["Output"]["metadata_output_pattern"],
+                    )[0]
+                    if not plan.metadata_output_file.exists()
+                )
+                unfinished.data_output_file.parent.mkdir(parents=True, exist_ok=True)
+                unfinished.data_output_file.write_text("partial", encoding="utf-8")
+                journal_writer = JournalWriter(Path(tmp), fsync=False)
+                journal_writer.record_committed(unfinished.input_data.key(), [unfinished.data_output_file])
+                journal_writer.close()
+                # the journal of the failed conversion is kept for resuming it
+                self.assertTrue((Path(tmp) / JOURNAL_DIRECTORY_NAME).is_dir())
+                setup.config.set("Output", "compression", "gzip")
+                self.assertRaises(IllegalConfigError, run, Path(tmp), input_dir, None, resume=True)
+                setup.config.set("Output", "compression", "none")
+
+                progress = []
+                # the single trial site left to convert does not need worker processes
+                setup.config.set("Multiprocessing", "enabled", "true")
+                setup.config.set("Multiprocessing", "sheets_per_core", "1")
+                with mock.patch("vfl2csv.batch_converter.get_worker_pool") as worker_pool:
+                    report = run(Path(tmp), input_dir, progress.append, resume=True)
+                worker_pool.assert_not_called()
+                self.assertEqual(report["total_count"], 1)
+                self.assertEqual(len(progress), 6)
+                self.assertEqual(len(list(Path(tmp).rglob("*_metadata.txt"))), 6)
+                self.assertNotEqual(unfinished.data_output_file.read_text(encoding="utf-8"), "partial")
+                # the completed conversion leaves no journal behind
+                self.assertFalse((Path(tmp) / JOURNAL_DIRECTORY_NAME).exists())
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Multiprocessing", "enabled", "true")
+            setup.config.set("Multiprocessing", "sheets_per_core", "32")
+            setup.config.set("Output", "compression", "none")
+
+    def test_run_resume_keeps_foreign_files(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        setup.config.set("Multiprocessing", "enabled", "false")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                input_dir = test_config["Input"].getpath("tsv_sample_input_dir")
+                # a file at an output path that was not written by the conversion
+                foreign = plan_output_files(
+                    find_input_data(input_dir)[1],
+                    Path(tmp) / setup.config["Output"]["csv_output_pattern"],
+                    Path(tmp) / setup.config["Output"]["metadata_output_pattern"],
+                )[0][0].data_output_file
+                foreign.parent.mkdir(parents=True)
+                foreign.write_text("foreign", encoding="utf-8")
+                self.assertRaises(ExceptionGroup, run, Path(tmp), input_dir, None)
+                self.assertTrue((Path(tmp) / JOURNAL_DIRECTORY_NAME).is_dir())
+
+                # the resumed conversion collides with the file like the first attempt
+                with self.assertRaises(ExceptionGroup) as context:
+                    run(Path(tmp), input_dir, None, resume=True)
+                self.assertIsInstance(context.exception.exceptions[0], OutputExistsError)
+                self.assertEqual(foreign.read_text(encoding="utf-8"), "foreign")
+                self.assertEqual(len(list(Path(tmp).rglob("*_metadata.txt"))), 5)
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Multiprocessing", "enabled", "true")
+
+    def test_journal_written_in_batches(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                plans, _ = plan_output_files(
+                    find_input_data(test_config["Input"].getpath("tsv_sample_input_dir"))[1],
+                    Path(tmp) / setup.config["Output"]["csv_output_pattern"],
+                    Path(tmp) / setup.config["Output"]["metadata_output_pattern"],
+                    output_directory=Path(tmp),
+                )
+                journal_path = JournalWriter(Path(tmp), fsync=False).path
+
+                def statuses() -> list[str]:
+                    lines = journal_path.read_text(encoding="utf-8").splitlines()
+                    return [json.loads(line)["status"] for line in lines]
+
+                # one trial site per task, like worker processes convert TSV files
+                for plan in plans:
+                    trial_site_task([plan])
+                # only the committed output files are recorded right away
+                self.assertListEqual(statuses(), len(plans) * ["committed"])
+                self.assertEqual(flush_worker_output()["exceptions"], [])
+                self.assertListEqual(statuses(), len(plans) * ["committed"] + len(plans) * ["converted"])
+        finally:
+            setup.column_scheme = column_scheme
+
+    def test_convert_input_data_overlapped(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        _, input_trial_sites = find_input_data(
+            test_config["Input"].getpath("tsv_sample_input_dir")
+        )
+        # a failing trial site must neither stop the pipeline nor change the order of the reports
+        input_trial_sites.insert(2, TsvInputFile(Path("/this/path/does/not/exist.txt")))
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            plans, _ = plan_output_files(
+                input_trial_sites,
+                Path(tmp) / setup.config["Output"]["csv_output_pattern"],
+                Path(tmp) / setup.config["Output"]["metadata_output_pattern"],
+            )
+            # the metadata of the missing file can't be read
+            self.assertEqual(len(plans), 6)
+            plans.insert(2, OutputPlan(input_trial_sites[2], Path(tmp) / "a.csv", Path(tmp) / "a.txt"))
+            try:
+                results = list(
+                    convert_input_data_overlapped(
+                        plans, logging.getLogger(__name__), queue_size=2
+                    )
+                )
+            finally:
+                setup.column_scheme = column_scheme
+            self.assertListEqual([input_data for input_data, _ in results], input_trial_sites)
+            for index, (input_data, report) in enumerate(results):
+                self.assertEqual(report["total_count"], 1)
+                self.assertEqual(len(report["exceptions"]), 1 if index == 2 else 0)
+                for output_file in report["output_files"].get(input_data.key(), []):
+                    self.assertTrue(output_file.is_file())
+            self.assertEqual(len(list(Path(tmp).rglob("*_metadata.txt"))), 6)
+
+    def test_plan_output_files(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        _, input_trial_sites = find_input_data(
+            test_config["Input"].getpath("tsv_sample_input_dir")
+        )
+        plans, rejected = plan_output_files(
+            input_trial_sites, Path("{revier}/{versuch}-{parzelle}.csv"), Path("{revier}/{versuch}-{parzelle}.txt")
+        )
+        self.assertEqual(len(plans), 6)
+        self.assertEqual(rejected["total_count"], 0)
+        # metadata whitespace is trimmed like during the conversion
+        self.assertIn(Path("Hundshübel/14607-01.csv"), [plan.data_output_file for plan in plans])
+
+        # all trial sites of the sample data share the same revier
+        plans, rejected = plan_output_files(
+            input_trial_sites, Path("{revier}.csv"), Path("{revier}/{versuch}-{parzelle}.txt")
+        )
+        self.assertEqual(len(plans), 1)
+        self.assertEqual(rejected["total_count"], 5)
+        for exception in rejected["exceptions"]:
+            self.assertIsInstance(exception, OutputCollisionError)
+
+    def test_schedule_batches(self):
+        setup.config.set("Input", "input_format", "Excel")
+        setup.config.set("Input", "input_file_extension", "xlsx")
+        _, input_trial_sheets = find_input_data(
+            test_config["Input"].getpath("excel_sample_input_dir")
+        )
+        plans = [OutputPlan(input_data, Path("data.csv"), Path("metadata.txt")) for input_data in input_trial_sheets]
+
+        # with at least as many files as processes, each workbook is handed to a single process
+        batches = schedule_batches(plans, 2, 1)
+        self.assertEqual(len(batches), 2)
+        for batch in batches:
+            self.assertEqual(len({plan.input_data.file_path for plan in batch}), 1)
+        self.assertEqual(sum(len(batch) for batch in batches), 17)
+        self.assertGreaterEqual(
+            batches[0][0].input_data.file_path.stat().st_size, batches[1][0].input_data.file_path.stat().st_size
+        )
+
+        # workbooks are split when there are more processes than files
+        batches = schedule_batches(plans, 4, 1)
+        self.assertEqual(len(batches), 4)
+        for batch in batches:
+            self.assertEqual(len({plan.input_data.file_path for plan in batch}), 1)
+        self.assertCountEqual(
+            [plan.input_data.key() for batch in batches for plan in batch],
+            [input_data.key() for input_data in input_trial_sheets],
+        )
+
+        # files are combined up to the batch size
+        self.assertEqual(len(schedule_batches(plans, 2, 17)), 1)
+        self.assertListEqual(schedule_batches([], 2, 1), [])
+
+    def test_run_pipeline(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        setup.config.set("Multiprocessing", "pipeline", "true")
+        try:
+            for multiprocessing_enabled in ("false", "true"):
+                setup.config.set("Multiprocessing", "enabled", multiprocessing_enabled)
+                with tempfile.TemporaryDirectory() as tmp:
+                    report = run(
+                        Path(tmp), test_config["Input"].getpath("tsv_sample_input_dir"), None
+                    )
+                    self.assertEqual(report["total_count"], 6)
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Multiprocessing", "pipeline", "false")
+            setup.config.set("Multiprocessing", "enabled", "true")
+
+    def test_verify_output(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        try:
+            _, input_trial_sites = find_input_data(
+                test_config["Input"].getpath("tsv_sample_input_file")
+            )
+            for verification in ("cells", "digest"):
+                setup.config.set("Output", "verification", verification)
+                with tempfile.TemporaryDirectory() as tmp:
+                    plans, _ = plan_output_files(
+                        input_trial_sites,
+                        Path(tmp) / setup.config["Output"]["csv_output_pattern"],
+                        Path(tmp) / setup.config["Output"]["metadata_output_pattern"],
+                    )
+                    report = convert_input_data(plans[0], logging.getLogger(__name__))
+                    self.assertDictEqual(report["verification_failures"], {})
+
+                    # tamper with the converted data
+                    content = plans[0].data_output_file.read_text(encoding="utf-8")
+                    plans[0].data_output_file.write_text(content.replace("NA", "0", 1), encoding="utf-8")
+                    report = verify_output(report, plans[0], logging.getLogger(__name__))
+                    self.assertIn(input_trial_sites[0].key(), report["verification_failures"])
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Output", "verification", "cells")
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow is not installed")
+    def test_run_data_formats(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        try:
+            for data_format in ("parquet", "feather"):
+                setup.config.set("Output", "data_format", data_format)
+                with tempfile.TemporaryDirectory() as tmp:
+                    # the converted files are verified during the conversion
+                    report = run(Path(tmp), test_config["Input"].getpath("tsv_sample_input_dir"), None)
+                    self.assertEqual(report["total_count"], 6)
+                    self.assertEqual(len(list(Path(tmp).rglob(f"*.{data_format}"))), 6)
+                    self.assertEqual(len(list(Path(tmp).rglob("*.csv"))), 0)
+                    trial_site = TrialSite.from_metadata_file(next(Path(tmp).rglob("*_metadata.txt")))
+                    self.assertEqual(trial_site.df["Baumnummer"].dtype, pd.UInt32Dtype())
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Output", "data_format", "csv")
+
+    def test_run_compressed(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        setup.config.set("Output", "compression", "gzip")
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                # the compressed files are verified during the conversion
+                report = run(Path(tmp), test_config["Input"].getpath("tsv_sample_input_dir"), None)
+                self.assertEqual(report["total_count"], 6)
+                self.assertEqual(len(report["verification_failures"]), 0)
+                self.assertEqual(len(list(Path(tmp).rglob("*.csv.gz"))), 6)
+                self.assertEqual(len(list(Path(tmp).rglob("*.csv"))), 0)
+                trial_site = TrialSite.from_metadata_file(next(Path(tmp).rglob("*_metadata.txt")))
+                self.assertIn("Baumnummer", trial_site.df.columns)
+                self.assertGreater(len(trial_site.df), 0)
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Output", "compression", "none")
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow is not installed")
+    def test_run_dataset(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        setup.config.set("Output", "sink", "dataset")
+        # two worker processes converting one trial site per task
+        setup.config.set("Multiprocessing", "workers", "2")
+        setup.config.set("Multiprocessing", "sheets_per_core", "1")
+        try:
+            for multiprocessing_enabled in ("false", "true"):
+                setup.config.set("Multiprocessing", "enabled", multiprocessing_enabled)
+                with tempfile.TemporaryDirectory() as tmp:
+                    # the converted trial sites are verified before they are appended to the dataset
+                    report = run(Path(tmp), test_config["Input"].getpath("tsv_sample_input_dir"), None)
+                    self.assertEqual(report["total_count"], 6)
+                    self.assertEqual(len(report["exceptions"]), 0)
+                    self.assertEqual(len(list(Path(tmp).rglob("*.csv"))), 0)
+                    sites = pd.read_parquet(Path(tmp) / "sites")
+                    self.assertEqual(len(sites), 6)
+                    measurements = pd.read_parquet(Path(tmp) / "measurements")
+                    self.assertSetEqual(set(measurements["Parzelle"]), set(sites["Parzelle"]))
+                    # every process writes its trial sites at once instead of one file per trial site
+                    self.assertLessEqual(len(list((Path(tmp) / "sites").glob("*.parquet"))), 2)
+                    self.assertLessEqual(len(list((Path(tmp) / "measurements").rglob("*.parquet"))), 2)
+                    # an existing dataset is never appended to
+                    self.assertRaises(
+                        OutputExistsError,
+                        run,
+                        Path(tmp),
+                        test_config["Input"].getpath("tsv_sample_input_dir"),
+                        None,
+                    )
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Output", "sink", "files")
+            setup.config.set("Multiprocessing", "enabled", "true")
+            setup.config.set("Multiprocessing", "workers", "0")
+            setup.config.set("Multiprocessing", "sheets_per_core", "32")
+
+    def test_run_sqlite(self):
+        setup.config.set("Input", "input_format", "TSV")
+        setup.config.set("Input", "input_file_extension", "txt")
+        column_scheme = setup.column_scheme
+        setup.column_scheme = ColumnScheme.from_file(
+            test_config["Input"].getpath("vfl2csv_test_columns_config")
+        )
+        setup.config.set("Output", "sink", "sqlite")
+        # two worker processes converting one trial site per task into their own databases
+        setup.config.set("Multiprocessing", "workers", "2")
+        setup.config.set("Multiprocessing", "sheets_per_core", "1")
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                with self.assertLogs("vfl2csv.batch_converter", "INFO") as logs:
+                    report = run(Path(tmp), test_config["Input"].getpath("tsv_sample_input_dir"), None)
+                self.assertEqual(report["total_count"], 6)
+                # the data is verified before it is written, the database is not read back
+                self.assertIn("the written sqlite is not verified", logs.output[-1])
+                self.assertListEqual([path.name for path in Path(tmp).iterdir()], ["vfl2csv.sqlite"])
+                connection = sqlite3.connect(Path(tmp) / "vfl2csv.sqlite")
+                try:
+                    self.assertEqual(connection.execute("SELECT COUNT(*) FROM sites").fetchone()[0], 6)
+                    self.assertEqual(
+                        connection.execute("SELECT COUNT(DISTINCT site) FROM measurements").fetchone()[0], 6
+                    )
+                finally:
+                    connection.close()
+                # an existing database is never appended to
+                self.assertRaises(
+                    OutputExistsError, run, Path(tmp), test_config["Input"].getpath("tsv_sample_input_dir"), None
+                )
+        finally:
+            setup.column_scheme = column_scheme
+            setup.config.set("Output", "sink", "files")
+            setup.config.set("Multiprocessing", "workers", "0")
+            setup.config.set("Multiprocessing", "sheets_per_core", "32")
+
     def test_findInputSheets_input_format_validation(self):
         setup.config.set("Input", "input_format", "illegal value")
         self.assertRaises(
@@ -1,6 +1,28 @@
+from __future__ import annotations
+
+import typing
+from pathlib import Path
+
+if typing.TYPE_CHECKING:
+    from vfl2csv.input.InputData import InputData
+
+
 class ConversionException(Exception):
     pass
 
 
 class VerificationException(Exception):
     pass
+
+
+class OutputCollisionError(ConversionException):
+    def __init__(self, output_file: Path, first_input: InputData, second_input: InputData):
+        super().__init__(
+            f'Output file "{output_file}" of `{second_input.string_representation()}` is already used by '
+            f"`{first_input.string_representation()}`. Adjust the output patterns to distinguish the trial sites."
+        )
+
+
+class OutputExistsError(ConversionException):
+    def __init__(self, output_path: Path):
+        super().__init__(f'Output "{output_path}" already exists and is never overwritten')
@@ -0,0 +1,82 @@
+import hashlib
+import io
+import json
+from configparser import ConfigParser
+from pathlib import Path
+
+from vfl2csv_base.ColumnScheme import ColumnScheme
+
+
+def column_scheme_fingerprint(column_scheme: ColumnScheme) -> str:
+    """
+    Create a digest identifying the content of a column scheme.
+    @param column_scheme: Column scheme
+    @return: Hex digest
+    """
+    content = json.dumps(
+        {
+            "head": column_scheme.head.data,
+            "measurements": column_scheme.measurements.data,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def configuration_fingerprint(config: ConfigParser, column_scheme: ColumnScheme) -> str:
+    """
+    Create a digest identifying the content of a configuration together with a column scheme.
+    @param config: Configuration
+    @param column_scheme: Column scheme
+    @return: Hex digest
+    """
+    config_content = io.StringIO()
+    config.write(config_content)
+    digest = hashlib.sha256(config_content.getvalue().encode("utf-8"))
+    digest.update(column_scheme_fingerprint(column_scheme).encode("ascii"))
+    return digest.hexdigest()
+
+
+# Options which do not influence the content of converted files
+NON_OUTPUT_OPTIONS = {
+    # both TSV parse engines read identical data
+    ("Input", "parse_engine"),
+    ("Output", "incremental"),
+    ("Output", "verification"),
+    ("Output", "defer_audit"),
+    # both CSV writers write identical files
+    ("Output", "csv_writer"),
+    ("Output", "fsync"),
+}
+
+
+def conversion_fingerprint(config: ConfigParser, column_scheme: ColumnScheme) -> str:
+    """
+    Create a digest identifying all settings that influence the content of converted files, i.e. the input and output
+    configuration as well as the column scheme.
+    @param config: Configuration
+    @param column_scheme: Column scheme
+    @return: Hex digest
+    """
+    settings = {
+        section: {
+            key: value
+            for key, value in config[section].items()
+            if (section, key) not in NON_OUTPUT_OPTIONS
+        }
+        for section in ("Input", "Output")
+        if config.has_section(section)
+    }
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    digest.update(column_scheme_fingerprint(column_scheme).encode("ascii"))
+    return digest.hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """
+    Create a digest of the content of a file.
+    @param path: Path to the file
+    @return: Hex digest
+    """
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
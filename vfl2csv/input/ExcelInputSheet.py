@@ -5,45 +5,57 @@ from typing import Iterable
 
 import pandas as pd
 
-from vfl2csv.input.ExcelWorkbook import ExcelWorkbook
+from vfl2csv.input.ExcelWorkbook import ExcelWorkbook, get_workbook, read_sheet_names
 from vfl2csv.input.InputData import InputData
+from vfl2csv.input.excel_reader import PARSER_VERSION, parse_sheet_rows, read_sheet_rows
+from vfl2csv.input.tsv_parser import parse_metadata_lines
 from vfl2csv_base.TrialSite import TrialSite
 from vfl2csv_base.exceptions.IOErrors import FileParsingError
 
 
 class ExcelInputSheet(InputData):
-    def __init__(self, workbook: ExcelWorkbook, sheet_name: str):
+    def __init__(self, file_path: Path, sheet_name: str):
         """
         Create a new Excel output file object.
         This class acts as abstraction for parsing Excel output files and acts as the interface between Excel and the
         TrialSite class, which represents measurement and metadata in a common format.
-        :param workbook: ExcelWorkbook instance
+        Only the path and the sheet name are stored, the workbook is opened on first access.
+        :param file_path: Path to the Excel file
         :param sheet_name: Name of the sheet containing all trial site data
         """
-        super().__init__(workbook.path)
-        self.open_workbook = workbook.open_workbook
-        self.input_stream = workbook.in_mem_file
+        super().__init__(file_path)
         self.sheet_name = sheet_name
 
-    def parse(self) -> TrialSite:
+    @property
+    def workbook(self) -> ExcelWorkbook:
+        """
+        Workbook containing this sheet, shared with the other sheets of the same file read by this process.
+        """
+        return get_workbook(self.file_path)
+
+    def content_hash(self) -> str:
+        return self.workbook.content_hash()
+
+    def read_metadata(self) -> dict[str, str]:
         try:
             # extract metadata saved in the columns A5:A11 in a 'key : value' format
-            metadata = dict()
-            sheet = self.open_workbook[self.sheet_name]
-            # less legible syntax:
-            for row in sheet["A5:A11"]:
-                key, value = row[0].value.split(":")
-                metadata[key.strip()] = value.strip()
-
-            df = pd.read_excel(
-                self.input_stream,
-                sheet_name=self.sheet_name,
-                header=list(range(0, 4)),
-                skiprows=13,
-                na_values=[" "],
+            # only the first rows of the sheet are parsed
+            sheet = self.workbook.open_workbook[self.sheet_name]
+            return parse_metadata_lines(
+                [row[0] for row in sheet.iter_rows(min_row=5, max_row=11, max_col=1, values_only=True)]
             )
+        except Exception as exc:
+            raise FileParsingError(self.file_path) from exc
+
+    def parser_options(self) -> str:
+        return f"excel:{PARSER_VERSION}:{pd.__version__}"
 
-            return TrialSite(df, metadata)
+    def parse_input(self) -> TrialSite:
+        try:
+            # the sheet is streamed exactly once, metadata and data are taken from the same rows
+            return parse_sheet_rows(
+                read_sheet_rows(self.workbook.open_workbook[self.sheet_name])
+            )
         except Exception as exc:
             raise FileParsingError(self.file_path) from exc
 
@@ -57,10 +69,10 @@ class ExcelInputSheet(InputData):
 
     @staticmethod
     def iterate_files(input_files: Iterable[Path]) -> list[ExcelInputSheet]:
-        workbooks = list(ExcelWorkbook(path) for path in input_files)
         input_sheets = list()
-        for workbook in workbooks:
+        for path in input_files:
+            # sheet names are read from the workbook part of the file, the workbook itself is not loaded
             input_sheets.extend(
-                ExcelInputSheet(workbook, sheet_name) for sheet_name in workbook.sheets
+                ExcelInputSheet(path, sheet_name) for sheet_name in read_sheet_names(path)
             )
         return input_sheets
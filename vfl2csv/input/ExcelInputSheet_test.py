@@ -1,24 +1,25 @@
+import pickle
 import unittest
 
 import pandas as pd
 
 from vfl2csv.input.ExcelInputSheet import ExcelInputSheet
-from vfl2csv.input.ExcelWorkbook import ExcelWorkbook
 from vfl2csv_base import test_config
 
 
 class ExcelInputSheetTest(unittest.TestCase):
     def setUp(self) -> None:
-        excel_workbook = ExcelWorkbook(
-            test_config["Input"].getpath("excel_sample_input_file")
+        self.sample_instance = ExcelInputSheet(
+            test_config["Input"].getpath("excel_sample_input_file"), "09703_P2"
         )
-        self.sample_instance = ExcelInputSheet(excel_workbook, "09703_P2")
 
     def test_iterate_files(self):
         sheets = ExcelInputSheet.iterate_files(
             test_config["Input"].getpath("excel_sample_input_dir").glob("*.xlsx")
         )
         self.assertEqual(len(sheets), 17)
+        # only path and sheet name are kept until a sheet is parsed
+        self.assertTrue(all(set(vars(sheet)) == {"file_path", "sheet_name"} for sheet in sheets))
 
     def test_parse_dataframe(self):
         df: pd.DataFrame = self.sample_instance.parse().df
@@ -45,6 +46,19 @@ class ExcelInputSheetTest(unittest.TestCase):
             },
         )
 
+    def test_pickle(self):
+        input_data = ExcelInputSheet.iterate_files(
+            test_config["Input"].getpath("excel_sample_input_dir").glob("*.xlsx")
+        )
+        for sheet in input_data:
+            sheet.parse()
+        # only a small descriptor is sent to worker processes, no matter which state was derived before
+        payload = pickle.dumps(input_data)
+        self.assertLess(len(payload), 512 * len(input_data))
+        unpickled = pickle.loads(payload)
+        self.assertListEqual([sheet.key() for sheet in unpickled], [sheet.key() for sheet in input_data])
+        pd.testing.assert_frame_equal(unpickled[0].parse().df, input_data[0].parse().df)
+
     def test_str(self):
         self.assertEqual(
             str(self.sample_instance),
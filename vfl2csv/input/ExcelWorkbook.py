@@ -1,20 +1,121 @@
+from __future__ import annotations
+
+import hashlib
 import io
+import posixpath
+import threading
+import zipfile
+from collections import OrderedDict
 from pathlib import Path
+from xml.etree import ElementTree
 
 import openpyxl
+from openpyxl import Workbook
+
+RELATIONSHIPS_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_RELATIONSHIP = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+SPREADSHEET_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+# number of workbooks kept open per process, input sheets are grouped by workbook,
+# so a workbook is released as soon as the sheets of the next workbook are read
+WORKBOOK_CACHE_SIZE = 1
+
+_open_workbooks: OrderedDict[Path, ExcelWorkbook] = OrderedDict()
+_open_workbooks_lock = threading.Lock()
+
+
+def read_sheet_names(path: Path) -> list[str]:
+    """
+    Read the names of all sheets of an Excel file in workbook order without loading the workbook.
+    Only the package relationships and the workbook part are read from the zip archive.
+    :param path: Path to the Excel file
+    :return: list of sheet names
+    """
+    with zipfile.ZipFile(path) as archive:
+        workbook_part = "xl/workbook.xml"
+        relationships = ElementTree.fromstring(archive.read("_rels/.rels"))
+        for relationship in relationships.iter(f"{{{RELATIONSHIPS_NAMESPACE}}}Relationship"):
+            if relationship.get("Type") == OFFICE_DOCUMENT_RELATIONSHIP:
+                workbook_part = posixpath.normpath(relationship.get("Target").lstrip("/"))
+                break
+        workbook = ElementTree.fromstring(archive.read(workbook_part))
+    return [sheet.get("name") for sheet in workbook.iter(f"{{{SPREADSHEET_NAMESPACE}}}sheet")]
+
+
+def get_workbook(path: Path) -> ExcelWorkbook:
+    """
+    Return the workbook of the Excel file at the given path. The file is loaded on first access and kept open until
+    WORKBOOK_CACHE_SIZE other workbooks have been requested by this process.
+    :param path: Path to the Excel file
+    :return: ExcelWorkbook instance
+    """
+    with _open_workbooks_lock:
+        workbook = _open_workbooks.get(path)
+        if workbook is not None:
+            _open_workbooks.move_to_end(path)
+            return workbook
+        while len(_open_workbooks) >= WORKBOOK_CACHE_SIZE:
+            _open_workbooks.popitem(last=False)
+        workbook = ExcelWorkbook(path)
+        _open_workbooks[path] = workbook
+        return workbook
+
+
+def release_workbooks() -> None:
+    """
+    Release all workbooks kept open by this process.
+    """
+    with _open_workbooks_lock:
+        _open_workbooks.clear()
 
 
 class ExcelWorkbook:
     def __init__(self, path: Path):
         """
-        Create Excel workbook object. The Excel file at the given path is opened and sheet names are extracted.
+        Create Excel workbook object. The Excel file at the given path is loaded into memory on first access of its
+        content and sheet names are extracted without loading the workbook.
         :param path: Path to the Excel file
         """
         self.path = path
+        self._in_mem_file = None
+        self._open_workbook = None
+        self._sheets = None
+        self._content_hash = None
 
-        # read file into memory to not have to load the file repeatedly with openpyxl and pandas
-        with open(path, "rb") as file:
-            self.in_mem_file = io.BytesIO(file.read())
+    @property
+    def in_mem_file(self) -> io.BytesIO:
+        """
+        Content of the Excel file, read into memory to not have to load the file repeatedly.
+        """
+        if self._in_mem_file is None:
+            with open(self.path, "rb") as file:
+                self._in_mem_file = io.BytesIO(file.read())
+        return self._in_mem_file
+
+    @property
+    def sheets(self) -> list[str]:
+        """
+        Names of all sheets in workbook order.
+        """
+        if self._sheets is None:
+            self._sheets = read_sheet_names(self.path)
+        return self._sheets
 
-        self.open_workbook = openpyxl.load_workbook(self.in_mem_file)
-        self.sheets = self.open_workbook.sheetnames
+    @property
+    def open_workbook(self) -> Workbook:
+        """
+        Workbook opened in read-only mode, which parses the content of a sheet only when its rows are iterated.
+        """
+        if self._open_workbook is None:
+            self._open_workbook = openpyxl.load_workbook(
+                self.in_mem_file, read_only=True, data_only=True, keep_links=False
+            )
+        return self._open_workbook
+
+    def content_hash(self) -> str:
+        """
+        Return a digest of the content of the Excel file, computed once from the file in memory.
+        """
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha256(self.in_mem_file.getbuffer()).hexdigest()
+        return self._content_hash
@@ -3,7 +3,8 @@ import unittest
 
 import openpyxl
 
-from vfl2csv.input.ExcelWorkbook import ExcelWorkbook
+from vfl2csv.input import ExcelWorkbook as excel_workbook_module
+from vfl2csv.input.ExcelWorkbook import ExcelWorkbook, get_workbook, read_sheet_names, release_workbooks
 from vfl2csv_base import test_config
 
 
@@ -32,6 +33,39 @@ class ExcelWorkbookTest(unittest.TestCase):
         self.assertIsInstance(workbook.open_workbook, openpyxl.Workbook)
         self.assertListEqual(workbook.open_workbook.sheetnames, expected_sheets)
 
+    def test_lazy_loading(self):
+        workbook = ExcelWorkbook(
+            test_config["Input"].getpath("excel_sample_input_file")
+        )
+        self.assertEqual(len(workbook.sheets), 10)
+        # listing the sheets does not load the file
+        self.assertIsNone(workbook._in_mem_file)
+        self.assertIsNone(workbook._open_workbook)
+
+    def test_read_sheet_names(self):
+        for path in test_config["Input"].getpath("excel_sample_input_dir").glob("*.xlsx"):
+            self.assertListEqual(
+                read_sheet_names(path),
+                openpyxl.load_workbook(path, read_only=True).sheetnames,
+            )
+
+    def test_get_workbook(self):
+        first_path, second_path = sorted(
+            test_config["Input"].getpath("excel_sample_input_dir").glob("*.xlsx")
+        )[:2]
+        release_workbooks()
+        try:
+            first = get_workbook(first_path)
+            self.assertIs(get_workbook(first_path), first)
+            # opening the next workbook releases the previous one
+            get_workbook(second_path)
+            self.assertListEqual(
+                list(excel_workbook_module._open_workbooks), [second_path]
+            )
+            self.assertIsNot(get_workbook(first_path), first)
+        finally:
+            release_workbooks()
+
 
 if __name__ == "__main__":
     unittest.main()
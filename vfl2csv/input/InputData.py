@@ -1,19 +1,87 @@
 # This is no longer necessary as of python 3.11, but on writing this I used python 3.10
 from __future__ import annotations
 
+import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Optional
 
+from vfl2csv.fingerprint import file_digest
+from vfl2csv.input.TrialSiteCache import get_trial_site_cache
 from vfl2csv_base.TrialSite import TrialSite
 
+logger = logging.getLogger(__name__)
+
 
 class InputData(ABC):
+    # Name of the sheet within the input file if the file contains multiple trial sites
+    sheet_name: Optional[str] = None
+    # Attributes describing the input data. All other attributes are derived state, which is not pickled when the
+    # input data is sent to a worker process and is rebuilt there on demand.
+    descriptor_attributes: tuple[str, ...] = ("file_path", "sheet_name")
+
     def __init__(self, file_path: Path):
         self.file_path = file_path
 
-    @abstractmethod
+    def __getstate__(self) -> dict:
+        return {name: value for name, value in self.__dict__.items() if name in self.descriptor_attributes}
+
+    def key(self) -> str:
+        """
+        Return an identifier of the input data that is stable across conversions.
+        """
+        key = str(self.file_path.absolute())
+        return key if self.sheet_name is None else f"{key}::{self.sheet_name}"
+
+    def content_hash(self) -> str:
+        """
+        Return a digest of the content of the input file.
+        """
+        return file_digest(self.file_path)
+
+    # noinspection PyBroadException
     def parse(self) -> TrialSite:
+        """
+        Parse the input data, using the trial site cache if it is enabled. Failures of the cache never fail the
+        parsing, the input data is parsed without the cache instead.
+        """
+        cache = get_trial_site_cache()
+        if cache is None:
+            return self.parse_input()
+        key = cache.key(self.content_hash(), self.sheet_name, self.parser_options())
+        try:
+            trial_site = cache.get(key)
+        except Exception as exc:
+            logger.warning(f"Failed to read the cached trial site of {self}, parsing it instead", exc_info=exc)
+            trial_site = None
+        if trial_site is None:
+            trial_site = self.parse_input()
+            try:
+                cache.put(key, trial_site)
+            except Exception as exc:
+                logger.warning(f"Failed to cache the trial site of {self}", exc_info=exc)
+        return trial_site
+
+    @abstractmethod
+    def parse_input(self) -> TrialSite:
+        """
+        Parse the input data without consulting the trial site cache.
+        """
+        ...
+
+    @abstractmethod
+    def read_metadata(self) -> dict[str, str]:
+        """
+        Read only the metadata of the input data, which is much cheaper than parsing it.
+        """
+        ...
+
+    @abstractmethod
+    def parser_options(self) -> str:
+        """
+        Return a description of the parser and all options influencing the parsed trial site, used as part of the
+        cache key.
+        """
         ...
 
     @abstractmethod
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import numbers
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from vfl2csv import setup
+from vfl2csv_base.TrialSite import TrialSite
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+# Increment whenever the layout of cache entries changes
+CACHE_FORMAT_VERSION = 1
+CACHE_FILE_SUFFIX = ".parquet"
+METADATA_KEY = b"vfl2csv"
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_label(label: tuple) -> list[list]:
+    """
+    Encode a hierarchical column label into JSON, retaining the types of its values.
+    """
+    encoded = []
+    for value in label:
+        if isinstance(value, datetime.datetime):
+            encoded.append(["datetime", value.isoformat()])
+        elif isinstance(value, numbers.Integral):
+            encoded.append(["int", int(value)])
+        elif isinstance(value, numbers.Real):
+            encoded.append(["float", float(value)])
+        else:
+            encoded.append(["str", str(value)])
+    return encoded
+
+
+def _decode_label(encoded: list[list]) -> tuple:
+    decoders = {
+        "datetime": datetime.datetime.fromisoformat,
+        "str": str,
+        "int": int,
+        "float": float,
+    }
+    return tuple(decoders[value_type](value) for value_type, value in encoded)
+
+
+class TrialSiteCache:
+    def __init__(self, directory: Path, max_size: int):
+        """
+        On-disk cache of parsed trial sites.
+        Every entry is stored as Parquet file including metadata and column labels. Entries are keyed by the content
+        hash of the input file, the sheet name and the parser options. If the total size of all entries exceeds
+        `max_size`, the least recently used entries are evicted.
+        :param directory: Cache directory
+        :param max_size: Maximal total size of all entries in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.size = sum(path.stat().st_size for path in self._entries())
+
+    def _entries(self) -> list[Path]:
+        return list(self.directory.glob(f"*{CACHE_FILE_SUFFIX}"))
+
+    @staticmethod
+    def key(content_hash: str, sheet_name: Optional[str], parser_options: str) -> str:
+        """
+        Create the cache key of a trial site.
+        :param content_hash: Digest of the input file
+        :param sheet_name: Name of the sheet if the input file contains multiple trial sites
+        :param parser_options: String describing the parser and all options that influence the parsed trial site
+        :return: Cache key
+        """
+        digest = hashlib.sha256()
+        for component in (str(CACHE_FORMAT_VERSION), content_hash, str(sheet_name), parser_options):
+            digest.update(component.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[TrialSite]:
+        """
+        Return the cached trial site of the given key, or None if there is no such entry.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self._path(key)
+        try:
+            table = pq.read_table(path)
+            # mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, pa.ArrowException):
+            logger.warning(f"Ignoring unreadable cache entry {path}")
+            return None
+        try:
+            content = json.loads(table.schema.metadata[METADATA_KEY])
+            df = table.to_pandas()
+            df.columns = pd.MultiIndex.from_tuples(
+                [_decode_label(label) for label in content["columns"]]
+            )
+        except (KeyError, TypeError, ValueError, pa.ArrowException):
+            # a file with the name of the entry that was not written by the cache, or a damaged entry
+            logger.warning(f"Ignoring corrupt cache entry {path}")
+            return None
+        return TrialSite(df, content["metadata"])
+
+    def put(self, key: str, trial_site: TrialSite) -> None:
+        """
+        Store a trial site in the cache and evict entries if the cache exceeds its maximal size.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = trial_site.df.copy(deep=False)
+        content = {
+            "columns": [_encode_label(label) for label in df.columns],
+            "metadata": trial_site.metadata,
+        }
+        df.columns = [str(index) for index in range(len(df.columns))]
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**table.schema.metadata, METADATA_KEY: json.dumps(content).encode("utf-8")}
+        )
+        # write into a temporary file first, so that concurrent processes never read incomplete entries
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(file_descriptor)
+        try:
+            pq.write_table(table, temporary_path)
+            try:
+                # an existing entry of the same key is replaced
+                replaced_size = self._path(key).stat().st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(temporary_path, self._path(key))
+        finally:
+            if os.path.exists(temporary_path):
+                os.unlink(temporary_path)
+        self.size += self._path(key).stat().st_size - replaced_size
+        if self.size > self.max_size:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache does not exceed its maximal size anymore.
+        """
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # removed by another process in the meantime
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+
+_cache: Optional[TrialSiteCache] = None
+_cache_settings: Optional[tuple] = None
+
+
+def get_trial_site_cache() -> Optional[TrialSiteCache]:
+    """
+    Return the trial site cache according to the current configuration, or None if caching is disabled.
+    """
+    global _cache, _cache_settings
+    if not setup.config.has_section("Cache") or not setup.config["Cache"].getboolean("enabled", False):
+        return None
+    directory = setup.config["Cache"].get("directory", "").strip()
+    settings = (
+        Path(directory) if directory else Path.home() / ".cache" / "vfl2csv",
+        setup.config["Cache"].getint("max_size_mb", 1024) * 2 ** 20,
+    )
+    if _cache is None or _cache_settings != settings:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as error:
+            raise IllegalConfigError(
+                "The trial site cache requires the pyarrow package to be installed"
+            ) from error
+        _cache = TrialSiteCache(*settings)
+        _cache_settings = settings
+    return _cache
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from vfl2csv import setup
+from vfl2csv.input.ExcelInputSheet import ExcelInputSheet
+from vfl2csv.input.TrialSiteCache import TrialSiteCache, get_trial_site_cache
+from vfl2csv.input.TsvInputFile import TsvInputFile
+from vfl2csv_base import test_config
+
+try:
+    import pyarrow  # noqa: F401
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+@unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow is not installed")
+class TrialSiteCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = TrialSiteCache(Path(self.tmp_dir.name), 2 ** 30)
+        self.tsv_input = TsvInputFile(test_config["Input"].getpath("tsv_sample_input_file"))
+        self.excel_input = ExcelInputSheet(test_config["Input"].getpath("excel_sample_input_file"), "09703_P2")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def assert_round_trip(self, input_data):
+        trial_site = input_data.parse_input()
+        key = self.cache.key(input_data.content_hash(), input_data.sheet_name, input_data.parser_options())
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, trial_site)
+        cached = self.cache.get(key)
+        self.assertEqual(cached.metadata, trial_site.metadata)
+        pd.testing.assert_frame_equal(cached.df, trial_site.df)
+
+    def test_round_trip_tsv(self):
+        self.assert_round_trip(self.tsv_input)
+
+    def test_round_trip_excel(self):
+        self.assert_round_trip(self.excel_input)
+
+    def test_key(self):
+        key = self.cache.key("digest", None, "tsv:1")
+        self.assertEqual(key, self.cache.key("digest", None, "tsv:1"))
+        self.assertNotEqual(key, self.cache.key("other digest", None, "tsv:1"))
+        self.assertNotEqual(key, self.cache.key("digest", "sheet", "tsv:1"))
+        self.assertNotEqual(key, self.cache.key("digest", None, "tsv:2"))
+
+    def test_eviction(self):
+        trial_site = self.tsv_input.parse_input()
+        for index in range(3):
+            self.cache.put(f"entry{index}", trial_site)
+            # make the modification times distinguishable
+            os.utime(self.cache._path(f"entry{index}"), ns=(index * 10 ** 9, index * 10 ** 9))
+        entry_size = self.cache._path("entry0").stat().st_size
+        # accessing the oldest entry makes it the most recently used one
+        self.assertIsNotNone(self.cache.get("entry0"))
+        self.cache.max_size = 2 * entry_size
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.get("entry0"))
+        self.assertIsNone(self.cache.get("entry1"))
+        self.assertIsNotNone(self.cache.get("entry2"))
+        self.assertEqual(self.cache.size, 2 * entry_size)
+
+    def test_parse_uses_cache(self):
+        cache_config = dict(setup.config["Cache"])
+        try:
+            setup.config.set("Cache", "enabled", "true")
+            setup.config.set("Cache", "directory", self.tmp_dir.name)
+            cache = get_trial_site_cache()
+            trial_site = self.tsv_input.parse()
+            self.assertEqual(len(list(cache.directory.glob("*.parquet"))), 1)
+            pd.testing.assert_frame_equal(self.tsv_input.parse().df, trial_site.df)
+            self.assertEqual(len(list(cache.directory.glob("*.parquet"))), 1)
+        finally:
+            setup.config.read_dict({"Cache": cache_config})
+        self.assertIsNone(get_trial_site_cache())
+
+    def test_replace_entry(self):
+        trial_site = self.tsv_input.parse_input()
+        self.cache.put("entry", trial_site)
+        self.cache.put("entry", trial_site)
+        self.assertEqual(self.cache.size, self.cache._path("entry").stat().st_size)
+
+    def test_corrupt_entry(self):
+        key = self.cache.key(self.tsv_input.content_hash(), None, self.tsv_input.parser_options())
+        self.cache._path(key).write_bytes(b"no parquet file")
+        self.assertIsNone(self.cache.get(key))
+        # a parquet file without the metadata of a cache entry
+        pd.DataFrame({"a": [1]}).to_parquet(self.cache._path(key))
+        self.assertIsNone(self.cache.get(key))
+
+    def test_parse_without_working_cache(self):
+        cache_config = dict(setup.config["Cache"])
+        try:
+            setup.config.set("Cache", "enabled", "true")
+            setup.config.set("Cache", "directory", self.tmp_dir.name)
+            cache = get_trial_site_cache()
+            trial_site = self.tsv_input.parse_input()
+            with (
+                mock.patch.object(cache, "get", side_effect=OSError("unreadable")),
+                mock.patch.object(cache, "put", side_effect=pyarrow.ArrowTypeError("unsupported")),
+                self.assertLogs("vfl2csv.input.InputData", "WARNING") as logs,
+            ):
+                pd.testing.assert_frame_equal(self.tsv_input.parse().df, trial_site.df)
+            self.assertEqual(len(logs.records), 2)
+            # a corrupt entry is replaced by the parsed trial site
+            key = cache.key(self.tsv_input.content_hash(), None, self.tsv_input.parser_options())
+            cache._path(key).write_bytes(b"no parquet file")
+            pd.testing.assert_frame_equal(self.tsv_input.parse().df, trial_site.df)
+            pd.testing.assert_frame_equal(cache.get(key).df, trial_site.df)
+        finally:
+            setup.config.read_dict({"Cache": cache_config})
+
+
+if __name__ == "__main__":
+    unittest.main()
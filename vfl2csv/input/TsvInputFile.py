@@ -1,10 +1,10 @@
 from pathlib import Path
 from typing import Iterable
 
-import pandas as pd
-
 from vfl2csv import setup
 from vfl2csv.input.InputData import InputData
+from vfl2csv.fingerprint import column_scheme_fingerprint
+from vfl2csv.input.tsv_parser import PARSER_VERSION, parse_tsv_file, read_tsv_metadata
 from vfl2csv_base.TrialSite import TrialSite
 from vfl2csv_base.exceptions.IOErrors import FileParsingError
 
@@ -20,38 +20,34 @@ class TsvInputFile(InputData):
         """
         super().__init__(file_path)
 
-    def parse(self) -> TrialSite:
+    def read_metadata(self) -> dict[str, str]:
         try:
-            file_stream = open(
+            return read_tsv_metadata(
                 self.file_path,
-                "r",
                 encoding=setup.config["Input"].get("tsv_encoding", "utf_8"),
             )
-            # skip first 4 rows containing unused data
-            metadata = dict()
-            for _ in range(4):
-                file_stream.readline()
-            # read following 5 rows containing one key-value-pair each
-            for _ in range(7):
-                key, value = file_stream.readline().split(":")
-                metadata[key.strip()] = value.strip()
-            # move back to start of the stream
-            file_stream.seek(0)
+        except (ValueError, OSError) as error:
+            raise FileParsingError(self.file_path) from error
+
+    def parser_options(self) -> str:
+        return ":".join((
+            "tsv",
+            str(PARSER_VERSION),
+            setup.config["Input"].get("tsv_encoding", "utf_8"),
+            setup.config["Input"].get("parse_engine", "c"),
+            column_scheme_fingerprint(setup.column_scheme),
+        ))
 
-            df = pd.read_csv(
-                file_stream,
-                sep="\t",
-                skiprows=14,
-                header=list(range(0, 4)),
-                decimal=",",
-                na_values=[" "],
+    def parse_input(self) -> TrialSite:
+        try:
+            return parse_tsv_file(
+                self.file_path,
+                encoding=setup.config["Input"].get("tsv_encoding", "utf_8"),
+                engine=setup.config["Input"].get("parse_engine", "c"),
+                column_scheme=setup.column_scheme,
             )
-            # this last column is only created by pandas because in the output format, each row ends with one tabulator
-            # instead of the last value. Consequently, this last column does not contain any values and needs to be removed.
-            df = df.drop(columns=df.columns[-1])
         except (ValueError, OSError) as error:
             raise FileParsingError(self.file_path) from error
-        return TrialSite(df, metadata)
 
     def string_representation(self, short=False):
         if short:
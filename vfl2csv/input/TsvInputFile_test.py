@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 import pandas as pd
@@ -43,6 +44,24 @@ class TsvInputFileTest(unittest.TestCase):
             },
         )
 
+    def test_read_metadata(self):
+        self.assertEqual(
+            self.sample_instance.read_metadata(), self.sample_instance.parse().metadata
+        )
+
+    def test_pickle(self):
+        input_data = TsvInputFile.iterate_files(
+            test_config["Input"].getpath("tsv_sample_input_dir").glob("*.txt")
+        )
+        for sheet in input_data:
+            sheet.parse()
+        # only a small descriptor is sent to worker processes, no matter which state was derived before
+        payload = pickle.dumps(input_data)
+        self.assertLess(len(payload), 512 * len(input_data))
+        unpickled = pickle.loads(payload)
+        self.assertListEqual([sheet.key() for sheet in unpickled], [sheet.key() for sheet in input_data])
+        pd.testing.assert_frame_equal(unpickled[0].parse().df, input_data[0].parse().df)
+
     def test_str(self):
         self.assertEqual(
             str(self.sample_instance),
@@ -0,0 +1,79 @@
+from typing import Any
+
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+from pandas.io.parsers import TextParser
+
+from vfl2csv.input.tsv_parser import parse_metadata_lines
+from vfl2csv_base.TrialSite import TrialSite
+
+# Increment whenever the reader produces different trial sites for the same input, invalidating cached trial sites
+PARSER_VERSION = 1
+
+# Layout of the Excel exports (zero-based row indices), equal to the TSV layout except for one empty line less:
+#  0 -  3: export title, export date and user, followed by an empty line
+#  4 - 10: one `key : value` metadata pair per row in the first column
+# 11 - 12: empty rows
+# 13 - 16: four header rows (date, measurement type, unit, count of values)
+# 17 -   : tree data, one tree per row
+METADATA_ROWS = slice(4, 11)
+HEADER_OFFSET = 13
+HEADER_ROW_COUNT = 4
+
+
+def convert_cell(value: Any) -> Any:
+    """
+    Convert a cell value like pandas does when reading Excel files: empty cells become empty strings and integral
+    numbers become integers.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_sheet_rows(worksheet: ReadOnlyWorksheet) -> list[list[Any]]:
+    """
+    Stream all rows of a read-only worksheet exactly once.
+    Trailing empty cells and rows are removed, the remaining rows are padded to the same length.
+    :param worksheet: Worksheet of a workbook opened in read-only mode
+    :return: List of rows of converted cell values
+    """
+    # the dimensions stored in the file are unreliable
+    worksheet.reset_dimensions()
+    rows = []
+    last_row_length = 0
+    for row in worksheet.iter_rows(values_only=True):
+        values = [convert_cell(value) for value in row]
+        while len(values) > 0 and values[-1] == "":
+            values.pop()
+        rows.append(values)
+        if len(values) > 0:
+            last_row_length = len(rows)
+    del rows[last_row_length:]
+    width = max((len(row) for row in rows), default=0)
+    for row in rows:
+        row.extend([""] * (width - len(row)))
+    return rows
+
+
+def parse_sheet_rows(rows: list[list[Any]]) -> TrialSite:
+    """
+    Create a TrialSite from the rows of an Excel export.
+    The DataFrame is identical to the one `pandas.read_excel` creates, but the workbook isn't parsed again.
+    :param rows: Rows as returned by `read_sheet_rows`
+    :raises ValueError: if the rows don't match the expected layout
+    :return: TrialSite instance
+    """
+    if len(rows) < HEADER_OFFSET + HEADER_ROW_COUNT:
+        raise ValueError(
+            f"Expected at least {HEADER_OFFSET + HEADER_ROW_COUNT} rows, found only {len(rows)}"
+        )
+    metadata = parse_metadata_lines([str(row[0]) for row in rows[METADATA_ROWS]])
+    df = TextParser(
+        rows,
+        header=list(range(HEADER_ROW_COUNT)),
+        skiprows=HEADER_OFFSET,
+        na_values=[" "],
+    ).read()
+    return TrialSite(df, metadata)
@@ -0,0 +1,40 @@
+import io
+import unittest
+
+import openpyxl
+import pandas as pd
+
+from vfl2csv.input.excel_reader import convert_cell, parse_sheet_rows, read_sheet_rows
+from vfl2csv_base import test_config
+
+
+class ExcelReaderTest(unittest.TestCase):
+    def test_equal_to_read_excel(self):
+        for path in test_config["Input"].getpath("excel_sample_input_dir").glob("*.xlsx"):
+            content = io.BytesIO(path.read_bytes())
+            workbook = openpyxl.load_workbook(content, read_only=True, data_only=True)
+            for sheet_name in workbook.sheetnames:
+                with self.subTest(file=path.name, sheet=sheet_name):
+                    trial_site = parse_sheet_rows(read_sheet_rows(workbook[sheet_name]))
+                    expected = pd.read_excel(
+                        content,
+                        sheet_name=sheet_name,
+                        header=list(range(0, 4)),
+                        skiprows=13,
+                        na_values=[" "],
+                    )
+                    pd.testing.assert_frame_equal(trial_site.df, expected)
+                    self.assertEqual(len(trial_site.metadata), 7)
+
+    def test_convert_cell(self):
+        self.assertEqual(convert_cell(None), "")
+        self.assertIsInstance(convert_cell(2.0), int)
+        self.assertEqual(convert_cell(2.5), 2.5)
+        self.assertEqual(convert_cell("a"), "a")
+
+    def test_too_few_rows(self):
+        self.assertRaises(ValueError, parse_sheet_rows, [["a"]] * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
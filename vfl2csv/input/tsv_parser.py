@@ -0,0 +1,253 @@
+import io
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionDtype
+
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.TrialSite import TrialSite
+from vfl2csv_base.datatypes_mapping import pandas_datatypes_mapping as dtypes_mapping
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+PARSE_ENGINES = ("c", "pyarrow")
+# Increment whenever the parser produces different trial sites for the same input, invalidating cached trial sites
+PARSER_VERSION = 1
+
+# Layout of the tab-separated exports (zero-based line indices):
+#  0 -  3: export title, export date and user, followed by an empty line
+#  4 - 10: one `key : value` metadata pair per line
+# 11 - 13: empty lines
+# 14 - 17: four header rows (date, measurement type, unit, count of values)
+# 18 -   : tree data, one tree per line
+METADATA_LINES = slice(4, 11)
+HEADER_LINES = slice(14, 18)
+DATA_OFFSET = 18
+
+
+def parse_tsv_file(
+        file_path: Path,
+        encoding: str,
+        engine: str = "c",
+        column_scheme: Optional[ColumnScheme] = None,
+) -> TrialSite:
+    """
+    Parse a tab-separated export into a TrialSite.
+    The file is read and decoded exactly once. Metadata and the four header rows are taken from the decoded text, only
+    the remaining data body is passed on to the tokenizer of the selected engine.
+    :param file_path: Path to the TSV file
+    :param encoding: Python codec name of the file encoding
+    :param engine: Either `c` for the pandas C engine or `pyarrow` for the multithreaded pyarrow CSV reader
+    :param column_scheme: If provided and the header matches the scheme, the columns are parsed directly into the final
+    datatypes of the scheme instead of inferring datatypes.
+    :raises ValueError: if the file does not match the expected layout or can't be decoded
+    :return: TrialSite instance
+    """
+    with open(file_path, "rb") as file:
+        text = file.read().decode(encoding)
+    return parse_tsv_text(text, engine, column_scheme)
+
+
+def parse_tsv_text(
+        text: str, engine: str = "c", column_scheme: Optional[ColumnScheme] = None
+) -> TrialSite:
+    """
+    Parse the decoded content of a tab-separated export into a TrialSite. See `parse_tsv_file`.
+    :param text: Decoded file content
+    :param engine: Parser engine, see `parse_tsv_file`
+    :param column_scheme: Optional column scheme, see `parse_tsv_file`
+    :raises ValueError: if the text does not match the expected layout
+    :return: TrialSite instance
+    """
+    if engine not in PARSE_ENGINES:
+        raise IllegalConfigError(
+            f"Parse engine `{engine}` is none of {', '.join(PARSE_ENGINES)}"
+        )
+    lines = text.split("\n", DATA_OFFSET)
+    if len(lines) < DATA_OFFSET:
+        raise ValueError(
+            f"Expected at least {DATA_OFFSET} lines, found only {len(lines)}"
+        )
+    body = lines[DATA_OFFSET] if len(lines) > DATA_OFFSET else ""
+
+    metadata = parse_metadata_lines(lines[METADATA_LINES])
+    columns = build_column_index(
+        [line.rstrip("\r").split("\t") for line in lines[HEADER_LINES]]
+    )
+    dtypes = scheme_dtypes(columns, column_scheme) if column_scheme is not None else None
+    return TrialSite(read_data_body(body, columns, engine, dtypes), metadata)
+
+
+def read_tsv_metadata(file_path: Path, encoding: str) -> dict[str, str]:
+    """
+    Read only the metadata of a tab-separated export, without reading the data.
+    :param file_path: Path to the TSV file
+    :param encoding: Python codec name of the file encoding
+    :raises ValueError: if the file does not match the expected layout or can't be decoded
+    :return: Metadata dictionary
+    """
+    with open(file_path, "r", encoding=encoding, newline="") as file:
+        lines = [file.readline() for _ in range(METADATA_LINES.stop)]
+    if lines[-1] == "":
+        raise ValueError(f"Expected at least {METADATA_LINES.stop} lines")
+    return parse_metadata_lines(lines[METADATA_LINES])
+
+
+def parse_metadata_lines(lines: list[str]) -> dict[str, str]:
+    """
+    Parse metadata lines in a `key : value` format.
+    :param lines: Metadata lines
+    :return: Metadata dictionary
+    """
+    metadata = dict()
+    for line in lines:
+        key, value = line.split(":")
+        metadata[key.strip()] = value.strip()
+    return metadata
+
+
+def build_column_index(header_rows: list[list[str]]) -> pd.MultiIndex:
+    """
+    Create the hierarchical column index from the four header rows.
+    Empty header cells are named like pandas does when reading multi-row headers (`Unnamed: {column}_level_{row}`).
+    The last column is dropped because every row of the export ends with a tabulator instead of the last value.
+    :param header_rows: List of the split header rows
+    :return: MultiIndex with four levels
+    """
+    column_count = max(len(row) for row in header_rows)
+    labels = []
+    for column_index in range(column_count - 1):
+        label = []
+        for level, row in enumerate(header_rows):
+            value = row[column_index] if column_index < len(row) else ""
+            label.append(value if value != "" else f"Unnamed: {column_index}_level_{level}")
+        labels.append(tuple(label))
+    return pd.MultiIndex.from_tuples(labels)
+
+
+def scheme_dtypes(
+        columns: pd.MultiIndex, column_scheme: ColumnScheme
+) -> Optional[list[ExtensionDtype]]:
+    """
+    Look up the datatype of every column in the column scheme.
+    :param columns: Column index created by `build_column_index`
+    :param column_scheme: Column scheme to take the datatypes from
+    :return: List of datatypes, or None if the header does not match the column scheme. In that case, the datatypes
+    are inferred and the mismatch is reported during the dataframe refactoring.
+    """
+    head_column_count = len(column_scheme.head)
+    measurement_fields_count = len(column_scheme.measurements)
+    measurement_column_count = len(columns) - head_column_count
+    if measurement_column_count < 0 or (
+            measurement_column_count > 0
+            and (
+                    measurement_fields_count == 0
+                    or measurement_column_count % measurement_fields_count != 0
+            )
+    ):
+        return None
+
+    dtypes = []
+    for template, column in zip(column_scheme.head, columns[0:head_column_count]):
+        if column[3] != template["name"]:
+            return None
+        dtypes.append(dtypes_mapping[template["type"]])
+    for index, column in enumerate(columns[head_column_count:]):
+        template = column_scheme.measurements[index % measurement_fields_count]
+        if column[1] != template["name"]:
+            return None
+        dtypes.append(dtypes_mapping[template["type"]])
+    return dtypes
+
+
+def read_data_body(
+        body: str,
+        columns: pd.MultiIndex,
+        engine: str = "c",
+        dtypes: Optional[list[ExtensionDtype]] = None,
+) -> pd.DataFrame:
+    """
+    Tokenize the data body of an export.
+    :param body: All lines following the header rows
+    :param columns: Column index created by `build_column_index`
+    :param engine: Parser engine, see `parse_tsv_file`
+    :param dtypes: Optional datatype of every column, see `scheme_dtypes`
+    :return: Dataframe with the given columns
+    """
+    if body.strip() == "":
+        df = pd.DataFrame(columns=columns)
+        return df.astype(dict(zip(columns, dtypes))) if dtypes is not None else df
+    if engine == "pyarrow":
+        df = _read_data_body_pyarrow(body, len(columns), dtypes)
+    else:
+        df = _read_data_body_c(body, len(columns), dtypes)
+    df.columns = columns
+    return df
+
+
+def _read_data_body_c(
+        body: str, column_count: int, dtypes: Optional[list[ExtensionDtype]]
+) -> pd.DataFrame:
+    parse_dtypes = None
+    if dtypes is not None:
+        # The C engine does not respect the decimal separator for nullable extension types, and numpy integers can't
+        # hold missing values. Therefore, numeric columns are tokenized into float64 and strings into objects without
+        # any type inference, followed by a single cast into the final datatypes.
+        parse_dtypes = {
+            index: object if isinstance(dtype, pd.StringDtype) else np.float64
+            for index, dtype in enumerate(dtypes)
+        }
+    df = pd.read_csv(
+        io.StringIO(body),
+        sep="\t",
+        header=None,
+        # one more column than labels because of the trailing tabulator in every line
+        names=range(column_count + 1),
+        usecols=range(column_count),
+        decimal=",",
+        na_values=[" "],
+        dtype=parse_dtypes,
+    )
+    if dtypes is not None:
+        df = df.astype(dict(enumerate(dtypes)))
+    return df
+
+
+def _read_data_body_pyarrow(
+        body: str, column_count: int, dtypes: Optional[list[ExtensionDtype]]
+) -> pd.DataFrame:
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError as error:
+        raise IllegalConfigError(
+            "Parse engine `pyarrow` requires the pyarrow package to be installed"
+        ) from error
+
+    # one more column than labels because of the trailing tabulator in every line
+    column_names = [str(index) for index in range(column_count + 1)]
+    column_types = None
+    types_mapper = None
+    if dtypes is not None:
+        arrow_types = [
+            pa.string()
+            if isinstance(dtype, pd.StringDtype)
+            else pa.from_numpy_dtype(dtype.numpy_dtype)
+            for dtype in dtypes
+        ]
+        column_types = dict(zip(column_names, arrow_types))
+        types_mapper = dict(zip(arrow_types, dtypes)).get
+    table = pa_csv.read_csv(
+        io.BytesIO(body.encode("utf-8")),
+        read_options=pa_csv.ReadOptions(column_names=column_names, use_threads=True),
+        parse_options=pa_csv.ParseOptions(delimiter="\t"),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            include_columns=column_names[:-1],
+            null_values=pa_csv.ConvertOptions().null_values + [" "],
+            strings_can_be_null=True,
+            decimal_point=",",
+        ),
+    )
+    return table.to_pandas(types_mapper=types_mapper)
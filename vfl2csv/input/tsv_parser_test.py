@@ -0,0 +1,92 @@
+import importlib.util
+import unittest
+
+import pandas as pd
+
+from vfl2csv.input.tsv_parser import parse_tsv_file, parse_tsv_text, scheme_dtypes
+from vfl2csv_base import test_config
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+pyarrow_available = importlib.util.find_spec("pyarrow") is not None
+
+
+class TsvParserTest(unittest.TestCase):
+    encoding = "iso8859_15"
+    column_scheme = ColumnScheme.from_file(
+        test_config["Input"].getpath("vfl2csv_test_columns_config")
+    )
+
+    def read_multiindex_csv(self, path) -> pd.DataFrame:
+        df = pd.read_csv(
+            path,
+            sep="\t",
+            skiprows=14,
+            header=list(range(0, 4)),
+            decimal=",",
+            na_values=[" "],
+            encoding=self.encoding,
+        )
+        return df.drop(columns=df.columns[-1])
+
+    def test_parse_matches_multiindex_read_csv(self):
+        for path in test_config["Input"].getpath("tsv_sample_input_dir").glob("*.txt"):
+            with self.subTest(path=path):
+                expected = self.read_multiindex_csv(path)
+                df = parse_tsv_file(path, self.encoding).df
+                self.assertListEqual(list(df.columns), list(expected.columns))
+                self.assertTrue(df.equals(expected))
+
+    def assert_scheme_dtypes(self, engine: str):
+        for path in test_config["Input"].getpath("tsv_sample_input_dir").glob("*.txt"):
+            with self.subTest(path=path):
+                df = parse_tsv_file(path, self.encoding, engine, self.column_scheme).df
+                expected_dtypes = scheme_dtypes(df.columns, self.column_scheme)
+                self.assertIsNotNone(expected_dtypes)
+                self.assertListEqual(df.dtypes.tolist(), expected_dtypes)
+                expected = self.read_multiindex_csv(path)
+                expected = expected.astype(dict(zip(expected.columns, expected_dtypes)))
+                self.assertTrue(df.equals(expected))
+
+    def test_parse_c_engine_scheme_dtypes(self):
+        self.assert_scheme_dtypes("c")
+
+    @unittest.skipUnless(pyarrow_available, "pyarrow is not installed")
+    def test_parse_pyarrow_engine_scheme_dtypes(self):
+        self.assert_scheme_dtypes("pyarrow")
+
+    def test_parse_scheme_mismatch(self):
+        # the default column scheme expects more measurement fields than the sample file contains
+        column_scheme = ColumnScheme.from_file("config/columns.json")
+        path = test_config["Input"].getpath("tsv_sample_input_file")
+        df = parse_tsv_file(path, self.encoding, "c", column_scheme).df
+        self.assertIsNone(scheme_dtypes(df.columns, column_scheme))
+        self.assertTrue(df.equals(self.read_multiindex_csv(path)))
+
+    def test_parse_illegal_engine(self):
+        self.assertRaises(
+            IllegalConfigError,
+            parse_tsv_file,
+            test_config["Input"].getpath("tsv_sample_input_file"),
+            self.encoding,
+            "python",
+        )
+
+    def test_parse_without_data_rows(self):
+        with open(
+            test_config["Input"].getpath("tsv_sample_input_file"),
+            "r",
+            encoding=self.encoding,
+        ) as file:
+            lines = file.readlines()[:18]
+        trial_site = parse_tsv_text("".join(lines))
+        self.assertEqual(len(trial_site.df), 0)
+        self.assertEqual(len(trial_site.df.columns), 15)
+        self.assertEqual(trial_site.metadata["Versuch"], "14607")
+
+    def test_parse_truncated_file(self):
+        self.assertRaises(ValueError, parse_tsv_text, "Exportierte Tabelle\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.TrialSite import TrialSite
+from vfl2csv_base.datatypes_mapping import pandas_datatypes_mapping as dtypes_mapping
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+# subdirectories of the output directory containing the measurements and the metadata of all trial sites
+MEASUREMENTS_DIRECTORY = "measurements"
+SITES_DIRECTORY = "sites"
+# metadata keys whose values partition the measurements, in directory order
+PARTITION_KEYS = ("Revier", "Versuch")
+# metadata key identifying a trial site within its partition
+SITE_KEY = "Parzelle"
+YEAR_COLUMN = "Jahr"
+# buffered rows of a writer that trigger writing the buffered trial sites before the end of a batch
+FLUSH_ROW_COUNT = 1_000_000
+
+
+def to_long_format(df: pd.DataFrame, column_scheme: ColumnScheme) -> pd.DataFrame:
+    """
+    Convert the refactored dataframe of a trial site into the long format: one row per tree and measurement year,
+    consisting of the head columns, the year and one column per measurement field.
+    :param df: Refactored dataframe with measurement columns labelled 'type_year'
+    :param column_scheme: Column scheme the dataframe was refactored with
+    :return: Dataframe in long format
+    """
+    head_names = [column.get("override_name", column["name"]) for column in column_scheme.head]
+    measurement_names = [column.get("override_name", column["name"]) for column in column_scheme.measurements]
+    head = df.iloc[:, :len(head_names)]
+    frames = []
+    for start in range(len(head_names), len(df.columns), len(measurement_names)):
+        measurements = df.iloc[:, start:start + len(measurement_names)].set_axis(measurement_names, axis="columns")
+        year = int(df.columns[start].rsplit("_", maxsplit=1)[1])
+        frames.append(
+            pd.concat(
+                [head, pd.Series(year, index=df.index, name=YEAR_COLUMN, dtype=pd.UInt16Dtype()), measurements],
+                axis="columns",
+            )
+        )
+    if len(frames) == 0:
+        # trial site without measurements, the schema is kept anyway
+        return pd.DataFrame({
+            name: pd.Series(dtype=dtype)
+            for name, dtype in zip(
+                [*head_names, YEAR_COLUMN, *measurement_names],
+                [
+                    *head.dtypes,
+                    pd.UInt16Dtype(),
+                    *(dtypes_mapping[column["type"]] for column in column_scheme.measurements),
+                ],
+            )
+        })
+    return pd.concat(frames, ignore_index=True)
+
+
+def partition_directory(metadata: dict[str, str]) -> Path:
+    """
+    Return the directory of the partition of a trial site, relative to the measurements directory. The directory
+    names follow the hive partitioning scheme with URI-encoded values, as read by pyarrow.
+    :param metadata: Metadata of the trial site
+    :return: Relative partition directory
+    """
+    return Path(*(f"{key}={quote(metadata[key], safe=' ')}" for key in PARTITION_KEYS))
+
+
+class DatasetWriter:
+    def __init__(self, directory: Path, column_scheme: ColumnScheme):
+        """
+        Create a writer appending trial sites to the dataset in the given directory.
+        Trial sites are buffered and written as one Parquet file per partition by `flush`, so that a batch of trial
+        sites creates only a few files.
+        :param directory: Output directory containing the measurements and sites directories
+        :param column_scheme: Column scheme the trial sites were refactored with
+        """
+        self.directory = directory
+        self.column_scheme = column_scheme
+        self._partitions: dict[Path, list[pd.DataFrame]] = {}
+        self._sites: list[dict[str, str]] = []
+        self._row_count = 0
+        self._lock = threading.Lock()
+
+    def append(self, trial_site: TrialSite) -> None:
+        """
+        Add a refactored trial site to the dataset. The trial site is written with the next flush.
+        :param trial_site: Refactored trial site
+        """
+        metadata = {key: value for key, value in trial_site.metadata.items() if key != "DataFrame"}
+        data = to_long_format(trial_site.df, self.column_scheme)
+        data.insert(0, SITE_KEY, pd.Series(metadata[SITE_KEY], index=data.index, dtype=pd.StringDtype()))
+        with self._lock:
+            self._partitions.setdefault(partition_directory(metadata), []).append(data)
+            self._sites.append(metadata)
+            self._row_count += len(data)
+            exceeded = self._row_count >= FLUSH_ROW_COUNT
+        if exceeded:
+            self.flush()
+
+    def flush(self) -> list[Path]:
+        """
+        Write all buffered trial sites, one file per partition and one file of their metadata.
+        :return: Paths of the written files
+        """
+        with self._lock:
+            partitions, self._partitions = self._partitions, {}
+            sites, self._sites = self._sites, []
+            self._row_count = 0
+        part_name = f"part-{uuid.uuid4().hex}.parquet"
+        written = []
+        for partition, frames in partitions.items():
+            path = self.directory / MEASUREMENTS_DIRECTORY / partition / part_name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            pd.concat(frames, ignore_index=True).to_parquet(path, engine="pyarrow", index=False)
+            written.append(path)
+        if len(sites) != 0:
+            path = self.directory / SITES_DIRECTORY / part_name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(sites, dtype=pd.StringDtype()).to_parquet(path, engine="pyarrow", index=False)
+            written.append(path)
+        return written
+
+
+def check_dataset_support() -> None:
+    """
+    Verify that datasets can be written.
+    :raises IllegalConfigError: if pyarrow is not installed
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise IllegalConfigError(
+            "The dataset output requires the pyarrow package to be installed"
+        ) from error
+
+
+_writers: dict[Path, DatasetWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_dataset_writer(directory: Path, column_scheme: ColumnScheme) -> DatasetWriter:
+    """
+    Return the writer of this process for the dataset in the given directory.
+    :raises IllegalConfigError: if pyarrow is not installed
+    """
+    with _writers_lock:
+        writer = _writers.get(directory)
+        if writer is None or writer.column_scheme is not column_scheme:
+            if writer is not None:
+                writer.flush()
+            check_dataset_support()
+            writer = DatasetWriter(directory, column_scheme)
+            _writers[directory] = writer
+        return writer
+
+
+def flush_dataset_writers() -> list[Path]:
+    """
+    Write the buffered trial sites of all writers of this process.
+    :return: Paths of the written files
+    """
+    with _writers_lock:
+        writers = list(_writers.values())
+    written = []
+    for writer in writers:
+        written.extend(writer.flush())
+    return written
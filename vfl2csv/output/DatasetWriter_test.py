@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.TrialSite import TrialSite
+from vfl2csv.output.DatasetWriter import (
+    DatasetWriter,
+    MEASUREMENTS_DIRECTORY,
+    SITES_DIRECTORY,
+    partition_directory,
+    to_long_format,
+)
+
+try:
+    import pyarrow  # noqa: F401
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class DatasetWriterTest(unittest.TestCase):
+    column_scheme = ColumnScheme.from_file(path=Path("config/columns_simple.json"))
+    sample_df = pd.DataFrame(
+        {
+            "Bestandeseinheit": pd.array([1, 1], dtype=pd.UInt16Dtype()),
+            "Baumart": pd.array(["211", "511"], dtype=pd.StringDtype()),
+            "Baumnummer": pd.array([1, 2], dtype=pd.UInt32Dtype()),
+            "D_1983": pd.array([12.5, None], dtype=pd.Float64Dtype()),
+            "Aus_1983": pd.array([None, 2], dtype=pd.UInt8Dtype()),
+            "H_1983": pd.array([10.0, None], dtype=pd.Float64Dtype()),
+            "D_1994": pd.array([20.0, None], dtype=pd.Float64Dtype()),
+            "Aus_1994": pd.array([None, None], dtype=pd.UInt8Dtype()),
+            "H_1994": pd.array([15.5, None], dtype=pd.Float64Dtype()),
+        }
+    )
+    sample_metadata = {
+        "Revier": "Tiefborn",
+        "Versuch": "09703",
+        "Parzelle": "02",
+        "DataFrame": "09703-02.csv",
+    }
+
+    def test_to_long_format(self):
+        df = to_long_format(self.sample_df, self.column_scheme)
+        self.assertListEqual(
+            list(df.columns), ["Bestandeseinheit", "Baumart", "Baumnummer", "Jahr", "D", "Aus", "H"]
+        )
+        self.assertListEqual(df["Jahr"].tolist(), [1983, 1983, 1994, 1994])
+        self.assertListEqual(df["Baumnummer"].tolist(), [1, 2, 1, 2])
+        self.assertEqual(df["H"].tolist()[2], 15.5)
+        self.assertEqual(df["D"].dtype, pd.Float64Dtype())
+        self.assertEqual(df["Aus"].dtype, pd.UInt8Dtype())
+
+        # the schema of trial sites without measurements is the same
+        empty = to_long_format(self.sample_df.iloc[:, :3], self.column_scheme)
+        self.assertEqual(len(empty), 0)
+        pd.testing.assert_series_equal(empty.dtypes, df.dtypes)
+
+    def test_partition_directory(self):
+        self.assertEqual(partition_directory(self.sample_metadata), Path("Revier=Tiefborn/Versuch=09703"))
+        self.assertEqual(
+            partition_directory({"Revier": "A/B", "Versuch": "1 2"}), Path("Revier=A%2FB/Versuch=1 2")
+        )
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow is not installed")
+    def test_flush(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = DatasetWriter(Path(tmp), self.column_scheme)
+            writer.append(TrialSite(self.sample_df, dict(self.sample_metadata)))
+            writer.append(TrialSite(self.sample_df, dict(self.sample_metadata, Parzelle="03")))
+            written = writer.flush()
+            # one file for the single partition and one for the metadata
+            self.assertEqual(len(written), 2)
+            self.assertListEqual(writer.flush(), [])
+
+            measurements = pd.read_parquet(Path(tmp) / MEASUREMENTS_DIRECTORY)
+            self.assertEqual(len(measurements), 8)
+            self.assertSetEqual(set(measurements["Parzelle"]), {"02", "03"})
+            self.assertSetEqual(set(measurements["Revier"].astype(str)), {"Tiefborn"})
+            sites = pd.read_parquet(Path(tmp) / SITES_DIRECTORY)
+            self.assertListEqual(sites["Parzelle"].tolist(), ["02", "03"])
+            self.assertNotIn("DataFrame", sites.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+from vfl2csv.exceptions import OutputExistsError
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+# directory within the output directory that contains the output files of trial sites while they are written
+STAGING_DIRECTORY_NAME = ".vfl2csv-staging"
+# file: sync every file before it is moved into place, batch: sync the files committed since the last flush, which
+# happens whenever the journal is written, see `ConversionJournal.JOURNAL_FLUSH_COUNT`, none: leave syncing to the
+# operating system
+FSYNC_POLICIES = ("file", "batch", "none")
+
+
+def validate_fsync_policy(fsync_policy: str) -> None:
+    """
+    Verify that the fsync policy is known.
+    :raises IllegalConfigError: if the fsync policy is unknown
+    """
+    if fsync_policy not in FSYNC_POLICIES:
+        raise IllegalConfigError(f'`fsync` must be one of {", ".join(FSYNC_POLICIES)}')
+
+
+def fsync_file(path: Path) -> None:
+    with open(path, "rb") as file:
+        os.fsync(file.fileno())
+
+
+def fsync_directory(path: Path) -> None:
+    """
+    Persist the entries of a directory, i.e. files moved into it. Directories can't be synced on Windows, where moving
+    a file is persisted by the file system itself.
+    """
+    if os.name == "nt":
+        return
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def publish(source: Path, target: Path) -> None:
+    """
+    Move a file into place without overwriting an existing file.
+    On POSIX systems, the file is hard linked to the target, which fails atomically if the target exists, and removed
+    afterwards. File systems without hard links fall back to a rename after an existence check. On Windows, a rename
+    never overwrites an existing file.
+    :raises OutputExistsError: if the target exists
+    """
+    try:
+        if os.name == "nt":
+            os.rename(source, target)
+            return
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            raise
+        except OSError:
+            if target.exists():
+                raise FileExistsError(target)
+            os.rename(source, target)
+            return
+        os.unlink(source)
+    except FileExistsError as error:
+        raise OutputExistsError(target) from error
+
+
+def remove_staging_directory(output_dir: Path) -> None:
+    """
+    Remove the output files left behind by an interrupted conversion into the output directory.
+    """
+    shutil.rmtree(output_dir / STAGING_DIRECTORY_NAME, ignore_errors=True)
+
+
+class OutputCommitter:
+    def __init__(self, directory: Path, fsync_policy: str):
+        """
+        Create a committer writing output files into place as a unit. Output files are written into a staging
+        directory on the same file system first and moved into place by `commit` once all of them are complete, so
+        that an interrupted conversion never leaves empty or partially written output files behind.
+        :param directory: Output directory, which contains the staging directory
+        :param fsync_policy: One of `FSYNC_POLICIES`
+        """
+        validate_fsync_policy(fsync_policy)
+        self.directory = directory
+        self.fsync_policy = fsync_policy
+        # files committed since the last flush, synced by the next flush with the `batch` policy
+        self._committed: list[Path] = []
+        self._lock = threading.Lock()
+
+    def stage(self, targets: list[Path]) -> list[Path]:
+        """
+        Reserve staging paths for the given output files. The staging paths keep the names of the output files,
+        as some formats embed the file name.
+        :param targets: Output files
+        :return: Staging path of every output file
+        :raises OutputExistsError: if an output file exists already
+        """
+        for target in targets:
+            if target.exists():
+                raise OutputExistsError(target)
+        staging = self.directory / STAGING_DIRECTORY_NAME / uuid.uuid4().hex
+        staged = [staging / str(index) / target.name for index, target in enumerate(targets)]
+        for path in staged:
+            path.parent.mkdir(parents=True)
+        return staged
+
+    def commit(self, staged: list[Path], targets: list[Path]) -> None:
+        """
+        Move completely written output files into place in the given order. If an output file can't be moved into
+        place, the output files moved before are removed again.
+        :param staged: Staging paths returned by `stage`
+        :param targets: Output files
+        :raises OutputExistsError: if an output file exists already
+        """
+        if self.fsync_policy == "file":
+            for path in staged:
+                fsync_file(path)
+        published = []
+        try:
+            for source, target in zip(staged, targets):
+                target.parent.mkdir(parents=True, exist_ok=True)
+                publish(source, target)
+                published.append(target)
+        except BaseException:
+            for target in published:
+                target.unlink(missing_ok=True)
+            raise
+        finally:
+            self.discard(staged)
+        if self.fsync_policy == "file":
+            for directory in dict.fromkeys(target.parent for target in targets):
+                fsync_directory(directory)
+        elif self.fsync_policy == "batch":
+            with self._lock:
+                self._committed.extend(targets)
+
+    def discard(self, staged: list[Path]) -> None:
+        """
+        Remove the staging directory of output files that are not committed.
+        :param staged: Staging paths returned by `stage`
+        """
+        if len(staged) != 0:
+            shutil.rmtree(staged[0].parent.parent, ignore_errors=True)
+
+    def flush(self) -> None:
+        """
+        Sync the files committed since the last flush and their directories, if the `batch` policy is used.
+        """
+        with self._lock:
+            committed, self._committed = self._committed, []
+        for path in committed:
+            fsync_file(path)
+        for directory in dict.fromkeys(path.parent for path in committed):
+            fsync_directory(directory)
+
+
+_committers: dict[Path, OutputCommitter] = {}
+_committers_lock = threading.Lock()
+
+
+def get_output_committer(directory: Path, fsync_policy: str) -> OutputCommitter:
+    """
+    Return the committer of this process for the given output directory.
+    :raises IllegalConfigError: if the fsync policy is unknown
+    """
+    with _committers_lock:
+        committer = _committers.get(directory)
+        if committer is None or committer.fsync_policy != fsync_policy:
+            if committer is not None:
+                committer.flush()
+            committer = OutputCommitter(directory, fsync_policy)
+            _committers[directory] = committer
+        return committer
+
+
+def flush_output_committers() -> None:
+    """
+    Sync the committed files of all committers of this process, see `OutputCommitter.flush`.
+    """
+    with _committers_lock:
+        committers = list(_committers.values())
+    for committer in committers:
+        committer.flush()
@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from vfl2csv.exceptions import OutputExistsError
+from vfl2csv.output.OutputCommitter import (
+    FSYNC_POLICIES,
+    OutputCommitter,
+    STAGING_DIRECTORY_NAME,
+    remove_staging_directory,
+)
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+
+class OutputCommitterTest(unittest.TestCase):
+    def test_commit(self):
+        for fsync_policy in FSYNC_POLICIES:
+            with tempfile.TemporaryDirectory() as tmp:
+                committer = OutputCommitter(Path(tmp), fsync_policy)
+                targets = [Path(tmp) / "Revier" / "data.csv", Path(tmp) / "Revier" / "data_metadata.txt"]
+                staged = committer.stage(targets)
+                # the staging paths keep the file names
+                self.assertListEqual([path.name for path in staged], [target.name for target in targets])
+                for path in staged:
+                    path.write_text(path.name, encoding="utf-8")
+                self.assertFalse(targets[0].exists())
+                committer.commit(staged, targets)
+                committer.flush()
+                for target in targets:
+                    self.assertEqual(target.read_text(encoding="utf-8"), target.name)
+                self.assertListEqual(list((Path(tmp) / STAGING_DIRECTORY_NAME).iterdir()), [])
+
+    def test_existing_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            committer = OutputCommitter(Path(tmp), "none")
+            targets = [Path(tmp) / "data.csv", Path(tmp) / "data_metadata.txt"]
+            targets[0].write_text("existing", encoding="utf-8")
+            self.assertRaises(OutputExistsError, committer.stage, targets)
+
+            # the metadata file is created by someone else while the files are written
+            targets[0].unlink()
+            staged = committer.stage(targets)
+            for path in staged:
+                path.write_text("new", encoding="utf-8")
+            targets[1].write_text("existing", encoding="utf-8")
+            self.assertRaises(OutputExistsError, committer.commit, staged, targets)
+            # the data file moved into place before is removed again, the existing file is kept
+            self.assertFalse(targets[0].exists())
+            self.assertEqual(targets[1].read_text(encoding="utf-8"), "existing")
+            self.assertListEqual(list((Path(tmp) / STAGING_DIRECTORY_NAME).iterdir()), [])
+
+    def test_fsync_policies(self):
+        self.assertRaises(IllegalConfigError, OutputCommitter, Path("."), "always")
+        with tempfile.TemporaryDirectory() as tmp:
+            for fsync_policy, during_commit, during_flush in (("file", 2, 0), ("batch", 0, 2), ("none", 0, 0)):
+                committer = OutputCommitter(Path(tmp), fsync_policy)
+                targets = [Path(tmp) / fsync_policy / "data.csv", Path(tmp) / fsync_policy / "data_metadata.txt"]
+                staged = committer.stage(targets)
+                for path in staged:
+                    path.touch()
+                with mock.patch("vfl2csv.output.OutputCommitter.fsync_file") as fsync_file:
+                    committer.commit(staged, targets)
+                    self.assertEqual(fsync_file.call_count, during_commit)
+                    committer.flush()
+                    self.assertEqual(fsync_file.call_count, during_commit + during_flush)
+
+    def test_remove_staging_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            committer = OutputCommitter(Path(tmp), "none")
+            # files of an interrupted conversion
+            staged = committer.stage([Path(tmp) / "data.csv"])
+            staged[0].write_text("partial", encoding="utf-8")
+            remove_staging_directory(Path(tmp))
+            self.assertFalse((Path(tmp) / STAGING_DIRECTORY_NAME).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
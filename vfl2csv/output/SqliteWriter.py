@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from vfl2csv.output.DatasetWriter import YEAR_COLUMN, to_long_format
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.TrialSite import TrialSite
+
+DATABASE_FILE_NAME = "vfl2csv.sqlite"
+# every process writes into its own database, which are merged into the database after the conversion
+PART_FILE_PATTERN = DATABASE_FILE_NAME + ".part-*"
+SITE_COLUMN = "site"
+INPUT_COLUMN = "input"
+# inserted measurement rows of a writer that trigger committing its transaction before the end of the conversion
+COMMIT_ROW_COUNT = 1_000_000
+# column types of the datatypes of the column scheme
+SQLITE_TYPES = {
+    "string": "TEXT",
+    "int8": "INTEGER",
+    "int16": "INTEGER",
+    "int32": "INTEGER",
+    "int64": "INTEGER",
+    "uint8": "INTEGER",
+    "uint16": "INTEGER",
+    "uint32": "INTEGER",
+    "uint64": "INTEGER",
+    "float32": "REAL",
+    "float64": "REAL",
+}
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def measurement_columns(column_scheme: ColumnScheme) -> list[tuple[str, str]]:
+    """
+    Return names and types of the columns of the measurements table.
+    :param column_scheme: Column scheme the trial sites were refactored with
+    :return: List of column names and SQLite column types
+    """
+    return [
+        (SITE_COLUMN, "TEXT NOT NULL"),
+        *(
+            (column.get("override_name", column["name"]), SQLITE_TYPES[column["type"]])
+            for column in column_scheme.head
+        ),
+        (YEAR_COLUMN, "INTEGER"),
+        *(
+            (column.get("override_name", column["name"]), SQLITE_TYPES[column["type"]])
+            for column in column_scheme.measurements
+        ),
+    ]
+
+
+def connect(path: Path, column_scheme: ColumnScheme) -> sqlite3.Connection:
+    """
+    Open the database at the given path using the WAL journal and create its tables if they don't exist.
+    Metadata columns of the sites table are added when trial sites with new metadata keys are inserted.
+    """
+    # writers are used by the threads of the pipeline as well, guarded by their lock
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        f"CREATE TABLE IF NOT EXISTS sites ({SITE_COLUMN} TEXT PRIMARY KEY, {INPUT_COLUMN} TEXT NOT NULL)"
+    )
+    columns = ", ".join(
+        f"{quote_identifier(name)} {column_type}" for name, column_type in measurement_columns(column_scheme)
+    )
+    connection.execute(f"CREATE TABLE IF NOT EXISTS measurements ({columns})")
+    return connection
+
+
+def add_site_columns(connection: sqlite3.Connection, keys: list[str]) -> None:
+    """
+    Add a column for every metadata key that has no column in the sites table yet.
+    """
+    existing = {row[1] for row in connection.execute("PRAGMA main.table_info(sites)")}
+    for key in keys:
+        if key not in existing:
+            connection.execute(f"ALTER TABLE main.sites ADD COLUMN {quote_identifier(key)} TEXT")
+            existing.add(key)
+
+
+class SqliteWriter:
+    def __init__(self, directory: Path, column_scheme: ColumnScheme):
+        """
+        Create a writer inserting trial sites into a database of the current process in the given directory.
+        The connection and its transaction are kept open across batches: trial sites are inserted when they are
+        appended and committed once `COMMIT_ROW_COUNT` measurement rows were inserted, or by `flush` at the end of the
+        conversion. `flush` closes the connection, so that the databases of all processes can be merged with
+        `merge_databases`.
+        :param directory: Output directory
+        :param column_scheme: Column scheme the trial sites were refactored with
+        """
+        self.directory = directory
+        self.column_scheme = column_scheme
+        self.path = directory / f"{DATABASE_FILE_NAME}.part-{os.getpid()}"
+        self._connection: Optional[sqlite3.Connection] = None
+        # measurement rows inserted since the last commit
+        self._row_count = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._connection = connect(self.path, self.column_scheme)
+            # transactions are controlled explicitly
+            self._connection.isolation_level = None
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN")
+        return self._connection
+
+    def append(self, trial_site: TrialSite, site: str, input_key: str) -> None:
+        """
+        Insert a refactored trial site into the current transaction. A trial site that fails to be inserted is rolled
+        back completely.
+        :param trial_site: Refactored trial site
+        :param site: Key of the trial site in the database
+        :param input_key: Key of the input data the trial site was converted from
+        """
+        metadata = {key: value for key, value in trial_site.metadata.items() if key != "DataFrame"}
+        data = to_long_format(trial_site.df, self.column_scheme).astype(object)
+        data.insert(0, SITE_COLUMN, site)
+        with self._lock:
+            connection = self._open()
+            connection.execute("SAVEPOINT trial_site")
+            try:
+                keys = list(metadata)
+                add_site_columns(connection, keys)
+                columns = ", ".join(quote_identifier(name) for name in (SITE_COLUMN, INPUT_COLUMN, *keys))
+                connection.execute(
+                    f"INSERT INTO sites ({columns}) VALUES ({', '.join('?' * (len(keys) + 2))})",
+                    (site, input_key, *metadata.values()),
+                )
+                connection.executemany(
+                    f"INSERT INTO measurements VALUES ({', '.join('?' * len(data.columns))})",
+                    data.where(data.notna(), None).itertuples(index=False, name=None),
+                )
+            except BaseException:
+                connection.execute("ROLLBACK TO trial_site")
+                raise
+            finally:
+                connection.execute("RELEASE trial_site")
+            self._row_count += len(data)
+            if self._row_count >= COMMIT_ROW_COUNT:
+                connection.execute("COMMIT")
+                self._row_count = 0
+
+    def flush(self) -> None:
+        """
+        Commit the inserted trial sites and close the connection.
+        """
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                if self._connection.in_transaction:
+                    self._connection.execute("COMMIT")
+            finally:
+                self._connection.close()
+                self._connection = None
+                self._row_count = 0
+
+
+def merge_databases(directory: Path, column_scheme: ColumnScheme) -> Path:
+    """
+    Merge the databases written by all processes into the database of the output directory and remove them.
+    :param directory: Output directory
+    :param column_scheme: Column scheme the trial sites were refactored with
+    :return: Path of the merged database
+    """
+    target = directory / DATABASE_FILE_NAME
+    directory.mkdir(parents=True, exist_ok=True)
+    connection = connect(target, column_scheme)
+    try:
+        for part in sorted(directory.glob(PART_FILE_PATTERN)):
+            if part.name.endswith(("-wal", "-shm")):
+                continue
+            connection.execute("ATTACH DATABASE ? AS part", (str(part),))
+            try:
+                with connection:
+                    keys = [row[1] for row in connection.execute("PRAGMA part.table_info(sites)")]
+                    add_site_columns(connection, keys)
+                    columns = ", ".join(quote_identifier(key) for key in keys)
+                    connection.execute(f"INSERT INTO sites ({columns}) SELECT {columns} FROM part.sites")
+                    connection.execute("INSERT INTO measurements SELECT * FROM part.measurements")
+            finally:
+                connection.execute("DETACH DATABASE part")
+            for path in (part, Path(f"{part}-wal"), Path(f"{part}-shm")):
+                path.unlink(missing_ok=True)
+        with connection:
+            connection.execute(f"CREATE INDEX IF NOT EXISTS measurements_site ON measurements ({SITE_COLUMN})")
+    finally:
+        connection.close()
+    return target
+
+
+_writers: dict[Path, SqliteWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_sqlite_writer(directory: Path, column_scheme: ColumnScheme) -> SqliteWriter:
+    """
+    Return the writer of this process for the database in the given directory.
+    """
+    with _writers_lock:
+        writer = _writers.get(directory)
+        if writer is None or writer.column_scheme is not column_scheme:
+            if writer is not None:
+                writer.flush()
+            writer = SqliteWriter(directory, column_scheme)
+            _writers[directory] = writer
+        return writer
+
+
+def flush_sqlite_writers() -> None:
+    """
+    Commit the inserted trial sites of all writers of this process and close their connections.
+    """
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush()
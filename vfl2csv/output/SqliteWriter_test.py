@@ -0,0 +1,109 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from vfl2csv.output.SqliteWriter import DATABASE_FILE_NAME, SqliteWriter, merge_databases
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.TrialSite import TrialSite
+
+
+class SqliteWriterTest(unittest.TestCase):
+    column_scheme = ColumnScheme.from_file(path=Path("config/columns_simple.json"))
+    sample_df = pd.DataFrame(
+        {
+            "Bestandeseinheit": pd.array([1, 1], dtype=pd.UInt16Dtype()),
+            "Baumart": pd.array(["211", None], dtype=pd.StringDtype()),
+            "Baumnummer": pd.array([1, 2], dtype=pd.UInt32Dtype()),
+            "D_1983": pd.array([12.5, None], dtype=pd.Float64Dtype()),
+            "Aus_1983": pd.array([None, 2], dtype=pd.UInt8Dtype()),
+            "H_1983": pd.array([10.0, None], dtype=pd.Float64Dtype()),
+        }
+    )
+    sample_metadata = {
+        "Revier": "Tiefborn",
+        "Versuch": "09703",
+        "Parzelle": "02",
+        "DataFrame": "09703-02.csv",
+    }
+
+    def test_flush_and_merge(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = SqliteWriter(Path(tmp), self.column_scheme)
+            writer.append(TrialSite(self.sample_df, dict(self.sample_metadata)), "Tiefborn/09703-02", "input-1")
+            writer.flush()
+            # another process with a metadata key the first one didn't write
+            other_writer = SqliteWriter(Path(tmp), self.column_scheme)
+            other_writer.path = Path(tmp) / f"{DATABASE_FILE_NAME}.part-other"
+            other_writer.append(
+                TrialSite(self.sample_df, dict(self.sample_metadata, Parzelle="03", Standort="Uf-K1")),
+                "Tiefborn/09703-03",
+                "input-2",
+            )
+            other_writer.flush()
+
+            database = merge_databases(Path(tmp), self.column_scheme)
+            self.assertListEqual([path.name for path in Path(tmp).iterdir()], [DATABASE_FILE_NAME])
+            connection = sqlite3.connect(database)
+            try:
+                sites = connection.execute(
+                    "SELECT site, input, Parzelle, Standort FROM sites ORDER BY site"
+                ).fetchall()
+                self.assertListEqual(
+                    sites,
+                    [("Tiefborn/09703-02", "input-1", "02", None), ("Tiefborn/09703-03", "input-2", "03", "Uf-K1")],
+                )
+                self.assertNotIn(
+                    "DataFrame", [row[1] for row in connection.execute("PRAGMA table_info(sites)")]
+                )
+                measurements = connection.execute(
+                    "SELECT Baumart, Baumnummer, Jahr, D, Aus, H FROM measurements WHERE site = ? ORDER BY Baumnummer",
+                    ("Tiefborn/09703-02",),
+                ).fetchall()
+                self.assertListEqual(measurements, [("211", 1, 1983, 12.5, None, 10.0), (None, 2, 1983, None, 2, None)])
+            finally:
+                connection.close()
+
+    def test_commit_threshold(self):
+        def committed_sites(path: Path) -> int:
+            connection = sqlite3.connect(path)
+            try:
+                return connection.execute("SELECT COUNT(*) FROM sites").fetchone()[0]
+            finally:
+                connection.close()
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch("vfl2csv.output.SqliteWriter.COMMIT_ROW_COUNT", 4):
+            writer = SqliteWriter(Path(tmp), self.column_scheme)
+            writer.append(TrialSite(self.sample_df, dict(self.sample_metadata)), "Tiefborn/09703-02", "input-1")
+            # the trial site is inserted into the open transaction
+            self.assertEqual(committed_sites(writer.path), 0)
+            writer.append(
+                TrialSite(self.sample_df, dict(self.sample_metadata, Parzelle="03")), "Tiefborn/09703-03", "input-2"
+            )
+            # both trial sites are committed at once after 4 measurement rows
+            self.assertEqual(committed_sites(writer.path), 2)
+            # a trial site that fails to be inserted is rolled back completely
+            self.assertRaises(
+                sqlite3.IntegrityError,
+                writer.append,
+                TrialSite(self.sample_df, dict(self.sample_metadata)),
+                "Tiefborn/09703-02",
+                "input-3",
+            )
+            writer.append(
+                TrialSite(self.sample_df, dict(self.sample_metadata, Parzelle="04")), "Tiefborn/09703-04", "input-4"
+            )
+            writer.flush()
+            self.assertEqual(committed_sites(writer.path), 3)
+            connection = sqlite3.connect(writer.path)
+            try:
+                self.assertEqual(connection.execute("SELECT COUNT(*) FROM measurements").fetchone()[0], 6)
+            finally:
+                connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
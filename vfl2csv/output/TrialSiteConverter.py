@@ -4,8 +4,9 @@ from pathlib import Path
 from typing import Optional
 
 from vfl2csv import setup
+from vfl2csv.output.column_layout import column_layout_plan, measurement_column_label
 from vfl2csv_base.TrialSite import TrialSite
-from vfl2csv_base.datatypes_mapping import pandas_datatypes_mapping as dtypes_mapping
+from vfl2csv_base.data_formats import write_data_file
 from vfl2csv_base.exceptions.IOErrors import TrialSiteFormatError
 
 HierarchicalColumnLabel = tuple[datetime.date | datetime.datetime | str, str, str, str]
@@ -41,86 +42,36 @@ class TrialSiteConverter:
         
         The entire column specification as well as the corresponding data types are declared in the 
         config/columns.json file."""
-        # count of expected columns containing tree data
-        head_column_count = len(setup.column_scheme.head)
-        # count of expected measurement fields (different types of values)
-        measurement_fields_count = len(setup.column_scheme.measurements)
-
-        column_count = len(self.trial_site.df.columns)
-        # count of all columns containing measurements
-        measurement_column_count = column_count - head_column_count
-        # `measurement_column_count` must be a multiple of `measurement_fields_count` and the count of all columns must
-        # be at least the count of all head columns
-        if (
-                measurement_column_count % measurement_fields_count != 0
-                or column_count < head_column_count
-        ):
-            raise TrialSiteFormatError(
-                self.trial_site, "Unexpected count and/or arrangement of data columns"
-            )
-        # count of all measurement recordings, so sets of every field
-        measurement_count = measurement_column_count // measurement_fields_count
-
-        # new column names are assigned later
-        new_column_names = list()
-        # first, iterate head columns
-        for template, column in zip(
-                setup.column_scheme.head, self.trial_site.df.columns[0:head_column_count]
-        ):
-            # Check column name
-            if column[3] != template["name"]:
-                raise TrialSiteFormatError(
-                    self.trial_site,
-                    f'Input file column `{column[3]}` is found instead of expected column `{template["name"]}`',
-                )
-            # rename columns
-            new_column_names.append(template.get("override_name", template["name"]))
-            # reassign datatype
-            self.trial_site.df[column] = self.trial_site.df[column].astype(
-                dtypes_mapping[template["type"]]
-            )
-
-        # iterate all measurements
-        for measurement_index in range(measurement_count):
-            # number of columns already refactored
-            column_shift = (
-                    head_column_count + measurement_index * measurement_fields_count
-            )
-            # iterate all columns of the next measurement
-            for template, column in zip(
-                    setup.column_scheme.measurements,
-                    self.trial_site.df.columns[
-                    column_shift: column_shift + measurement_fields_count
-                    ],
-            ):
-                # Check column name
-                if column[1] != template["name"]:
-                    raise TrialSiteFormatError(
-                        self.trial_site,
-                        f"Input file column `{column[1]}_{column[0]}` is found "
-                        f'instead of expected column `{template["name"]}_{column[0]}`',
-                    )
-                # rename column
-                new_column_names.append(
-                    self.simplify_measurement_column_labels(
-                        self.trial_site,
-                        column,
-                        template.get("override_name", template["name"]),
-                    )
-                )
-                # reassign datatype
-                self.trial_site.df[column] = self.trial_site.df[column].astype(
-                    dtypes_mapping[template["type"]]
-                )
-        self.trial_site.df.columns = new_column_names
+        # the plan for the header layout is compiled once and shared by all trial sites with the same layout
+        plan = column_layout_plan(setup.column_scheme, self.trial_site.df.columns)
+        if plan.error is not None:
+            raise TrialSiteFormatError(self.trial_site, plan.error)
+        df = self.trial_site.df
+        df.columns = plan.column_names
+        # reassign datatypes of all columns at once, unless the parser already produced them
+        changed_dtypes = {
+            name: dtype
+            for name, dtype, current_dtype in zip(plan.column_names, plan.dtypes, df.dtypes)
+            if current_dtype != dtype
+        }
+        if len(changed_dtypes) != 0:
+            self.trial_site.df = df.astype(changed_dtypes, copy=False)
 
     def trim_metadata(self) -> None:
         """
         Replace double whitespaces in metadata keys with simple spaces.
         :return:
         """
-        for key, value in self.trial_site.metadata.items():
-            self.trial_site.metadata[key] = re.sub(r"\s+", " ", value)
+        self.trial_site.metadata.update(self.trimmed_metadata(self.trial_site.metadata))
+
+    @staticmethod
+    def trimmed_metadata(metadata: dict[str, str]) -> dict[str, str]:
+        """
+        Return a copy of the metadata with double whitespaces in its values replaced with simple spaces.
+        :param metadata: Metadata of a trial site
+        :return: Trimmed metadata
+        """
+        return {key: re.sub(r"\s+", " ", value) for key, value in metadata.items()}
 
     @staticmethod
     def simplify_measurement_column_labels(
@@ -141,31 +92,26 @@ class TrialSiteConverter:
         Not to confuse with `vfl2csv_base.Trialsite#compress_column_labels`, which only takes a tuple of two values as
         input column name
         """
-        if isinstance(hierarchy[0], datetime.datetime) or isinstance(
-                hierarchy[0], datetime.date
-        ):
-            date = hierarchy[0]
-        else:
-            try:
-                date = datetime.datetime.strptime(hierarchy[0], "%d.%m.%Y")
-            except ValueError as err:
-                raise TrialSiteFormatError(
-                    trial_site,
-                    f'Measurement date {hierarchy[0]} does not match the expected format "dd.mm.YYYY"!',
-                ) from err
-
-        measurement_type = override_name if override_name is not None else hierarchy[1]
-
-        # if the month is lower or equal to June, decrement the year to respect growing seasons
-        return f"{measurement_type}_{date.year - (0 if date.month > 6 else 1)}"
+        try:
+            return measurement_column_label(hierarchy, override_name)
+        except ValueError as err:
+            raise TrialSiteFormatError(trial_site, str(err)) from err
 
     def write_data(self, filepath: Path) -> None:
         """
-        Write data formatted in CSV to the provided filepath.
+        Write data to the provided filepath, formatted in the configured data format (CSV by default).
+        CSV files are compressed while they are written if a compression is configured.
         :param filepath: File path to save the data to
         """
-        self.trial_site.df.to_csv(
-            filepath, na_rep="NA", sep=",", index=False, encoding="utf-8"
+        output_config = setup.config["Output"]
+        compression_level = output_config.get("compression_level", "")
+        write_data_file(
+            self.trial_site.df,
+            filepath,
+            output_config.get("data_format", "csv"),
+            output_config.get("compression", "none"),
+            int(compression_level) if compression_level.strip() != "" else None,
+            output_config.get("csv_writer", "pandas"),
         )
 
     def write_metadata(self, filepath: Path) -> None:
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import datetime
+import functools
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+import pandas as pd
+
+from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.datatypes_mapping import pandas_datatypes_mapping as dtypes_mapping
+
+# count of distinct header layouts whose plans are kept per process
+COLUMN_LAYOUT_CACHE_SIZE = 256
+# count of distinct measurement dates whose growing seasons are kept per process
+MEASUREMENT_DATE_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class ColumnLayoutPlan:
+    """
+    Result of matching the hierarchical column labels of a trial site against a column scheme.
+    If the labels don't match the column scheme, `error` describes the mismatch and the other fields are empty.
+    """
+    column_names: tuple[str, ...]
+    dtypes: tuple[pd.api.extensions.ExtensionDtype, ...]
+    error: Optional[str] = None
+
+
+def measurement_column_label(hierarchy: tuple, override_name: Optional[str]) -> str:
+    """
+    Simplify the four hierarchical labels of a measurement column into a label in the format 'ABC_YYYY', where ABC is
+    the measurement type and YYYY is the year of the growing season in which the measurement was taken.
+    :param hierarchy: Tuple consisting of four values
+    :param override_name: If not None, use this as measurement name prefix instead of the prefix provided in the
+    column hierarchy.
+    :return: simplified label
+    :raises ValueError: if the measurement date does not match the expected format
+    """
+    measurement_type = override_name if override_name is not None else hierarchy[1]
+    return f"{measurement_type}_{measurement_season(hierarchy[0])}"
+
+
+@functools.lru_cache(maxsize=MEASUREMENT_DATE_CACHE_SIZE)
+def measurement_season(date: datetime.date | datetime.datetime | str) -> int:
+    """
+    Determine the year of the growing season in which a measurement was taken.
+    :param date: Measurement date, either as date or as string in the format dd.mm.YYYY
+    :raises ValueError: if the measurement date does not match the expected format
+    """
+    if not isinstance(date, datetime.date):
+        try:
+            date = datetime.datetime.strptime(date, "%d.%m.%Y")
+        except ValueError as err:
+            raise ValueError(
+                f'Measurement date {date} does not match the expected format "dd.mm.YYYY"!'
+            ) from err
+
+    # if the month is lower or equal to June, decrement the year to respect growing seasons
+    return date.year - (0 if date.month > 6 else 1)
+
+
+@dataclass(frozen=True, eq=False)
+class HeaderLayout:
+    """
+    Hierarchical column labels of a trial site, compared by the parts that determine its plan only: the names of the
+    head columns and the type and growing season of every measurement column. The counts in the last header row and
+    the exact measurement dates differ between trial sites sharing the same layout.
+    """
+    key: tuple
+    header: tuple
+
+    @staticmethod
+    def of(column_scheme: ColumnScheme, header: tuple) -> HeaderLayout:
+        """
+        :raises IndexError: if a column label consists of less than four values
+        :raises ValueError: if a measurement date does not match the expected format
+        """
+        head_column_count = len(column_scheme.head)
+        return HeaderLayout(
+            (
+                tuple(column[3] for column in header[:head_column_count]),
+                tuple((column[1], measurement_season(column[0])) for column in header[head_column_count:]),
+            ),
+            header,
+        )
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, HeaderLayout) and self.key == other.key
+
+
+def column_layout_plan(column_scheme: ColumnScheme, columns: pd.Index) -> ColumnLayoutPlan:
+    """
+    Return the plan for the hierarchical column labels of a trial site. Trial sites sharing the same header layout
+    share the same plan, which is compiled only once per process, see `HeaderLayout`.
+    :param column_scheme: Column scheme the labels are matched against
+    :param columns: Hierarchical column labels of the trial site
+    :return: Plan for the column labels
+    """
+    header = tuple(columns)
+    try:
+        layout = HeaderLayout.of(column_scheme, header)
+        hash(layout)
+    except (IndexError, TypeError, ValueError):
+        # malformed labels are reported by the compiler
+        return compile_column_layout(column_scheme, header)
+    plan = cached_column_layout(column_scheme, layout)
+    if plan.error is not None:
+        # the error message of a cached plan refers to the labels of the trial site it was compiled for
+        return compile_column_layout(column_scheme, header)
+    return plan
+
+
+def compile_column_layout(column_scheme: ColumnScheme, header: tuple[Hashable, ...]) -> ColumnLayoutPlan:
+    """
+    Match hierarchical column labels against a column scheme and determine the new column names and data types.
+    See `TrialSiteConverter.refactor_dataframe` for a description of the expected layout.
+    :param column_scheme: Column scheme the labels are matched against
+    :param header: Hierarchical column labels, tuples of four values each
+    :return: Plan for the column labels
+    """
+    # count of expected columns containing tree data
+    head_column_count = len(column_scheme.head)
+    # count of expected measurement fields (different types of values)
+    measurement_fields_count = len(column_scheme.measurements)
+
+    column_count = len(header)
+    # count of all columns containing measurements
+    measurement_column_count = column_count - head_column_count
+    # `measurement_column_count` must be a multiple of `measurement_fields_count` and the count of all columns must
+    # be at least the count of all head columns
+    if (
+            measurement_column_count % measurement_fields_count != 0
+            or column_count < head_column_count
+    ):
+        return ColumnLayoutPlan((), (), "Unexpected count and/or arrangement of data columns")
+
+    column_names = list()
+    dtypes = list()
+    # first, iterate head columns
+    for template, column in zip(column_scheme.head, header[0:head_column_count]):
+        if column[3] != template["name"]:
+            return ColumnLayoutPlan(
+                (), (),
+                f'Input file column `{column[3]}` is found instead of expected column `{template["name"]}`',
+            )
+        column_names.append(template.get("override_name", template["name"]))
+        dtypes.append(dtypes_mapping[template["type"]])
+
+    # iterate all columns of all measurements
+    for index, column in enumerate(header[head_column_count:]):
+        template = column_scheme.measurements[index % measurement_fields_count]
+        if column[1] != template["name"]:
+            return ColumnLayoutPlan(
+                (), (),
+                f"Input file column `{column[1]}_{column[0]}` is found "
+                f'instead of expected column `{template["name"]}_{column[0]}`',
+            )
+        try:
+            column_names.append(
+                measurement_column_label(column, template.get("override_name", template["name"]))
+            )
+        except ValueError as err:
+            return ColumnLayoutPlan((), (), str(err))
+        dtypes.append(dtypes_mapping[template["type"]])
+    return ColumnLayoutPlan(tuple(column_names), tuple(dtypes))
+
+
+def compile_header_layout(column_scheme: ColumnScheme, layout: HeaderLayout) -> ColumnLayoutPlan:
+    return compile_column_layout(column_scheme, layout.header)
+
+
+# column schemes are hashed by identity, so a new column scheme never reuses plans of another one
+cached_column_layout = functools.lru_cache(maxsize=COLUMN_LAYOUT_CACHE_SIZE)(compile_header_layout)
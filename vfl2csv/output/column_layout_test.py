@@ -0,0 +1,118 @@
+import datetime
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from pandas import MultiIndex
+
+from vfl2csv.output.column_layout import (
+    cached_column_layout,
+    column_layout_plan,
+    compile_column_layout,
+    measurement_column_label,
+)
+from vfl2csv_base.ColumnScheme import ColumnScheme
+
+
+class ColumnLayoutTest(unittest.TestCase):
+    column_scheme = ColumnScheme.from_file(path=Path("config/columns_simple.json"))
+
+    columns = MultiIndex.from_tuples(
+        [
+            ("Aufnahme", "Wert", "Einheit", "Bst.-E."),
+            ("Aufnahme", "Wert", "Einheit", "Art"),
+            ("Aufnahme", "Wert", "Einheit", "Baum"),
+            ("23.07.1984", "D", "cm", "159"),
+            ("23.07.1984", "Aus", "Unnamed: 4_level_2", "15"),
+            ("23.07.1984", "H", "m", "30"),
+            ("26.04.1995", "D", "cm", "144"),
+            ("26.04.1995", "Aus", "Unnamed: 7_level_2", "50"),
+            ("26.04.1995", "H", "m", "34"),
+        ]
+    )
+
+    def test_compile_column_layout(self):
+        plan = compile_column_layout(self.column_scheme, tuple(self.columns))
+        self.assertIsNone(plan.error)
+        self.assertTupleEqual(
+            plan.column_names,
+            ("Bestandeseinheit", "Baumart", "Baumnummer", "D_1984", "Aus_1984", "H_1984", "D_1994", "Aus_1994",
+             "H_1994"),
+        )
+        self.assertTupleEqual(
+            plan.dtypes,
+            (pd.UInt16Dtype(), pd.StringDtype(), pd.UInt32Dtype()) + 2 * (
+                pd.Float64Dtype(), pd.UInt8Dtype(), pd.Float64Dtype()
+            ),
+        )
+
+    def test_compile_column_layout_errors(self):
+        self.assertEqual(
+            compile_column_layout(self.column_scheme, tuple(self.columns[:5])).error,
+            "Unexpected count and/or arrangement of data columns",
+        )
+        header = list(self.columns)
+        header[3] = ("23.07.1984", "wrong", "cm", "159")
+        self.assertEqual(
+            compile_column_layout(self.column_scheme, tuple(header)).error,
+            "Input file column `wrong_23.07.1984` is found instead of expected column `D_23.07.1984`",
+        )
+        header = list(self.columns)
+        header[3] = ("1984", "D", "cm", "159")
+        self.assertIn(
+            "does not match the expected format",
+            compile_column_layout(self.column_scheme, tuple(header)).error,
+        )
+
+    def test_column_layout_plan_is_cached(self):
+        cached_column_layout.cache_clear()
+        plan = column_layout_plan(self.column_scheme, self.columns)
+        self.assertIs(column_layout_plan(self.column_scheme, self.columns.copy()), plan)
+        self.assertEqual(cached_column_layout.cache_info().hits, 1)
+        # plans of another column scheme are compiled separately
+        other_scheme = ColumnScheme.from_file(path=Path("config/columns_simple.json"))
+        self.assertIsNot(column_layout_plan(other_scheme, self.columns), plan)
+
+    def test_trial_sites_share_plan(self):
+        cached_column_layout.cache_clear()
+        plan = column_layout_plan(self.column_scheme, self.columns)
+        # another trial site measured on other dates of the same growing seasons, with other counts of trees
+        other_site = MultiIndex.from_tuples(
+            [
+                ("Aufnahme", "Wert", "Einheit", "Bst.-E."),
+                ("Aufnahme", "Wert", "Einheit", "Art"),
+                ("Aufnahme", "Wert", "Einheit", "Baum"),
+                ("02.08.1984", "D", "cm", "201"),
+                ("02.08.1984", "Aus", "Unnamed: 4_level_2", "3"),
+                ("02.08.1984", "H", "m", "12"),
+                ("11.03.1995", "D", "cm", "198"),
+                ("11.03.1995", "Aus", "Unnamed: 7_level_2", "7"),
+                ("11.03.1995", "H", "m", "40"),
+            ]
+        )
+        self.assertIs(column_layout_plan(self.column_scheme, other_site), plan)
+        self.assertEqual(cached_column_layout.cache_info().hits, 1)
+        self.assertEqual(cached_column_layout.cache_info().misses, 1)
+        # a measurement in another growing season changes the layout
+        later_site = list(other_site)
+        later_site[3:6] = [("02.08.1985", column[1], column[2], column[3]) for column in later_site[3:6]]
+        self.assertNotEqual(column_layout_plan(self.column_scheme, later_site).column_names, plan.column_names)
+
+    def test_errors_refer_to_trial_site(self):
+        cached_column_layout.cache_clear()
+        for date in ("23.07.1984", "02.08.1984"):
+            header = list(self.columns)
+            header[3] = (date, "wrong", "cm", "159")
+            self.assertEqual(
+                column_layout_plan(self.column_scheme, header).error,
+                f"Input file column `wrong_{date}` is found instead of expected column `D_{date}`",
+            )
+
+    def test_measurement_column_label(self):
+        self.assertEqual(measurement_column_label(("23.07.1984", "D", "cm", "159"), None), "D_1984")
+        self.assertEqual(measurement_column_label((datetime.date(1984, 6, 30), "D", "cm", "159"), "X"), "X_1983")
+        self.assertRaises(ValueError, measurement_column_label, ("1984", "D", "cm", "159"), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ from typing import Generator, NamedTuple
 import pandas as pd
 
 from vfl2csv_base.ColumnScheme import ColumnScheme
+from vfl2csv_base.data_formats import read_data_file
 from vfl2csv_base.datatypes_mapping import pandas_datatypes_mapping
 from vfl2csv_base.exceptions import IOErrors
 
@@ -52,19 +53,20 @@ class TrialSite:
         head_column_count = len(column_scheme.head)
         measurement_column_count = len(column_scheme.measurements)
 
-        # work only on a deep copy of the dataframe
-        df = self.df.copy(deep=True)
-        df.columns = list(self.expand_column_labels(df.columns))
+        # labels are only inspected, the datatypes of all columns are set at once after the verification
+        columns = list(self.expand_column_labels(self.df.columns))
+        # datatypes by column position
+        dtypes = dict()
         actual_head_column_count = sum(
-            [1 if column.year == -1 else 0 for column in df.columns]
+            [1 if column.year == -1 else 0 for column in columns]
         )
         measurement_years = sorted(
-            set([column.year for column in df.columns[head_column_count:]])
+            set([column.year for column in columns[head_column_count:]])
         )
 
         # verify head columns
         if head_column_count > 0:
-            for i, column in enumerate(df.columns[:actual_head_column_count]):
+            for i, column in enumerate(columns[:actual_head_column_count]):
                 if column.name != column_scheme.head[i].get(
                         "override_name", column_scheme.head[i]["name"]
                 ):
@@ -72,9 +74,7 @@ class TrialSite:
                         self,
                         f"Column `{column.name}` of the dataframe does not match the expected column name",
                     )
-                df[column] = df[column].astype(
-                    pandas_datatypes_mapping[column_scheme.head[i]["type"]]
-                )
+                dtypes[i] = pandas_datatypes_mapping[column_scheme.head[i]["type"]]
         elif actual_head_column_count > 0:
             raise IOErrors.TrialSiteFormatError(
                 self,
@@ -89,17 +89,15 @@ class TrialSite:
                 for scheme_column in column_scheme.measurements.data:
                     # noinspection PyTypeChecker
                     df_column = (
-                        df.columns[column_index]
-                        if not column_index >= len(df.columns)
+                        columns[column_index]
+                        if not column_index >= len(columns)
                         else ExpandedColumnNotation(year=None, name=None)
                     )
                     # First case: column name matches measurement column data
                     if df_column.name == scheme_column.get(
                             "override_name", scheme_column["name"]
                     ):
-                        df[df_column] = df[df_column].astype(
-                            pandas_datatypes_mapping[scheme_column["type"]]
-                        )
+                        dtypes[column_index] = pandas_datatypes_mapping[scheme_column["type"]]
                         column_index += 1
                         continue
                     # Second case: column names do not match, column is optional
@@ -111,8 +109,15 @@ class TrialSite:
                         f"year {year}",
                     )
 
-        df.columns = self.compress_column_labels(df.columns)
-        self.df = self.df.astype(df.dtypes)
+        # only columns whose datatype changes are converted, all other columns are shared with the original dataframe
+        current_dtypes = self.df.dtypes
+        changed_dtypes = {
+            self.df.columns[index]: dtype
+            for index, dtype in dtypes.items()
+            if current_dtypes.iloc[index] != dtype
+        }
+        if len(changed_dtypes) != 0:
+            self.df = self.df.astype(changed_dtypes, copy=False)
 
     def __str__(self) -> str:
         revier = self.metadata.get("Revier", "Unknown Revier")
@@ -169,5 +174,5 @@ class TrialSite:
             raise FileNotFoundError(
                 f'Relative path {Path(metadata["DataFrame"])} is not a valid file'
             )
-        df = pd.read_csv(df_path)
+        df = read_data_file(df_path)
         return TrialSite(df, metadata)
@@ -0,0 +1,216 @@
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path, PurePath
+from typing import IO, Optional
+
+import pandas as pd
+
+from vfl2csv_base import fast_csv
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+# file suffix of every supported data format
+DATA_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+# data formats that are written and read using pyarrow
+ARROW_DATA_FORMATS = ("parquet", "feather")
+# suffix appended to CSV files by every supported compression
+COMPRESSIONS = {
+    "none": "",
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "xz": ".xz",
+    "zstd": ".zst",
+}
+# name of the compression level option of every compression, as passed to pandas
+COMPRESSION_LEVEL_OPTIONS = {
+    "gzip": "compresslevel",
+    "bz2": "compresslevel",
+    "xz": "preset",
+    "zstd": "level",
+}
+# writers of CSV files, which write identical files
+CSV_WRITERS = ("pandas", "fast")
+
+
+def validate_data_format(data_format: str) -> None:
+    """
+    Verify that data files of the given format can be written and read.
+    :param data_format: Name of the data format
+    :raises IllegalConfigError: if the data format is unknown or requires pyarrow, which is not installed
+    """
+    if data_format not in DATA_FORMATS:
+        raise IllegalConfigError(f'`data_format` must be one of {", ".join(DATA_FORMATS)}')
+    if data_format in ARROW_DATA_FORMATS:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as error:
+            raise IllegalConfigError(
+                f"The {data_format} data format requires the pyarrow package to be installed"
+            ) from error
+
+
+def validate_compression(compression: str, data_format: str) -> None:
+    """
+    Verify that data files of the given format can be written and read with the given compression.
+    :param compression: Name of the compression
+    :param data_format: Name of the data format
+    :raises IllegalConfigError: if the compression is unknown, not applicable to the data format or requires the
+    zstandard package, which is not installed
+    """
+    if compression not in COMPRESSIONS:
+        raise IllegalConfigError(f'`compression` must be one of {", ".join(COMPRESSIONS)}')
+    if compression != "none" and data_format != "csv":
+        raise IllegalConfigError(
+            f"`compression` only applies to CSV files, {data_format} files are compressed by their format"
+        )
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError as error:
+            raise IllegalConfigError(
+                "The zstd compression requires the zstandard package to be installed"
+            ) from error
+
+
+def validate_csv_writer(csv_writer: str) -> None:
+    """
+    Verify that the CSV writer is known.
+    :param csv_writer: Name of the CSV writer
+    :raises IllegalConfigError: if the CSV writer is unknown
+    """
+    if csv_writer not in CSV_WRITERS:
+        raise IllegalConfigError(f'`csv_writer` must be one of {", ".join(CSV_WRITERS)}')
+
+
+def data_output_pattern(pattern: str | PurePath, data_format: str, compression: str = "none") -> str:
+    """
+    Return the output pattern of data files in the given format. The suffix of the pattern is replaced with the
+    suffix of the data format, except for CSV files, whose pattern is used as it is. The suffix of the compression
+    is appended to the pattern of compressed CSV files.
+    :param pattern: Configured data output pattern
+    :param data_format: Name of the data format
+    :param compression: Name of the compression of CSV files
+    :return: Output pattern of data files
+    """
+    if data_format == "csv":
+        return str(pattern) + COMPRESSIONS[compression]
+    return str(PurePath(pattern).with_suffix(DATA_FORMATS[data_format]))
+
+
+def compression_of(path: Path) -> str:
+    """
+    Determine the compression of a data file by its suffix.
+    :param path: Path of the data file
+    :return: Name of the compression, `none` for uncompressed files
+    """
+    for compression, suffix in COMPRESSIONS.items():
+        if suffix != "" and path.suffix == suffix:
+            return compression
+    return "none"
+
+
+def open_text_file(path: Path) -> IO[str]:
+    """
+    Open a possibly compressed UTF-8 text file for reading, decompressing it while it is read.
+    :param path: Path of the file, whose compression is determined by its suffix
+    :return: Text stream
+    """
+    compression = compression_of(path)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "bz2":
+        return bz2.open(path, "rt", encoding="utf-8")
+    if compression == "xz":
+        return lzma.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        import zstandard
+
+        return io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True), encoding="utf-8"
+        )
+    return open(path, "r", encoding="utf-8")
+
+
+def data_format_of(path: Path) -> str:
+    """
+    Determine the format of a data file by its suffix. Files with unknown suffixes are treated as CSV files.
+    :param path: Path of the data file
+    :return: Name of the data format
+    """
+    if compression_of(path) != "none":
+        # only CSV files are compressed
+        return "csv"
+    for data_format, suffix in DATA_FORMATS.items():
+        if path.suffix == suffix:
+            return data_format
+    return "csv"
+
+
+def write_data_file(
+        df: pd.DataFrame,
+        path: Path | IO[str],
+        data_format: str,
+        compression: str = "none",
+        compression_level: Optional[int] = None,
+        csv_writer: str = "pandas",
+) -> None:
+    """
+    Write a dataframe in the given format. Columnar formats keep the nullable datatypes of the dataframe.
+    :param df: Dataframe to write
+    :param path: File path to save the data to
+    :param data_format: Name of the data format
+    :param compression: Name of the compression of CSV files, which are compressed while they are written
+    :param compression_level: Compression level, the default level of the compression if None
+    :param csv_writer: Writer of CSV files: pandas or fast for the vectorized writer of `fast_csv`
+    """
+    if data_format == "csv" and csv_writer == "fast":
+        fast_csv.write_csv(df, path, csv_compression_options(compression, compression_level))
+    elif data_format == "csv":
+        df.to_csv(
+            path,
+            na_rep="NA",
+            sep=",",
+            index=False,
+            encoding="utf-8",
+            compression=csv_compression_options(compression, compression_level),
+        )
+    elif data_format == "parquet":
+        df.to_parquet(path, engine="pyarrow", index=False)
+    elif data_format == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        raise IllegalConfigError(f'`data_format` must be one of {", ".join(DATA_FORMATS)}')
+
+
+def csv_compression_options(compression: str, compression_level: Optional[int]) -> Optional[dict]:
+    """
+    Return the compression options of `DataFrame.to_csv` for the given compression.
+    """
+    if compression == "none":
+        return None
+    options = {"method": compression}
+    if compression_level is not None:
+        options[COMPRESSION_LEVEL_OPTIONS[compression]] = compression_level
+    if compression == "gzip":
+        # keep the output reproducible, the modification time is part of the gzip header
+        options["mtime"] = 0
+    return options
+
+
+def read_data_file(path: Path) -> pd.DataFrame:
+    """
+    Read a data file in any of the supported formats, determined by the suffix of the file.
+    :param path: Path of the data file, compressed CSV files are decompressed
+    :return: Dataframe
+    """
+    data_format = data_format_of(path)
+    if data_format == "parquet":
+        return pd.read_parquet(path, engine="pyarrow")
+    if data_format == "feather":
+        return pd.read_feather(path)
+    return pd.read_csv(path)
@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from vfl2csv_base.data_formats import (
+    COMPRESSIONS,
+    CSV_WRITERS,
+    DATA_FORMATS,
+    compression_of,
+    data_format_of,
+    data_output_pattern,
+    open_text_file,
+    read_data_file,
+    validate_compression,
+    validate_csv_writer,
+    validate_data_format,
+    write_data_file,
+)
+from vfl2csv_base.exceptions.IOErrors import IllegalConfigError
+
+try:
+    import pyarrow  # noqa: F401
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class DataFormatsTest(unittest.TestCase):
+    sample_df = pd.DataFrame(
+        {
+            "Baumart": pd.array(["211", None, "511"], dtype=pd.StringDtype()),
+            "Baumnummer": pd.array([1, 2, 3], dtype=pd.UInt32Dtype()),
+            "D_1984": pd.array([12.5, None, 30.0], dtype=pd.Float64Dtype()),
+            "Aus_1984": pd.array([None, 2, None], dtype=pd.UInt8Dtype()),
+        }
+    )
+
+    def test_data_output_pattern(self):
+        pattern = "{revier}/{versuch}/{versuch}-{parzelle}.csv"
+        self.assertEqual(data_output_pattern(pattern, "csv"), pattern)
+        self.assertEqual(data_output_pattern(pattern, "parquet"), "{revier}/{versuch}/{versuch}-{parzelle}.parquet")
+        self.assertEqual(data_output_pattern(pattern, "feather"), "{revier}/{versuch}/{versuch}-{parzelle}.feather")
+
+    def test_data_format_of(self):
+        for data_format, suffix in DATA_FORMATS.items():
+            self.assertEqual(data_format_of(Path(f"data{suffix}")), data_format)
+        self.assertEqual(data_format_of(Path("data.txt")), "csv")
+        for compression, suffix in COMPRESSIONS.items():
+            self.assertEqual(compression_of(Path(f"data.csv{suffix}")), compression)
+            self.assertEqual(data_format_of(Path(f"data.csv{suffix}")), "csv")
+
+    def test_validate_compression(self):
+        validate_compression("gzip", "csv")
+        validate_compression("none", "parquet")
+        self.assertRaises(IllegalConfigError, validate_compression, "zip", "csv")
+        self.assertRaises(IllegalConfigError, validate_compression, "gzip", "parquet")
+
+    def test_csv_writers(self):
+        validate_csv_writer("fast")
+        self.assertRaises(IllegalConfigError, validate_csv_writer, "arrow")
+        with tempfile.TemporaryDirectory() as tmp:
+            contents = set()
+            for csv_writer in CSV_WRITERS:
+                path = Path(tmp) / f"{csv_writer}.csv.xz"
+                write_data_file(self.sample_df, path, "csv", "xz", csv_writer=csv_writer)
+                contents.add(path.read_bytes())
+            self.assertEqual(len(contents), 1)
+
+    def test_round_trip_compressed_csv(self):
+        pattern = "{revier}/{versuch}/{versuch}-{parzelle}.csv"
+        with tempfile.TemporaryDirectory() as tmp:
+            uncompressed = Path(tmp) / "data.csv"
+            write_data_file(self.sample_df, uncompressed, "csv")
+            for compression in ("gzip", "bz2", "xz"):
+                self.assertEqual(data_output_pattern(pattern, "csv", compression), pattern + COMPRESSIONS[compression])
+                path = Path(data_output_pattern(uncompressed, "csv", compression))
+                write_data_file(self.sample_df, path, "csv", compression, 1)
+                self.assertNotEqual(path.read_bytes(), uncompressed.read_bytes())
+                with open_text_file(path) as file:
+                    self.assertEqual(file.read(), uncompressed.read_text(encoding="utf-8"))
+                self.assertListEqual(list(read_data_file(path).columns), list(self.sample_df.columns))
+
+    def test_validate_data_format(self):
+        validate_data_format("csv")
+        self.assertRaises(IllegalConfigError, validate_data_format, "xlsx")
+
+    def test_round_trip_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.csv"
+            write_data_file(self.sample_df, path, "csv")
+            self.assertEqual(path.read_text(encoding="utf-8").split("\n")[2], "NA,2,NA,2")
+            self.assertListEqual(list(read_data_file(path).columns), list(self.sample_df.columns))
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow is not installed")
+    def test_round_trip_columnar(self):
+        for data_format in ("parquet", "feather"):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / f"data{DATA_FORMATS[data_format]}"
+                write_data_file(self.sample_df, path, data_format)
+                # nullable datatypes are kept
+                pd.testing.assert_frame_equal(read_data_file(path), self.sample_df)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import re
+from pathlib import Path
+from typing import IO, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype
+from pandas.io.common import get_handle
+
+NA_REPRESENTATION = "NA"
+SEPARATOR = ","
+LINE_TERMINATOR = os.linesep
+# count of cells formatted and written at once, bounding the memory of the formatted text
+BLOCK_CELL_COUNT = 1_000_000
+# cells containing any of these characters are quoted, like the csv module does with QUOTE_MINIMAL
+QUOTED_CHARACTERS = re.compile(r'[",\r\n]')
+
+
+def is_supported(df: pd.DataFrame) -> bool:
+    """
+    Determine whether the dataframe can be written by the vectorized writer. Only string, integer and float columns
+    are formatted by the vectorized writer. Dataframes with a single column are excluded, because the csv module quotes
+    empty fields in rows consisting of a single field.
+    """
+    if len(df.columns) < 2:
+        return False
+    return all(
+        isinstance(dtype, pd.StringDtype)
+        or (is_integer_dtype(dtype) and not is_bool_dtype(dtype))
+        or is_float_dtype(dtype)
+        for dtype in df.dtypes
+    )
+
+
+def quote(cell: str) -> str:
+    if QUOTED_CHARACTERS.search(cell) is None:
+        return cell
+    return '"' + cell.replace('"', '""') + '"'
+
+
+def format_column(column: pd.Series) -> list[str]:
+    """
+    Format the cells of a column exactly like `DataFrame.to_csv` does: numbers are formatted by NumPy, which produces
+    the shortest representation of their datatype, and missing values are represented by `NA`.
+    :param column: String, integer or float column
+    :return: Formatted cells
+    """
+    if isinstance(column.dtype, pd.StringDtype):
+        return [quote(cell) for cell in column.to_numpy(dtype=object, na_value=NA_REPRESENTATION)]
+    mask = column.isna().to_numpy()
+    numpy_dtype = np.dtype(getattr(column.dtype, "numpy_dtype", column.dtype))
+    values = column.to_numpy(dtype=numpy_dtype, na_value=0 if is_integer_dtype(numpy_dtype) else np.nan)
+    # measurements repeat a lot of values, so each distinct value is formatted only once
+    # floats are distinguished by their bits to format 0.0 and -0.0 separately
+    keys = values.view(f"u{numpy_dtype.itemsize}") if is_float_dtype(numpy_dtype) else values
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    formatted = unique_keys.view(numpy_dtype).astype(str).astype(object)
+    cells = formatted[inverse]
+    cells[mask] = NA_REPRESENTATION
+    return cells.tolist()
+
+
+def write_csv(df: pd.DataFrame, path: Path | IO[str], compression: Optional[dict] = None) -> None:
+    """
+    Write a dataframe as CSV file with the same content as
+    `df.to_csv(path, na_rep="NA", sep=",", index=False, encoding="utf-8", compression=compression)`.
+    Instead of formatting the dataframe row by row, whole columns are formatted at once and the rows of a block of
+    cells are joined and written in one piece. Dataframes with unsupported columns are written by pandas.
+    :param df: Dataframe to write
+    :param path: File path or text stream to write to
+    :param compression: Compression options of `DataFrame.to_csv`
+    """
+    if not is_supported(df):
+        df.to_csv(path, na_rep=NA_REPRESENTATION, sep=SEPARATOR, index=False, encoding="utf-8", compression=compression)
+        return
+    block_row_count = max(1, BLOCK_CELL_COUNT // len(df.columns))
+    with get_handle(path, "w", encoding="utf-8", errors="strict", compression=compression) as handles:
+        handles.handle.write(SEPARATOR.join(quote(str(label)) for label in df.columns) + LINE_TERMINATOR)
+        for start in range(0, len(df), block_row_count):
+            block = df.iloc[start:start + block_row_count]
+            columns = [format_column(block.iloc[:, index]) for index in range(len(block.columns))]
+            handles.handle.write(
+                LINE_TERMINATOR.join(map(SEPARATOR.join, zip(*columns))) + LINE_TERMINATOR
+            )
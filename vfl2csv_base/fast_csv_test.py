@@ -0,0 +1,67 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from vfl2csv_base.fast_csv import is_supported, write_csv
+
+
+def pandas_csv(df: pd.DataFrame) -> str:
+    buffer = io.StringIO()
+    df.to_csv(buffer, na_rep="NA", sep=",", index=False, encoding="utf-8")
+    return buffer.getvalue()
+
+
+def fast_csv(df: pd.DataFrame) -> str:
+    buffer = io.StringIO()
+    write_csv(df, buffer)
+    return buffer.getvalue()
+
+
+class FastCsvTest(unittest.TestCase):
+    sample_df = pd.DataFrame(
+        {
+            "Baumart": pd.array(["211", None, "5,11", 'a "b"', "", "c\nd"], dtype=pd.StringDtype()),
+            "Baumnummer": pd.array([1, 2, None, 4, 5, 2 ** 32 - 1], dtype=pd.UInt32Dtype()),
+            "D_1984": pd.array([12.5, None, 1e16, 1e-05, -0.0, 123456789.123], dtype=pd.Float64Dtype()),
+            "H_1984": pd.array([0.1, 3.3, None, 2.0, 1e-05, 123456789.123], dtype=pd.Float32Dtype()),
+            "Aus_1984": pd.array([None, 2, None, 1, 0, 255], dtype=pd.UInt8Dtype()),
+            "Index": np.arange(6, dtype=np.int64),
+            "Ratio": np.array([0.5, np.nan, np.inf, 1.0, 7.25, -3.0]),
+            'Bemerkung, "alt"': pd.array([None] * 6, dtype=pd.StringDtype()),
+        }
+    )
+
+    def test_identical_output(self):
+        self.assertEqual(fast_csv(self.sample_df), pandas_csv(self.sample_df))
+        self.assertEqual(fast_csv(self.sample_df.iloc[:0]), pandas_csv(self.sample_df.iloc[:0]))
+
+    def test_blocks(self):
+        df = pd.concat([self.sample_df] * 50, ignore_index=True)
+        with mock.patch("vfl2csv_base.fast_csv.BLOCK_CELL_COUNT", 64):
+            self.assertEqual(fast_csv(df), pandas_csv(df))
+
+    def test_unsupported(self):
+        self.assertFalse(is_supported(self.sample_df[["Baumart"]]))
+        self.assertFalse(is_supported(self.sample_df.assign(Flag=True)))
+        self.assertTrue(is_supported(self.sample_df))
+        # unsupported dataframes are written by pandas
+        single_column = pd.DataFrame({"Baumart": pd.array(["", None], dtype=pd.StringDtype())})
+        self.assertEqual(fast_csv(single_column), pandas_csv(single_column))
+
+    def test_compression(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.csv.gz"
+            compression = {"method": "gzip", "mtime": 0}
+            self.sample_df.to_csv(path, na_rep="NA", sep=",", index=False, encoding="utf-8", compression=compression)
+            expected = path.read_bytes()
+            write_csv(self.sample_df, path, compression)
+            self.assertEqual(path.read_bytes(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()